@@ -0,0 +1,240 @@
+import math
+import threading
+import time
+from collections.abc import Callable, Collection, Iterator, Sequence
+from contextlib import contextmanager
+from typing import Any, Protocol
+
+from fastapi import Request, Response, status
+from pydantic import BaseModel, ConfigDict
+
+from app.application.etags import NotModifiedResponse, etag_matches
+from app.infrastructure.cache import LRUCache
+
+
+class CachedResponse(BaseModel):
+    # Bytes are kept as base64 by the shared backends
+    model_config = ConfigDict(ser_json_bytes="base64", val_json_bytes="base64")
+
+    body: bytes
+    media_type: str | None
+    headers: dict[str, str]
+    # Wall clock, the entry can be shared between processes
+    expires_at: float
+    # Versions of the tags when the response was computed
+    tags: dict[str, int]
+
+    @property
+    def expired(self) -> bool:
+        return self.expires_at <= time.time()
+
+    def to_response(self) -> Response:
+        return Response(self.body, media_type=self.media_type, headers=self.headers)
+
+
+class ResponseCacheBackend(Protocol):
+    """Storage of the cached responses and of the tag versions.
+
+    Entries are not removed when their tags are invalidated: they are
+    ignored once one of their tag versions is outdated.
+    """
+
+    def get(self, key: str) -> CachedResponse | None: ...
+
+    def set(self, key: str, entry: CachedResponse) -> None: ...
+
+    def get_tag_versions(self, tags: Collection[str]) -> dict[str, int]: ...
+
+    def invalidate(self, *tags: str) -> None: ...
+
+
+class MemoryCacheBackend:
+    """In-process backend, the least recently used entries are evicted."""
+
+    def __init__(self, maxsize: int = 1_000) -> None:
+        self._entries: LRUCache[str, CachedResponse] = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self._versions: dict[str, int] = {}
+
+    def get(self, key: str) -> CachedResponse | None:
+        return self._entries.get(key)
+
+    def set(self, key: str, entry: CachedResponse) -> None:
+        self._entries.set(key, entry)
+
+    def get_tag_versions(self, tags: Collection[str]) -> dict[str, int]:
+        with self._lock:
+            return {tag: self._versions.get(tag, 0) for tag in tags}
+
+    def invalidate(self, *tags: str) -> None:
+        with self._lock:
+            for tag in tags:
+                self._versions[tag] = self._versions.get(tag, 0) + 1
+
+
+class KeyValueClient(Protocol):
+    """Subset of the redis-py client used by `KeyValueCacheBackend`."""
+
+    def get(self, name: str) -> bytes | None: ...
+
+    def set(self, name: str, value: bytes, ex: int | None = None) -> Any: ...
+
+    def mget(self, keys: Sequence[str]) -> list[bytes | None]: ...
+
+    def incr(self, name: str) -> int: ...
+
+
+class KeyValueCacheBackend:
+    """Backend shared by the processes through a key-value store (e.g. Redis).
+
+    Expired entries are kept `stale_ttl` more seconds, to be served while
+    one request recomputes them.
+    """
+
+    def __init__(
+        self,
+        client: KeyValueClient,
+        prefix: str = "response-cache",
+        stale_ttl: float = 60.0,
+    ) -> None:
+        self.client = client
+        self.prefix = prefix
+        self.stale_ttl = stale_ttl
+
+    def get(self, key: str) -> CachedResponse | None:
+        value = self.client.get(f"{self.prefix}:entry:{key}")
+        if value is None:
+            return None
+        return CachedResponse.model_validate_json(value)
+
+    def set(self, key: str, entry: CachedResponse) -> None:
+        ttl = entry.expires_at - time.time() + self.stale_ttl
+        self.client.set(
+            f"{self.prefix}:entry:{key}",
+            entry.model_dump_json().encode(),
+            ex=max(1, math.ceil(ttl)),
+        )
+
+    def get_tag_versions(self, tags: Collection[str]) -> dict[str, int]:
+        if not tags:
+            return {}
+        values = self.client.mget([f"{self.prefix}:tag:{tag}" for tag in tags])
+        return {
+            tag: int(value) if value is not None else 0
+            for tag, value in zip(tags, values, strict=True)
+        }
+
+    def invalidate(self, *tags: str) -> None:
+        for tag in tags:
+            self.client.incr(f"{self.prefix}:tag:{tag}")
+
+
+class ResponseCache:
+    """Encoded responses of the read endpoints, invalidated by tag.
+
+    Only one request recomputes an entry at a time (per process): the
+    others wait for it, or get the expired entry if its tags are still
+    current.
+    """
+
+    def __init__(self, backend: ResponseCacheBackend, ttl: float = 10.0) -> None:
+        self.backend = backend
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # key -> (lock, number of requests holding or waiting for it)
+        self._locks: dict[str, tuple[threading.Lock, int]] = {}
+
+    def get_or_set(
+        self, key: str, tags: Collection[str], load: Callable[[], Response]
+    ) -> CachedResponse | Response:
+        """The cached response, or the response of `load` once cached.
+
+        Responses other than 200 are returned as they are, without caching.
+        """
+        entry, current = self._get(key, tags)
+        if entry is not None and current and not entry.expired:
+            return entry
+
+        stale = entry if current else None
+        with self._hold(key, blocking=stale is None) as acquired:
+            if not acquired and stale is not None:
+                return stale
+
+            # Computed by another request while waiting
+            entry, current = self._get(key, tags)
+            if entry is not None and current and not entry.expired:
+                return entry
+
+            # Versions read before loading: a write during the load leaves
+            # the entry outdated instead of caching stale data as current.
+            versions = self.backend.get_tag_versions(tags)
+            response = load()
+            if response.status_code != status.HTTP_200_OK:
+                return response
+
+            entry = CachedResponse(
+                body=bytes(response.body),
+                media_type=response.media_type,
+                headers={
+                    name: value
+                    for name, value in response.headers.items()
+                    if name not in {"content-length", "content-type"}
+                },
+                expires_at=time.time() + self.ttl,
+                tags=versions,
+            )
+            self.backend.set(key, entry)
+            return entry
+
+    def invalidate(self, *tags: str) -> None:
+        self.backend.invalidate(*tags)
+
+    def _get(
+        self, key: str, tags: Collection[str]
+    ) -> tuple[CachedResponse | None, bool]:
+        entry = self.backend.get(key)
+        if entry is None:
+            return None, False
+        return entry, entry.tags == self.backend.get_tag_versions(tags)
+
+    @contextmanager
+    def _hold(self, key: str, blocking: bool) -> Iterator[bool]:
+        with self._lock:
+            lock, count = self._locks.get(key, (threading.Lock(), 0))
+            self._locks[key] = (lock, count + 1)
+
+        acquired = lock.acquire(blocking=blocking)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                lock.release()
+            with self._lock:
+                lock, count = self._locks[key]
+                if count == 1:
+                    del self._locks[key]
+                else:
+                    self._locks[key] = (lock, count - 1)
+
+
+def get_cache_key(request: Request, params: BaseModel) -> str:
+    """Route and normalized query parameters (defaults included, in the
+    order of the model)."""
+    return f"{request.method} {request.url.path}?{params.model_dump_json()}"
+
+
+def cached_response(
+    cache: ResponseCache,
+    key: str,
+    tags: Collection[str],
+    load: Callable[[], Response],
+    if_none_match: str | None = None,
+) -> Response:
+    result = cache.get_or_set(key, tags, load)
+    if isinstance(result, Response):
+        return result
+
+    etag = result.headers.get("etag")
+    if etag is not None and etag_matches(if_none_match, etag):
+        return NotModifiedResponse(etag)
+    return result.to_response()
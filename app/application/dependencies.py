@@ -0,0 +1,63 @@
+from typing import Annotated
+
+from fastapi import Depends, Request
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.application.cache import ResponseCache
+from app.application.loaders import Loaders
+from app.application.services.address import AddressService
+from app.application.services.post import PostService
+from app.application.services.user import UserService
+from app.infrastructure.database import get_session, get_sessionmaker
+from app.infrastructure.repositories.address import AddressSQLAlchemyRepository
+from app.infrastructure.repositories.post import PostSQLAlchemyRepository
+from app.infrastructure.repositories.user import UserSQLAlchemyRepository
+
+SessionDep = Annotated[Session, Depends(get_session)]
+# For the streamed responses: the request session is closed before they are sent
+SessionmakerDep = Annotated[sessionmaker[Session], Depends(get_sessionmaker)]
+
+
+async def get_body(request: Request) -> bytes:
+    # Read by an async dependency, the sync endpoints run in the threadpool
+    return await request.body()
+
+
+BodyDep = Annotated[bytes, Depends(get_body)]
+
+
+def get_response_cache(request: Request) -> ResponseCache | None:
+    # Set up by the lifespan when enabled, see app.main
+    return getattr(request.app.state, "response_cache", None)
+
+
+ResponseCacheDep = Annotated[ResponseCache | None, Depends(get_response_cache)]
+
+
+def get_user_service(session: SessionDep, cache: ResponseCacheDep) -> UserService:
+    return UserService(
+        repository=UserSQLAlchemyRepository(session=session), cache=cache
+    )
+
+
+def get_post_service(session: SessionDep, cache: ResponseCacheDep) -> PostService:
+    return PostService(
+        repository=PostSQLAlchemyRepository(session=session), cache=cache
+    )
+
+
+def get_address_service(session: SessionDep) -> AddressService:
+    return AddressService(repository=AddressSQLAlchemyRepository(session=session))
+
+
+UserServiceDep = Annotated[UserService, Depends(get_user_service)]
+PostServiceDep = Annotated[PostService, Depends(get_post_service)]
+AddressServiceDep = Annotated[AddressService, Depends(get_address_service)]
+
+
+def get_loaders(user_service: UserServiceDep, post_service: PostServiceDep) -> Loaders:
+    # Dependencies are resolved once per request: so are the loaders
+    return Loaders(user_service, post_service)
+
+
+LoadersDep = Annotated[Loaders, Depends(get_loaders)]
@@ -0,0 +1,85 @@
+import uuid
+from typing import Annotated, Any, TypeVar
+
+from fastapi import Query
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, TypeAdapter, ValidationError, field_validator
+
+from app.domain.models.base import ExportFormat, ImportFormat, PaginationParams
+from app.domain.models.post import PostCreateDomain, PostUpdateDomain
+from app.domain.models.user import UserCreateDomain, UserUpdateDomain
+
+T = TypeVar("T")
+
+
+class ReadParams(BaseModel):
+    # Partial objects with only these fields (the others are not loaded)
+    fields: list[str] | None = None
+    # Rows mapped without the ORM, see the repositories `raw` option
+    raw: bool = False
+
+    @field_validator("fields")
+    @classmethod
+    def normalize_fields(cls, fields: list[str] | None) -> list[str] | None:
+        # Same fields, same representation (and cache key, and ETag)
+        return sorted(set(fields)) if fields is not None else None
+
+    def to_kwargs(self) -> dict[str, Any]:
+        kwargs: dict[str, Any] = {"raw": self.raw}
+        if self.fields is not None:
+            kwargs["fields"] = self.fields
+        return kwargs
+
+
+class UserReadParams(ReadParams):
+    include_posts: bool = False
+
+    def to_kwargs(self) -> dict[str, Any]:
+        return {**super().to_kwargs(), "include_posts": self.include_posts}
+
+
+# FastAPI takes a single model for the query parameters of an endpoint
+class ListParams(PaginationParams, ReadParams):
+    def to_pagination(self) -> PaginationParams:
+        return PaginationParams.model_validate(
+            self.model_dump(include=set(PaginationParams.model_fields))
+        )
+
+
+class UserListParams(ListParams, UserReadParams): ...
+
+
+ReadQuery = Annotated[ReadParams, Query()]
+UserReadQuery = Annotated[UserReadParams, Query()]
+ListQuery = Annotated[ListParams, Query()]
+UserListQuery = Annotated[UserListParams, Query()]
+ExportFormatQuery = Annotated[ExportFormat, Query(alias="format")]
+ImportFormatQuery = Annotated[ImportFormat, Query(alias="format")]
+
+# Bodies of the bulk endpoints, validated as a whole from the JSON bytes
+user_create_list = TypeAdapter(list[UserCreateDomain])
+user_update_map = TypeAdapter(dict[uuid.UUID, UserUpdateDomain])
+post_create_list = TypeAdapter(list[PostCreateDomain])
+post_update_map = TypeAdapter(dict[uuid.UUID, PostUpdateDomain])
+
+
+def validate_body(adapter: TypeAdapter[T], body: bytes) -> T:
+    """Validate the request body in one call, without parsing it first."""
+    try:
+        return adapter.validate_json(body)
+    except ValidationError as err:
+        errors = [
+            {**error, "loc": ("body", *error["loc"])}
+            for error in err.errors(include_url=False)
+        ]
+        raise RequestValidationError(errors, body=body) from err
+
+
+def body_schema(adapter: TypeAdapter[Any]) -> dict[str, Any]:
+    """`openapi_extra` documenting a body read with `validate_body`."""
+    return {
+        "requestBody": {
+            "content": {"application/json": {"schema": adapter.json_schema()}},
+            "required": True,
+        }
+    }
@@ -0,0 +1,33 @@
+import hashlib
+from typing import Annotated
+
+from fastapi import Header, Response, status
+from pydantic import BaseModel
+
+# Kept optional: without the header, the version is still read for the ETag
+IfNoneMatchHeader = Annotated[str | None, Header()]
+
+
+def make_etag(version: str, params: BaseModel) -> str:
+    """Strong ETag of a representation: the version of the data and the
+    query parameters shaping it (fields, raw, include_posts, page)."""
+    digest = hashlib.blake2b(version.encode(), digest_size=16)
+    digest.update(params.model_dump_json().encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    # If-None-Match uses the weak comparison (RFC 9110 13.1.2)
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag in tags
+
+
+class NotModifiedResponse(Response):
+    def __init__(self, etag: str) -> None:
+        super().__init__(
+            status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+        )
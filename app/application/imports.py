@@ -0,0 +1,119 @@
+import csv
+import io
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from typing import IO, Any, TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+from app.domain.models.address import AddressCreateDomain
+from app.domain.models.base import DomainModel, ImportFormat
+
+Model_T = TypeVar("Model_T", bound=DomainModel)
+
+# Row number and its JSON document, or its CSV fields
+ImportRecord = tuple[int, str | bytes | Mapping[str, Any]]
+CSVConverter = Callable[[dict[str, str | None]], Mapping[str, Any]]
+
+
+class ImportRowError(BaseModel):
+    row: int
+    errors: list[str]
+
+
+class ImportReport(BaseModel):
+    total: int = 0
+    imported: int = 0
+    errors: list[ImportRowError] = []
+
+
+def read_ndjson(file: IO[bytes]) -> Iterator[ImportRecord]:
+    for number, line in enumerate(file, start=1):
+        if line.strip():
+            yield number, line
+
+
+def read_csv(file: IO[bytes], convert: CSVConverter) -> Iterator[ImportRecord]:
+    """CSV rows with a header, numbered by their (last) line."""
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    try:
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, convert(row)
+    finally:
+        # Leave the file open to its owner
+        text.detach()
+
+
+def read_records(
+    file: IO[bytes], import_format: ImportFormat, convert: CSVConverter
+) -> Iterator[ImportRecord]:
+    if import_format is ImportFormat.CSV:
+        return read_csv(file, convert)
+    return read_ndjson(file)
+
+
+# Missing trailing fields are None
+def user_csv_record(row: dict[str, str | None]) -> Mapping[str, Any]:
+    # Flat address columns, as exported
+    address = {name: row.pop(name, None) for name in AddressCreateDomain.model_fields}
+    return {**row, "address": address}
+
+
+def post_csv_record(row: dict[str, str | None]) -> Mapping[str, Any]:
+    return {**row, "tags": parse_array(row.get("tags") or "")}
+
+
+def parse_array(value: str) -> list[str]:
+    """Items of a PostgreSQL array literal (`{a,"b c"}`), as exported."""
+    items = value.strip().removeprefix("{").removesuffix("}")
+    if not items:
+        return []
+    return next(csv.reader([items], escapechar="\\"))
+
+
+def run_import(
+    records: Iterable[ImportRecord],
+    schema: type[Model_T],
+    load: Callable[[Mapping[int, Model_T]], dict[int, str]],
+    chunk_size: int = 10_000,
+) -> ImportReport:
+    """Validate the records against `schema` and `load` them in chunks.
+
+    Only one chunk is held in memory at a time. Invalid records and the
+    ones rejected by `load` are reported by row, the others are imported.
+    """
+    report = ImportReport()
+    chunk: dict[int, Model_T] = {}
+
+    def flush() -> None:
+        for row, reason in load(chunk).items():
+            report.errors.append(ImportRowError(row=row, errors=[reason]))
+        chunk.clear()
+
+    for row, record in records:
+        report.total += 1
+        try:
+            if isinstance(record, str | bytes):
+                chunk[row] = schema.model_validate_json(record)
+            else:
+                chunk[row] = schema.model_validate(record)
+        except ValidationError as err:
+            report.errors.append(ImportRowError(row=row, errors=_format_errors(err)))
+
+        if len(chunk) >= chunk_size:
+            flush()
+    if chunk:
+        flush()
+
+    report.errors.sort(key=lambda error: error.row)
+    report.imported = report.total - len(report.errors)
+    return report
+
+
+def _format_errors(err: ValidationError) -> list[str]:
+    return [
+        ".".join(str(part) for part in error["loc"]) + f": {error['msg']}"
+        if error["loc"]
+        else error["msg"]
+        for error in err.errors(include_url=False)
+    ]
@@ -0,0 +1,42 @@
+import uuid
+
+from app.application.services.aio.post import AsyncPostService
+from app.application.services.aio.user import AsyncUserService
+from app.application.services.post import PostService
+from app.application.services.user import UserService
+from app.core.dataloader import AsyncDataLoader, DataLoader
+from app.domain.models.post import PostDomain
+from app.domain.models.user import UserDomain
+from app.infrastructure.exceptions import EntityNotFoundError
+
+
+def not_found(entity_id: uuid.UUID) -> Exception:
+    return EntityNotFoundError()
+
+
+class Loaders:
+    """Batching loaders of the entities by id, for the scope of a request.
+
+    e.g. the authors of a page of posts are loaded with one query:
+    `loaders.users.load_many(post.author_id for post in posts)`.
+    """
+
+    def __init__(self, user_service: UserService, post_service: PostService) -> None:
+        self.users: DataLoader[uuid.UUID, UserDomain] = DataLoader(
+            user_service.get_many, missing=not_found
+        )
+        self.posts: DataLoader[uuid.UUID, PostDomain] = DataLoader(
+            post_service.get_many, missing=not_found
+        )
+
+
+class AsyncLoaders:
+    def __init__(
+        self, user_service: AsyncUserService, post_service: AsyncPostService
+    ) -> None:
+        self.users: AsyncDataLoader[uuid.UUID, UserDomain] = AsyncDataLoader(
+            user_service.get_many, missing=not_found
+        )
+        self.posts: AsyncDataLoader[uuid.UUID, PostDomain] = AsyncDataLoader(
+            post_service.get_many, missing=not_found
+        )
@@ -0,0 +1,55 @@
+from collections.abc import Iterator, Sequence
+from typing import Any
+
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, TypeAdapter
+
+from app.domain.models.base import ExportFormat
+
+export_media_types = {
+    ExportFormat.CSV: "text/csv",
+    ExportFormat.BINARY: "application/octet-stream",
+}
+
+# Each item is serialized by its own model serializer
+_model_list = TypeAdapter(list[Any])
+
+
+class DomainResponse(Response):
+    """JSON response serialized in one pass by pydantic-core.
+
+    Domain objects are already validated: they are not converted again
+    through the route `response_model` and `jsonable_encoder`.
+    """
+
+    media_type = "application/json"
+
+    def __init__(
+        self,
+        content: BaseModel | Sequence[BaseModel],
+        status_code: int = 200,
+        exclude_unset: bool = False,
+        etag: str | None = None,
+    ) -> None:
+        self.exclude_unset = exclude_unset
+        headers = {"ETag": etag} if etag is not None else None
+        super().__init__(content=content, status_code=status_code, headers=headers)
+
+    def render(self, content: Any) -> bytes:
+        if not isinstance(content, BaseModel):
+            return _model_list.dump_json(content, exclude_unset=self.exclude_unset)
+        return content.__pydantic_serializer__.to_json(
+            content, exclude_unset=self.exclude_unset
+        )
+
+
+def export_response(
+    chunks: Iterator[bytes], name: str, export_format: ExportFormat
+) -> StreamingResponse:
+    extension = "csv" if export_format is ExportFormat.CSV else "bin"
+    return StreamingResponse(
+        chunks,
+        media_type=export_media_types[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{extension}"'},
+    )
@@ -0,0 +1,25 @@
+import uuid
+
+from fastapi import APIRouter
+
+from app.application.dependencies import AddressServiceDep
+from app.application.dtos import ListQuery, ReadQuery
+from app.application.responses import DomainResponse
+from app.domain.models.address import AddressDomain
+from app.domain.models.base import DomainPagination
+
+router = APIRouter(prefix="/addresses", tags=["addresses"])
+
+
+@router.get("", response_model=DomainPagination[AddressDomain])
+def get_addresses(service: AddressServiceDep, params: ListQuery) -> DomainResponse:
+    result = service.get_all(params.to_pagination(), **params.to_kwargs())
+    return DomainResponse(result, exclude_unset=params.fields is not None)
+
+
+@router.get("/{address_id}", response_model=AddressDomain)
+def get_address(
+    service: AddressServiceDep, address_id: uuid.UUID, params: ReadQuery
+) -> DomainResponse:
+    result = service.get_by_id(address_id, **params.to_kwargs())
+    return DomainResponse(result, exclude_unset=params.fields is not None)
@@ -0,0 +1,10 @@
+from fastapi import APIRouter, Response
+
+from app.core.metrics import CONTENT_TYPE, registry
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", include_in_schema=False)
+def get_metrics() -> Response:
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,168 @@
+import uuid
+from collections.abc import Iterator
+from typing import Annotated
+
+from fastapi import APIRouter, Query, Request, Response, UploadFile, status
+from fastapi.responses import StreamingResponse
+
+from app.application.cache import cached_response, get_cache_key
+from app.application.dependencies import (
+    BodyDep,
+    LoadersDep,
+    PostServiceDep,
+    ResponseCacheDep,
+    SessionmakerDep,
+    get_post_service,
+)
+from app.application.dtos import (
+    ExportFormatQuery,
+    ImportFormatQuery,
+    ListQuery,
+    ReadQuery,
+    body_schema,
+    post_create_list,
+    post_update_map,
+    validate_body,
+)
+from app.application.etags import (
+    IfNoneMatchHeader,
+    NotModifiedResponse,
+    etag_matches,
+    make_etag,
+)
+from app.application.imports import ImportReport, post_csv_record, read_records
+from app.application.responses import DomainResponse, export_response
+from app.application.services.post import PostService
+from app.domain.models.base import DomainPagination, ExportFormat, ImportFormat
+from app.domain.models.post import PostCreateDomain, PostDomain, PostUpdateDomain
+from app.domain.models.user import PostAuthorDomain
+
+router = APIRouter(prefix="/posts", tags=["posts"])
+
+
+@router.get("", response_model=DomainPagination[PostDomain])
+def get_posts(
+    request: Request,
+    service: PostServiceDep,
+    cache: ResponseCacheDep,
+    params: ListQuery,
+    if_none_match: IfNoneMatchHeader = None,
+) -> Response:
+    pagination, kwargs = params.to_pagination(), params.to_kwargs()
+
+    def load(if_none_match: str | None = None) -> Response:
+        etag = make_etag(service.get_page_version(pagination, **kwargs), params)
+        if etag_matches(if_none_match, etag):
+            return NotModifiedResponse(etag)
+
+        result = service.get_all(pagination, **kwargs)
+        return DomainResponse(
+            result, exclude_unset=params.fields is not None, etag=etag
+        )
+
+    if cache is None:
+        return load(if_none_match)
+
+    tags = [PostService.cache_tag]
+    key = get_cache_key(request, params)
+    return cached_response(cache, key, tags, load, if_none_match=if_none_match)
+
+
+# Declared before "/{post_id}" which would match it
+@router.get("/authors", response_model=list[PostAuthorDomain])
+def get_post_authors(
+    loaders: LoadersDep, post_ids: Annotated[list[uuid.UUID], Query(alias="id")]
+) -> DomainResponse:
+    # Two queries whatever the number of posts: the posts, then their authors
+    queued = [loaders.posts.load(post_id) for post_id in post_ids]
+    posts = [post.get() for post in queued]
+    authors = [loaders.users.load(post.author_id) for post in posts]
+    return DomainResponse(
+        [
+            PostAuthorDomain(post_id=post.id, author=author.get())
+            for post, author in zip(posts, authors, strict=True)
+        ]
+    )
+
+
+@router.get("/export", response_class=StreamingResponse)
+def export_posts(
+    sessionmaker: SessionmakerDep,
+    export_format: ExportFormatQuery = ExportFormat.CSV,
+) -> StreamingResponse:
+    def stream() -> Iterator[bytes]:
+        with sessionmaker() as session:
+            service = get_post_service(session, cache=None)
+            yield from service.export(export_format)
+
+    return export_response(stream(), "posts", export_format)
+
+
+@router.get("/{post_id}", response_model=PostDomain)
+def get_post(
+    service: PostServiceDep,
+    post_id: uuid.UUID,
+    params: ReadQuery,
+    if_none_match: IfNoneMatchHeader = None,
+) -> Response:
+    # The version is read first: a concurrent update makes the ETag stale,
+    # never the response.
+    kwargs = params.to_kwargs()
+    etag = make_etag(service.get_version(post_id, **kwargs), params)
+    if etag_matches(if_none_match, etag):
+        return NotModifiedResponse(etag)
+
+    result = service.get_by_id(post_id, **kwargs)
+    return DomainResponse(result, exclude_unset=params.fields is not None, etag=etag)
+
+
+@router.post("", response_model=PostDomain, status_code=status.HTTP_201_CREATED)
+def create_post(service: PostServiceDep, data: PostCreateDomain) -> DomainResponse:
+    return DomainResponse(service.create(data), status_code=status.HTTP_201_CREATED)
+
+
+@router.post("/import", response_model=ImportReport)
+def import_posts(
+    service: PostServiceDep,
+    file: UploadFile,
+    import_format: ImportFormatQuery = ImportFormat.NDJSON,
+) -> DomainResponse:
+    # The upload is spooled to disk and read as it is validated, in chunks
+    records = read_records(file.file, import_format, post_csv_record)
+    return DomainResponse(service.import_records(records))
+
+
+@router.post(
+    "/bulk",
+    response_model=list[PostDomain],
+    status_code=status.HTTP_201_CREATED,
+    openapi_extra=body_schema(post_create_list),
+)
+def create_posts(service: PostServiceDep, body: BodyDep) -> DomainResponse:
+    data = validate_body(post_create_list, body)
+    return DomainResponse(
+        service.create_many(data), status_code=status.HTTP_201_CREATED
+    )
+
+
+# Declared before "/{post_id}" which would match it
+@router.patch(
+    "/bulk",
+    response_model=list[PostDomain],
+    openapi_extra=body_schema(post_update_map),
+)
+def update_posts(service: PostServiceDep, body: BodyDep) -> DomainResponse:
+    data = validate_body(post_update_map, body)
+    return DomainResponse(service.update_many(data))
+
+
+@router.patch("/{post_id}", response_model=PostDomain)
+def update_post(
+    service: PostServiceDep, post_id: uuid.UUID, data: PostUpdateDomain
+) -> DomainResponse:
+    return DomainResponse(service.update(post_id, data))
+
+
+@router.delete("/{post_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_post(service: PostServiceDep, post_id: uuid.UUID) -> None:
+    service.delete(post_id)
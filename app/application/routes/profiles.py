@@ -0,0 +1,39 @@
+import hmac
+import uuid
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+
+from app.core.config import Settings, get_settings
+from app.core.profiling import ProfileReport, profile_store
+
+router = APIRouter(prefix="/profiles", tags=["profiles"])
+
+
+def check_profiling_token(
+    settings: Annotated[Settings, Depends(get_settings)],
+    x_profile: Annotated[str | None, Header()] = None,
+) -> None:
+    if not is_profiling_token(settings, x_profile):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
+
+
+def is_profiling_token(settings: Settings, token: str | None) -> bool:
+    return (
+        settings.PROFILING_TOKEN is not None
+        and token is not None
+        # compare_digest only accepts ASCII str
+        and hmac.compare_digest(settings.PROFILING_TOKEN.encode(), token.encode())
+    )
+
+
+@router.get(
+    "/{profile_id}",
+    dependencies=[Depends(check_profiling_token)],
+    include_in_schema=False,
+)
+def get_profile(profile_id: uuid.UUID) -> ProfileReport:
+    report = profile_store.get(profile_id)
+    if report is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    return report
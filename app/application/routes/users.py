@@ -0,0 +1,152 @@
+import uuid
+from collections.abc import Iterator
+
+from fastapi import APIRouter, Request, Response, UploadFile, status
+from fastapi.responses import StreamingResponse
+
+from app.application.cache import cached_response, get_cache_key
+from app.application.dependencies import (
+    BodyDep,
+    ResponseCacheDep,
+    SessionmakerDep,
+    UserServiceDep,
+    get_user_service,
+)
+from app.application.dtos import (
+    ExportFormatQuery,
+    ImportFormatQuery,
+    UserListQuery,
+    UserReadQuery,
+    body_schema,
+    user_create_list,
+    user_update_map,
+    validate_body,
+)
+from app.application.etags import (
+    IfNoneMatchHeader,
+    NotModifiedResponse,
+    etag_matches,
+    make_etag,
+)
+from app.application.imports import ImportReport, read_records, user_csv_record
+from app.application.responses import DomainResponse, export_response
+from app.application.services.post import PostService
+from app.application.services.user import UserService
+from app.domain.models.base import DomainPagination, ExportFormat, ImportFormat
+from app.domain.models.user import UserCreateDomain, UserDomain, UserUpdateDomain
+
+router = APIRouter(prefix="/users", tags=["users"])
+
+
+@router.get("", response_model=DomainPagination[UserDomain])
+def get_users(
+    request: Request,
+    service: UserServiceDep,
+    cache: ResponseCacheDep,
+    params: UserListQuery,
+    if_none_match: IfNoneMatchHeader = None,
+) -> Response:
+    pagination, kwargs = params.to_pagination(), params.to_kwargs()
+
+    def load(if_none_match: str | None = None) -> Response:
+        etag = make_etag(service.get_page_version(pagination, **kwargs), params)
+        if etag_matches(if_none_match, etag):
+            return NotModifiedResponse(etag)
+
+        result = service.get_all(pagination, **kwargs)
+        return DomainResponse(
+            result, exclude_unset=params.fields is not None, etag=etag
+        )
+
+    if cache is None:
+        return load(if_none_match)
+
+    tags = [UserService.cache_tag]
+    if params.include_posts:
+        tags.append(PostService.cache_tag)
+    key = get_cache_key(request, params)
+    return cached_response(cache, key, tags, load, if_none_match=if_none_match)
+
+
+# Declared before "/{user_id}" which would match it
+@router.get("/export", response_class=StreamingResponse)
+def export_users(
+    sessionmaker: SessionmakerDep,
+    export_format: ExportFormatQuery = ExportFormat.CSV,
+) -> StreamingResponse:
+    def stream() -> Iterator[bytes]:
+        with sessionmaker() as session:
+            service = get_user_service(session, cache=None)
+            yield from service.export(export_format)
+
+    return export_response(stream(), "users", export_format)
+
+
+@router.get("/{user_id}", response_model=UserDomain)
+def get_user(
+    service: UserServiceDep,
+    user_id: uuid.UUID,
+    params: UserReadQuery,
+    if_none_match: IfNoneMatchHeader = None,
+) -> Response:
+    # The version is read first: a concurrent update makes the ETag stale,
+    # never the response.
+    kwargs = params.to_kwargs()
+    etag = make_etag(service.get_version(user_id, **kwargs), params)
+    if etag_matches(if_none_match, etag):
+        return NotModifiedResponse(etag)
+
+    result = service.get_by_id(user_id, **kwargs)
+    return DomainResponse(result, exclude_unset=params.fields is not None, etag=etag)
+
+
+@router.post("", response_model=UserDomain, status_code=status.HTTP_201_CREATED)
+def create_user(service: UserServiceDep, data: UserCreateDomain) -> DomainResponse:
+    return DomainResponse(service.create(data), status_code=status.HTTP_201_CREATED)
+
+
+@router.post("/import", response_model=ImportReport)
+def import_users(
+    service: UserServiceDep,
+    file: UploadFile,
+    import_format: ImportFormatQuery = ImportFormat.NDJSON,
+) -> DomainResponse:
+    # The upload is spooled to disk and read as it is validated, in chunks
+    records = read_records(file.file, import_format, user_csv_record)
+    return DomainResponse(service.import_records(records))
+
+
+@router.post(
+    "/bulk",
+    response_model=list[UserDomain],
+    status_code=status.HTTP_201_CREATED,
+    openapi_extra=body_schema(user_create_list),
+)
+def create_users(service: UserServiceDep, body: BodyDep) -> DomainResponse:
+    data = validate_body(user_create_list, body)
+    return DomainResponse(
+        service.create_many(data), status_code=status.HTTP_201_CREATED
+    )
+
+
+# Declared before "/{user_id}" which would match it
+@router.patch(
+    "/bulk",
+    response_model=list[UserDomain],
+    openapi_extra=body_schema(user_update_map),
+)
+def update_users(service: UserServiceDep, body: BodyDep) -> DomainResponse:
+    data = validate_body(user_update_map, body)
+    return DomainResponse(service.update_many(data))
+
+
+@router.patch("/{user_id}", response_model=UserDomain)
+def update_user(
+    service: UserServiceDep, user_id: uuid.UUID, data: UserUpdateDomain
+) -> DomainResponse:
+    return DomainResponse(service.update(user_id, data))
+
+
+@router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_user(service: UserServiceDep, user_id: uuid.UUID) -> None:
+    service.delete(user_id)
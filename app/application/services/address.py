@@ -1,6 +1,8 @@
 import uuid
+from collections.abc import Iterator, Mapping
 from typing import Any, Never
 
+from app.core.profiling import profile_methods
 from app.domain.models.address import (
     AddressDomain,
 )
@@ -8,6 +10,7 @@ from app.domain.models.base import DomainPagination, PaginationParams
 from app.domain.repository import AbstractRepository
 
 
+@profile_methods("service")
 class AddressService:
     def __init__(
         self,
@@ -22,3 +25,19 @@ class AddressService:
 
     def get_by_id(self, entity_id: uuid.UUID, /, **kwargs: Any) -> AddressDomain:
         return self.repository.get_by_id(entity_id, **kwargs)
+
+    def iter_all(
+        self,
+        batch_size: int = 1_000,
+        filters: Mapping[str, Any] | None = None,
+        **kwargs: Any,
+    ) -> Iterator[AddressDomain]:
+        return self.repository.iter_all(batch_size, filters=filters, **kwargs)
+
+    def iter_batches(
+        self,
+        batch_size: int = 1_000,
+        filters: Mapping[str, Any] | None = None,
+        **kwargs: Any,
+    ) -> Iterator[list[AddressDomain]]:
+        return self.repository.iter_batches(batch_size, filters=filters, **kwargs)
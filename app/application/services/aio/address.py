@@ -0,0 +1,43 @@
+import uuid
+from collections.abc import AsyncIterator, Mapping
+from typing import Any, Never
+
+from app.core.profiling import profile_methods
+from app.domain.models.address import (
+    AddressDomain,
+)
+from app.domain.models.base import DomainPagination, PaginationParams
+from app.domain.repository import AbstractAsyncRepository
+
+
+@profile_methods("service")
+class AsyncAddressService:
+    def __init__(
+        self,
+        repository: AbstractAsyncRepository[AddressDomain, Never, Never],
+    ) -> None:
+        self.repository = repository
+
+    async def get_all(
+        self, pagination: PaginationParams | None = None, **kwargs: Any
+    ) -> DomainPagination[AddressDomain]:
+        return await self.repository.get_all(pagination=pagination, **kwargs)
+
+    async def get_by_id(self, entity_id: uuid.UUID, /, **kwargs: Any) -> AddressDomain:
+        return await self.repository.get_by_id(entity_id, **kwargs)
+
+    def iter_all(
+        self,
+        batch_size: int = 1_000,
+        filters: Mapping[str, Any] | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[AddressDomain]:
+        return self.repository.iter_all(batch_size, filters=filters, **kwargs)
+
+    def iter_batches(
+        self,
+        batch_size: int = 1_000,
+        filters: Mapping[str, Any] | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[list[AddressDomain]]:
+        return self.repository.iter_batches(batch_size, filters=filters, **kwargs)
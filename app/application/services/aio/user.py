@@ -0,0 +1,95 @@
+import uuid
+from collections.abc import AsyncIterator, Collection, Mapping, Sequence
+from typing import Any, ClassVar
+
+from app.core.profiling import profile_methods
+from app.core.singleflight import AsyncSingleFlight, freeze
+from app.domain.models.base import DomainPagination, ExportFormat, PaginationParams
+from app.domain.models.user import UserCreateDomain, UserDomain, UserUpdateDomain
+from app.domain.repository import AbstractAsyncRepository
+
+
+@profile_methods("service")
+class AsyncUserService:
+    # Identical concurrent reads share one execution, across the instances
+    flights: ClassVar[AsyncSingleFlight] = AsyncSingleFlight("user")
+
+    def __init__(
+        self,
+        repository: AbstractAsyncRepository[
+            UserDomain, UserCreateDomain, UserUpdateDomain
+        ],
+    ) -> None:
+        self.repository = repository
+
+    async def get_all(
+        self, pagination: PaginationParams | None = None, **kwargs: Any
+    ) -> DomainPagination[UserDomain]:
+        return await self.flights.do(
+            ("get_all", freeze(pagination), freeze(kwargs)),
+            lambda: self.repository.get_all(pagination=pagination, **kwargs),
+        )
+
+    async def get_by_id(self, entity_id: uuid.UUID, /, **kwargs: Any) -> UserDomain:
+        return await self.flights.do(
+            ("get_by_id", entity_id, freeze(kwargs)),
+            lambda: self.repository.get_by_id(entity_id, **kwargs),
+        )
+
+    async def get_many(
+        self, entity_ids: Collection[uuid.UUID], /, **kwargs: Any
+    ) -> dict[uuid.UUID, UserDomain]:
+        return await self.repository.get_many(entity_ids, **kwargs)
+
+    async def get_version(self, entity_id: uuid.UUID, /, **kwargs: Any) -> str:
+        return await self.repository.get_version(entity_id, **kwargs)
+
+    async def get_page_version(
+        self, pagination: PaginationParams | None = None, **kwargs: Any
+    ) -> str:
+        return await self.repository.get_page_version(pagination=pagination, **kwargs)
+
+    def iter_all(
+        self,
+        batch_size: int = 1_000,
+        filters: Mapping[str, Any] | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[UserDomain]:
+        return self.repository.iter_all(batch_size, filters=filters, **kwargs)
+
+    def iter_batches(
+        self,
+        batch_size: int = 1_000,
+        filters: Mapping[str, Any] | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[list[UserDomain]]:
+        return self.repository.iter_batches(batch_size, filters=filters, **kwargs)
+
+    def export(
+        self, export_format: ExportFormat = ExportFormat.CSV
+    ) -> AsyncIterator[bytes]:
+        return self.repository.copy_to(export_format)
+
+    async def create(self, data: UserCreateDomain) -> UserDomain:
+        return await self.repository.create(data)
+
+    async def update(
+        self, entity_id: uuid.UUID, data: UserUpdateDomain, /
+    ) -> UserDomain:
+        return await self.repository.update(entity_id, data)
+
+    async def delete(self, entity_id: uuid.UUID, /) -> None:
+        await self.repository.delete(entity_id)
+
+    async def create_many(
+        self, data: Sequence[UserCreateDomain], /
+    ) -> list[UserDomain]:
+        return await self.repository.create_many(data)
+
+    async def update_many(
+        self, data: Mapping[uuid.UUID, UserUpdateDomain], /
+    ) -> list[UserDomain]:
+        return await self.repository.update_many(data)
+
+    async def delete_many(self, entity_ids: Sequence[uuid.UUID], /) -> None:
+        await self.repository.delete_many(entity_ids)
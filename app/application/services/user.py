@@ -1,31 +1,120 @@
 import uuid
-from typing import Any
+from collections.abc import Collection, Iterable, Iterator, Mapping, Sequence
+from typing import Any, ClassVar
 
-from app.domain.models.base import DomainPagination, PaginationParams
+from app.application.cache import ResponseCache
+from app.application.imports import ImportRecord, ImportReport, run_import
+from app.application.services.post import PostService
+from app.core.profiling import profile_methods
+from app.core.singleflight import SingleFlight, freeze
+from app.domain.models.base import DomainPagination, ExportFormat, PaginationParams
 from app.domain.models.user import UserCreateDomain, UserDomain, UserUpdateDomain
 from app.domain.repository import AbstractRepository
 
 
+@profile_methods("service")
 class UserService:
+    # Tag of the cached responses built from these entities
+    cache_tag: ClassVar[str] = "user"
+    # Identical concurrent reads share one execution, across the instances
+    flights: ClassVar[SingleFlight] = SingleFlight("user")
+
     def __init__(
         self,
         repository: AbstractRepository[UserDomain, UserCreateDomain, UserUpdateDomain],
+        cache: ResponseCache | None = None,
     ) -> None:
         self.repository = repository
+        self.cache = cache
 
     def get_all(
         self, pagination: PaginationParams | None = None, **kwargs: Any
     ) -> DomainPagination[UserDomain]:
-        return self.repository.get_all(pagination=pagination, **kwargs)
+        return self.flights.do(
+            ("get_all", freeze(pagination), freeze(kwargs)),
+            lambda: self.repository.get_all(pagination=pagination, **kwargs),
+        )
 
     def get_by_id(self, entity_id: uuid.UUID, /, **kwargs: Any) -> UserDomain:
-        return self.repository.get_by_id(entity_id, **kwargs)
+        return self.flights.do(
+            ("get_by_id", entity_id, freeze(kwargs)),
+            lambda: self.repository.get_by_id(entity_id, **kwargs),
+        )
+
+    def get_many(
+        self, entity_ids: Collection[uuid.UUID], /, **kwargs: Any
+    ) -> dict[uuid.UUID, UserDomain]:
+        return self.repository.get_many(entity_ids, **kwargs)
+
+    def get_version(self, entity_id: uuid.UUID, /, **kwargs: Any) -> str:
+        return self.repository.get_version(entity_id, **kwargs)
+
+    def get_page_version(
+        self, pagination: PaginationParams | None = None, **kwargs: Any
+    ) -> str:
+        return self.repository.get_page_version(pagination=pagination, **kwargs)
+
+    def iter_all(
+        self,
+        batch_size: int = 1_000,
+        filters: Mapping[str, Any] | None = None,
+        **kwargs: Any,
+    ) -> Iterator[UserDomain]:
+        return self.repository.iter_all(batch_size, filters=filters, **kwargs)
+
+    def iter_batches(
+        self,
+        batch_size: int = 1_000,
+        filters: Mapping[str, Any] | None = None,
+        **kwargs: Any,
+    ) -> Iterator[list[UserDomain]]:
+        return self.repository.iter_batches(batch_size, filters=filters, **kwargs)
+
+    def export(self, export_format: ExportFormat = ExportFormat.CSV) -> Iterator[bytes]:
+        return self.repository.copy_to(export_format)
+
+    def import_records(
+        self, records: Iterable[ImportRecord], chunk_size: int = 10_000
+    ) -> ImportReport:
+        """Validate and insert the records, each chunk in its own transaction."""
+        try:
+            return run_import(
+                records, UserCreateDomain, self.repository.copy_from, chunk_size
+            )
+        finally:
+            # The chunks loaded before a failure are committed
+            self._invalidate(self.cache_tag)
 
     def create(self, data: UserCreateDomain) -> UserDomain:
-        return self.repository.create(data)
+        result = self.repository.create(data)
+        self._invalidate(self.cache_tag)
+        return result
 
     def update(self, entity_id: uuid.UUID, data: UserUpdateDomain, /) -> UserDomain:
-        return self.repository.update(entity_id, data)
+        result = self.repository.update(entity_id, data)
+        self._invalidate(self.cache_tag)
+        return result
 
     def delete(self, entity_id: uuid.UUID, /) -> None:
         self.repository.delete(entity_id)
+        self._invalidate(self.cache_tag, PostService.cache_tag)
+
+    def create_many(self, data: Sequence[UserCreateDomain], /) -> list[UserDomain]:
+        result = self.repository.create_many(data)
+        self._invalidate(self.cache_tag)
+        return result
+
+    def update_many(
+        self, data: Mapping[uuid.UUID, UserUpdateDomain], /
+    ) -> list[UserDomain]:
+        result = self.repository.update_many(data)
+        self._invalidate(self.cache_tag)
+        return result
+
+    def delete_many(self, entity_ids: Sequence[uuid.UUID], /) -> None:
+        self.repository.delete_many(entity_ids)
+        self._invalidate(self.cache_tag, PostService.cache_tag)
+
+    def _invalidate(self, *tags: str) -> None:
+        if self.cache is not None:
+            self.cache.invalidate(*tags)
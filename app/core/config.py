@@ -1,7 +1,11 @@
+import functools
+
 from pydantic import PostgresDsn, computed_field
 from pydantic_core import MultiHostUrl
 from pydantic_settings import BaseSettings
 
+from app.core.profiling import ProfilingMode
+
 
 class Settings(BaseSettings):
     POSTGRES_USER: str
@@ -10,6 +14,37 @@ class Settings(BaseSettings):
     POSTGRES_PORT: int = 5432
     POSTGRES_DB: str
 
+    # Connection pool of the application engine, see app.infrastructure.database
+    DATABASE_POOL_SIZE: int = 10
+    DATABASE_MAX_OVERFLOW: int = 10
+    # Seconds to wait for a connection when all of them are in use
+    DATABASE_POOL_TIMEOUT: float = 30.0
+    # Seconds after which a connection is replaced, -1 to keep them
+    DATABASE_POOL_RECYCLE: int = 1800
+    DATABASE_POOL_PRE_PING: bool = True
+    # Open the pool_size connections at startup, before the first requests
+    DATABASE_POOL_WARMUP: bool = True
+    DATABASE_APPLICATION_NAME: str = "app"
+    # Milliseconds, no limit (the server default) without it
+    DATABASE_STATEMENT_TIMEOUT: int | None = None
+
+    # Keep every query of the requests, for the slowest one in the logs. The
+    # X-Query-Count and Server-Timing headers only need the counts without it.
+    QUERY_RECORDING: bool = False
+
+    # Requests sent with this token (X-Profile header or profile query
+    # parameter) are profiled, profiling is disabled without it.
+    PROFILING_TOKEN: str | None = None
+    PROFILING_MODE: ProfilingMode = "sampling"
+    PROFILING_INTERVAL: float = 0.001
+    # Allocation statistics of the requests, service methods and converters
+    MEMORY_TRACKING: bool = False
+    MEMORY_TRACKING_FRAMES: int = 1
+    # Responses of the list endpoints are cached for this many seconds,
+    # the cache is disabled without it.
+    RESPONSE_CACHE_TTL: float | None = None
+    RESPONSE_CACHE_MAXSIZE: int = 1_000
+
     @computed_field  # type: ignore[prop-decorator]
     @property
     def SQLALCHEMY_DATABASE_URI(self) -> PostgresDsn:
@@ -32,3 +67,8 @@ class Settings(BaseSettings):
             f"host={self.POSTGRES_SERVER} "
             f"port={self.POSTGRES_PORT}"
         )
+
+
+@functools.lru_cache
+def get_settings() -> Settings:
+    return Settings()  # type: ignore
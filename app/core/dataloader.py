@@ -0,0 +1,149 @@
+import asyncio
+import threading
+from collections.abc import Awaitable, Callable, Hashable, Iterable, Mapping
+from typing import Any, Generic, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class Deferred(Generic[K, V]):
+    """Result of a key queued by `DataLoader.load`, loaded when first read."""
+
+    __slots__ = ("key", "loader")
+
+    def __init__(self, loader: "DataLoader[K, V]", key: K) -> None:
+        self.loader = loader
+        self.key = key
+
+    def get(self) -> V:
+        result = self.loader.get_result(self.key)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+class DataLoader(Generic[K, V]):
+    """Loads the keys requested within a scope (e.g. a request) in batches.
+
+    `load` only queues the key: the first read of a result loads all the
+    queued keys at once with `batch_load`. The results are kept for the
+    scope, a key is loaded at most once. Keys left out of the batch result
+    get the error made by `missing`.
+    """
+
+    def __init__(
+        self,
+        batch_load: Callable[[list[K]], Mapping[K, V]],
+        missing: Callable[[K], Exception],
+    ) -> None:
+        self.batch_load = batch_load
+        self.missing = missing
+        self._lock = threading.RLock()
+        self._queue: dict[K, None] = {}
+        self._results: dict[K, V | Exception] = {}
+
+    def load(self, key: K) -> Deferred[K, V]:
+        with self._lock:
+            if key not in self._results:
+                self._queue[key] = None
+        return Deferred(self, key)
+
+    def load_many(self, keys: Iterable[K]) -> list[V | Exception]:
+        """Results in the order of `keys`, with the error of the missing ones."""
+        deferred = [self.load(key) for key in keys]
+        return [self.get_result(item.key) for item in deferred]
+
+    def get_result(self, key: K) -> V | Exception:
+        with self._lock:
+            if key not in self._results:
+                self._queue[key] = None
+                self.dispatch()
+            return self._results[key]
+
+    def dispatch(self) -> None:
+        """Load the queued keys now."""
+        with self._lock:
+            keys = list(self._queue)
+            self._queue.clear()
+            if not keys:
+                return
+            found = self.batch_load(keys)
+            for key in keys:
+                self._results[key] = found[key] if key in found else self.missing(key)
+
+    def clear(self, *keys: K) -> None:
+        """Forget the results of `keys` (all of them by default), after a write."""
+        with self._lock:
+            if not keys:
+                self._results.clear()
+            for key in keys:
+                self._results.pop(key, None)
+
+
+class AsyncDataLoader(Generic[K, V]):
+    """`DataLoader` for coroutines: the keys requested within one iteration
+    of the event loop are loaded together."""
+
+    def __init__(
+        self,
+        batch_load: Callable[[list[K]], Awaitable[Mapping[K, V]]],
+        missing: Callable[[K], Exception],
+    ) -> None:
+        self.batch_load = batch_load
+        self.missing = missing
+        self._queue: list[K] = []
+        # Results of the missing keys are their error, raised by `load`
+        self._futures: dict[K, asyncio.Future[V | Exception]] = {}
+        # Keeps a reference to the running batches
+        self._tasks: set[asyncio.Task[Any]] = set()
+
+    async def load(self, key: K) -> V:
+        # A caller being cancelled doesn't cancel the result for the others
+        result = await asyncio.shield(self._enqueue(key))
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def load_many(self, keys: Iterable[K]) -> list[V | Exception]:
+        """Results in the order of `keys`, with the error of the missing ones."""
+        futures = [self._enqueue(key) for key in keys]
+        return await asyncio.shield(asyncio.gather(*futures))
+
+    def clear(self, *keys: K) -> None:
+        for key in keys or list(self._futures):
+            future = self._futures.get(key)
+            if future is not None and future.done():
+                del self._futures[key]
+
+    def _enqueue(self, key: K) -> asyncio.Future[V | Exception]:
+        future = self._futures.get(key)
+        if future is not None:
+            return future
+
+        loop = asyncio.get_running_loop()
+        future = self._futures[key] = loop.create_future()
+        if not self._queue:
+            loop.call_soon(self._dispatch)
+        self._queue.append(key)
+        return future
+
+    def _dispatch(self) -> None:
+        keys, self._queue = self._queue, []
+        task = asyncio.ensure_future(self._load(keys))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _load(self, keys: list[K]) -> None:
+        try:
+            found = await self.batch_load(keys)
+        except Exception as err:
+            for key in keys:
+                # Loaded again by the next request for it
+                self._futures.pop(key).set_exception(err)
+            return
+
+        for key in keys:
+            self._futures[key].set_result(
+                found[key] if key in found else self.missing(key)
+            )
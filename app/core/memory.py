@@ -0,0 +1,199 @@
+import contextvars
+import threading
+import tracemalloc
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+
+from pydantic import BaseModel
+
+from app.core.metrics import Gauge, Metric
+
+
+class AllocationSite(BaseModel):
+    location: str
+    size: int
+    count: int
+
+
+class MemoryStats(BaseModel):
+    name: str
+    calls: int
+    max_peak: int
+    total_peak: int
+    # Allocation sites of the call with the highest peak (tracked from the root)
+    top: list[AllocationSite]
+
+    @property
+    def mean_peak(self) -> float:
+        return self.total_peak / self.calls
+
+
+def _take_snapshot() -> tracemalloc.Snapshot:
+    return tracemalloc.take_snapshot().filter_traces(
+        [tracemalloc.Filter(False, tracemalloc.__file__)]
+    )
+
+
+class MemoryTracking:
+    """Peak allocation (in bytes) of a tracked block, above its start."""
+
+    def __init__(self, name: str, root: bool) -> None:
+        self.name = name
+        self.root = root
+        self.start, _ = tracemalloc.get_traced_memory()
+        self.peak = 0
+        self.top: list[AllocationSite] = []
+        self._snapshot = _take_snapshot() if root else None
+
+    def checkpoint(self) -> None:
+        """Save the peak before a nested block resets it."""
+        _, peak = tracemalloc.get_traced_memory()
+        self.peak = max(self.peak, peak - self.start)
+
+    def stop(self, limit: int) -> None:
+        self.checkpoint()
+        if self._snapshot is None:
+            return
+        differences = _take_snapshot().compare_to(self._snapshot, "lineno")
+        self.top = [
+            AllocationSite(
+                location=str(difference.traceback),
+                size=difference.size_diff,
+                count=difference.count_diff,
+            )
+            for difference in differences[:limit]
+            if difference.size_diff > 0
+        ]
+        self._snapshot = None
+
+
+class _MemoryCounters:
+    __slots__ = ("calls", "max_peak", "top", "total_peak")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.max_peak = 0
+        self.total_peak = 0
+        self.top: list[AllocationSite] = []
+
+    def add(self, tracking: MemoryTracking) -> None:
+        self.calls += 1
+        self.total_peak += tracking.peak
+        if tracking.peak >= self.max_peak:
+            self.max_peak = tracking.peak
+            self.top = tracking.top or self.top
+
+
+_trackings: contextvars.ContextVar[tuple[MemoryTracking, ...]] = contextvars.ContextVar(
+    "memory_trackings", default=()
+)
+
+
+class MemoryTracker:
+    """Opt-in tracemalloc statistics of requests and service calls, by name.
+
+    tracemalloc slows every allocation down and its peak is process-wide:
+    one root tracking (a request, or a service call outside of a request)
+    runs at a time, concurrent ones are skipped. Nested trackings (service
+    methods and converters) only record their peak, the root also records
+    the top allocation sites, from snapshots taken at its start and end.
+    """
+
+    def __init__(self) -> None:
+        self._enabled = False
+        self._limit = 10
+        self._lock = threading.Lock()
+        self._root_lock = threading.Lock()
+        self._stats: dict[str, _MemoryCounters] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    def enable(self, frames: int = 1, limit: int = 10) -> None:
+        self._limit = limit
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        self._enabled = True
+
+    def disable(self) -> None:
+        self._enabled = False
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    @contextmanager
+    def track(self, name: str) -> Iterator[MemoryTracking | None]:
+        """Track the block, its name can be changed until it ends."""
+        trackings = _trackings.get()
+        if not self._enabled or not tracemalloc.is_tracing():
+            yield None
+            return
+
+        root = not trackings
+        if root and not self._root_lock.acquire(blocking=False):
+            yield None
+            return
+
+        try:
+            if trackings:
+                trackings[-1].checkpoint()
+            tracking = MemoryTracking(name, root=root)
+            tracemalloc.reset_peak()
+            token = _trackings.set((*trackings, tracking))
+            try:
+                yield tracking
+            finally:
+                _trackings.reset(token)
+                tracking.stop(self._limit)
+                self._add(tracking)
+        finally:
+            if root:
+                self._root_lock.release()
+
+    def get_stats(self, limit: int | None = None) -> list[MemoryStats]:
+        """Snapshot of the statistics, the highest peaks first."""
+        with self._lock:
+            stats = [
+                MemoryStats(
+                    name=name,
+                    calls=counters.calls,
+                    max_peak=counters.max_peak,
+                    total_peak=counters.total_peak,
+                    top=list(counters.top),
+                )
+                for name, counters in self._stats.items()
+            ]
+
+        stats.sort(key=lambda item: item.max_peak, reverse=True)
+        return stats[:limit]
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    def _add(self, tracking: MemoryTracking) -> None:
+        with self._lock:
+            counters = self._stats.get(tracking.name)
+            if counters is None:
+                counters = self._stats[tracking.name] = _MemoryCounters()
+            counters.add(tracking)
+
+
+memory_tracker = MemoryTracker()
+
+
+def collect_memory() -> Iterable[Metric]:
+    max_peak = Gauge(
+        "memory_peak_max_bytes",
+        "Highest allocation peak of the tracked requests and calls.",
+        ["name"],
+    )
+    mean_peak = Gauge(
+        "memory_peak_mean_bytes",
+        "Mean allocation peak of the tracked requests and calls.",
+        ["name"],
+    )
+    for stats in memory_tracker.get_stats():
+        max_peak.set(stats.max_peak, name=stats.name)
+        mean_peak.set(stats.mean_peak, name=stats.name)
+    return [max_peak, mean_peak]
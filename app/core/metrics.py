@@ -0,0 +1,223 @@
+import bisect
+import math
+import threading
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable, Sequence
+from typing import TypeVar
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+LabelValues = tuple[str, ...]
+Sample = tuple[str, dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format_sample(name: str, labels: dict[str, str], value: float) -> str:
+    if labels:
+        pairs = ",".join(f'{key}="{_escape(item)}"' for key, item in labels.items())
+        name = f"{name}{{{pairs}}}"
+    return f"{name} {_format_value(value)}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+class Metric(ABC):
+    type: str
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def samples(self) -> Iterable[Sample]: ...
+
+    def render(self) -> str:
+        lines = [
+            f"# TYPE {self.name} {self.type}",
+            f"# HELP {self.name} {_escape(self.documentation)}",
+            *(_format_sample(*sample) for sample in self.samples()),
+        ]
+        return "\n".join(lines)
+
+    def _label_values(self, labels: dict[str, str]) -> LabelValues:
+        if labels.keys() != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        return tuple(labels[name] for name in self.labelnames)
+
+    def _labels(self, values: LabelValues) -> dict[str, str]:
+        return dict(zip(self.labelnames, values, strict=True))
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> Iterable[Sample]:
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            yield f"{self.name}_total", self._labels(key), value
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def samples(self) -> Iterable[Sample]:
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            yield self.name, self._labels(key), value
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5),
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        # Per label values: count of each bucket (plus +Inf) and sum
+        self._values: dict[LabelValues, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        self.add(
+            [int(i == index) for i in range(len(self.buckets) + 1)], value, **labels
+        )
+
+    def add(self, counts: Sequence[int], total: float, **labels: str) -> None:
+        """Merge already bucketed observations, `counts` are not cumulative."""
+        key = self._label_values(labels)
+        with self._lock:
+            buckets, sums = self._values.setdefault(
+                key, ([0] * (len(self.buckets) + 1), [0.0])
+            )
+            for index, count in enumerate(counts):
+                buckets[index] += count
+            sums[0] += total
+
+    def samples(self) -> Iterable[Sample]:
+        with self._lock:
+            values = [
+                (key, list(buckets), sums[0])
+                for key, (buckets, sums) in self._values.items()
+            ]
+        for key, buckets, total in values:
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), buckets, strict=True):
+                cumulative += count
+                yield (
+                    f"{self.name}_bucket",
+                    {**labels, "le": _format_value(float(bound))},
+                    cumulative,
+                )
+            yield f"{self.name}_count", labels, cumulative
+            yield f"{self.name}_sum", labels, total
+
+
+Metric_T = TypeVar("Metric_T", bound=Metric)
+Collector = Callable[[], Iterable[Metric]]
+
+
+class MetricsRegistry:
+    """Metrics of the process, rendered in the OpenMetrics text format.
+
+    Collectors build metrics from other sources (pools, query statistics)
+    when rendered, so that nothing is computed between scrapes.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._metrics: dict[str, Metric] = {}
+        self._collectors: dict[str, Collector] = {}
+
+    def counter(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] | None = None,
+    ) -> Histogram:
+        if buckets is None:
+            return self.register(Histogram(name, documentation, labelnames))
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def register(self, metric: Metric_T) -> Metric_T:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def add_collector(self, name: str, collector: Collector) -> None:
+        """Add (or replace) the collector registered under `name`."""
+        with self._lock:
+            self._collectors[name] = collector
+
+    def remove_collector(self, name: str) -> None:
+        with self._lock:
+            self._collectors.pop(name, None)
+
+    def collect(self) -> list[Metric]:
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors.values())
+        for collector in collectors:
+            metrics.extend(collector())
+        return metrics
+
+    def render(self) -> str:
+        return "".join(f"{metric.render()}\n" for metric in self.collect()) + "# EOF\n"
+
+
+registry = MetricsRegistry()
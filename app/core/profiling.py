@@ -0,0 +1,326 @@
+import contextvars
+import cProfile
+import functools
+import inspect
+import io
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from types import FrameType
+from typing import Any, Literal, ParamSpec, TypeVar, cast
+
+from pydantic import BaseModel
+
+from app.core.memory import memory_tracker
+
+P = ParamSpec("P")
+R = TypeVar("R")
+Class_T = TypeVar("Class_T", bound=type)
+
+ProfilingMode = Literal["spans", "deterministic", "sampling"]
+
+# cProfile relies on sys.monitoring: one deterministic profile at a time
+_deterministic_lock = threading.Lock()
+
+
+class ProfileEntry(BaseModel):
+    category: str
+    name: str
+    calls: int
+    total_time: float
+    self_time: float
+
+
+class ProfileReport(BaseModel):
+    id: uuid.UUID
+    name: str
+    mode: ProfilingMode
+    duration: float
+    # Self time (ms) by category: http, service, repository, conversion, db
+    layers: dict[str, float]
+    entries: list[ProfileEntry]
+    stats: str | None = None
+    stacks: dict[str, int] | None = None
+
+
+class _Span:
+    __slots__ = ("category", "child_time", "name", "start")
+
+    def __init__(self, category: str, name: str) -> None:
+        self.category = category
+        self.name = name
+        self.start = time.perf_counter()
+        self.child_time = 0.0
+
+
+class Profile:
+    """Time spent in each layer of a single request.
+
+    Spans record the time of the profiled functions, minus the time of the
+    spans they contain. The "deterministic" mode adds cProfile statistics
+    and the "sampling" mode adds the stacks of the threads running spans,
+    sampled every `interval` seconds.
+
+    A thread is only sampled while it runs a span of the profile, the pooled
+    threads which served the request are not sampled once they serve others.
+    The event loop thread is shared though: while an async span awaits, the
+    samples include the other requests it runs.
+
+    Queries are added by SQLAlchemyInstrument (once instantiated).
+    """
+
+    def __init__(
+        self, name: str, mode: ProfilingMode = "spans", interval: float = 0.001
+    ) -> None:
+        self.id = uuid.uuid4()
+        self.name = name
+        self.mode: ProfilingMode = mode
+        self.interval = interval
+        self._lock = threading.Lock()
+        # Thread ident -> stack of the spans of the profile it is running
+        self._spans: dict[int, list[_Span]] = {}
+        # (category, name) -> [calls, total time, self time]
+        self._entries: dict[tuple[str, str], list[float]] = {}
+        self._stacks: Counter[str] = Counter()
+        self._profiler: cProfile.Profile | None = None
+        self._sampler: threading.Thread | None = None
+        self._running = threading.Event()
+        self._start = 0.0
+        self._duration = 0.0
+
+    @contextmanager
+    def span(self, category: str, name: str) -> Iterator[None]:
+        span = _Span(category, name)
+        ident = threading.get_ident()
+        with self._lock:
+            self._spans.setdefault(ident, []).append(span)
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - span.start
+            with self._lock:
+                stack = self._spans[ident]
+                stack.remove(span)
+                if not stack:
+                    del self._spans[ident]
+                self._add(ident, category, name, duration, span.child_time)
+
+    def add(self, category: str, name: str, duration: float) -> None:
+        """Record a leaf span which already ended (e.g. a query)."""
+        with self._lock:
+            self._add(threading.get_ident(), category, name, duration, 0.0)
+
+    def start(self) -> None:
+        self._start = time.perf_counter()
+        if self.mode == "deterministic":
+            if _deterministic_lock.acquire(blocking=False):
+                self._profiler = cProfile.Profile()
+                self._profiler.enable()
+            else:
+                self.mode = "spans"
+        elif self.mode == "sampling":
+            self._running.set()
+            self._sampler = threading.Thread(target=self._sample, daemon=True)
+            self._sampler.start()
+
+    def stop(self) -> None:
+        self._duration = time.perf_counter() - self._start
+        if self._profiler is not None:
+            self._profiler.disable()
+            _deterministic_lock.release()
+        if self._sampler is not None:
+            self._running.clear()
+            self._sampler.join()
+
+    def report(self, limit: int = 50) -> ProfileReport:
+        with self._lock:
+            entries = [
+                ProfileEntry(
+                    category=category,
+                    name=name,
+                    calls=int(calls),
+                    total_time=total_time * 1000,
+                    self_time=self_time * 1000,
+                )
+                for (category, name), (calls, total_time, self_time) in (
+                    self._entries.items()
+                )
+            ]
+            stacks = dict(self._stacks.most_common(limit))
+
+        layers: dict[str, float] = {}
+        for entry in entries:
+            layers[entry.category] = layers.get(entry.category, 0) + entry.self_time
+        entries.sort(key=lambda entry: entry.self_time, reverse=True)
+
+        stats = None
+        if self._profiler is not None:
+            output = io.StringIO()
+            pstats.Stats(self._profiler, stream=output).sort_stats(
+                "cumulative"
+            ).print_stats(limit)
+            stats = output.getvalue()
+
+        return ProfileReport(
+            id=self.id,
+            name=self.name,
+            mode=self.mode,
+            duration=self._duration * 1000,
+            layers=layers,
+            entries=entries[:limit],
+            stats=stats,
+            stacks=stacks if self.mode == "sampling" else None,
+        )
+
+    def _add(
+        self,
+        ident: int,
+        category: str,
+        name: str,
+        duration: float,
+        child_time: float,
+    ) -> None:
+        if stack := self._spans.get(ident):
+            stack[-1].child_time += duration
+        entry = self._entries.setdefault((category, name), [0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += duration
+        entry[2] += duration - child_time
+
+    def _sample(self) -> None:
+        while self._running.is_set():
+            with self._lock:
+                frames = sys._current_frames()  # pyright: ignore[reportPrivateUsage]
+                threads = [frames[ident] for ident in self._spans if ident in frames]
+                for frame in threads:
+                    self._stacks[_collapse(frame)] += 1
+            time.sleep(self.interval)
+
+
+def _collapse(frame: FrameType | None, depth: int = 64) -> str:
+    names: list[str] = []
+    while frame is not None and len(names) < depth:
+        code = frame.f_code
+        names.append(f"{frame.f_globals.get('__name__', '?')}:{code.co_qualname}")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+_profile: contextvars.ContextVar[Profile | None] = contextvars.ContextVar(
+    "profile", default=None
+)
+
+
+def get_profile() -> Profile | None:
+    return _profile.get()
+
+
+@contextmanager
+def profile(
+    name: str, mode: ProfilingMode = "spans", interval: float = 0.001
+) -> Iterator[Profile]:
+    """Profile the block, the root span is recorded in the "http" category."""
+    current = Profile(name, mode=mode, interval=interval)
+    token = _profile.set(current)
+    current.start()
+    try:
+        with current.span("http", name):
+            yield current
+    finally:
+        current.stop()
+        _profile.reset(token)
+
+
+@contextmanager
+def span(category: str, name: str) -> Iterator[None]:
+    current = _profile.get()
+    if current is None:
+        yield
+        return
+    with current.span(category, name):
+        yield
+
+
+def profiled(
+    category: str, name: str | None = None
+) -> Callable[[Callable[P, R]], Callable[P, R]]:
+    """Record the calls of the decorated function while a profile is active,
+    and their allocations while the memory tracker is enabled."""
+
+    def decorator(fn: Callable[P, R]) -> Callable[P, R]:
+        span_name = name or fn.__qualname__
+
+        if inspect.iscoroutinefunction(fn):
+            async_fn = cast(Callable[P, Awaitable[Any]], fn)
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args: P.args, **kwargs: P.kwargs) -> Any:
+                if _profile.get() is None and not memory_tracker.enabled:
+                    return await async_fn(*args, **kwargs)
+                with _instrument(category, span_name):
+                    return await async_fn(*args, **kwargs)
+
+            return cast(Callable[P, R], async_wrapper)
+
+        @functools.wraps(fn)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            if _profile.get() is None and not memory_tracker.enabled:
+                return fn(*args, **kwargs)
+            with _instrument(category, span_name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def _instrument(category: str, name: str) -> Iterator[None]:
+    with span(category, name), memory_tracker.track(name):
+        yield
+
+
+def profile_methods(category: str) -> Callable[[Class_T], Class_T]:
+    """Class decorator applying `profiled` to the public methods (streaming
+    generators excepted, their time is spent by the caller)."""
+
+    def decorator(cls: Class_T) -> Class_T:
+        for attribute, value in list(vars(cls).items()):
+            if (
+                attribute.startswith("_")
+                or not inspect.isfunction(value)
+                or inspect.isgeneratorfunction(value)
+                or inspect.isasyncgenfunction(value)
+            ):
+                continue
+            setattr(cls, attribute, profiled(category)(value))
+        return cls
+
+    return decorator
+
+
+class ProfileStore:
+    """The latest profile reports, to be fetched after the request."""
+
+    def __init__(self, maxsize: int = 20) -> None:
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._reports: OrderedDict[uuid.UUID, ProfileReport] = OrderedDict()
+
+    def get(self, report_id: uuid.UUID) -> ProfileReport | None:
+        with self._lock:
+            return self._reports.get(report_id)
+
+    def add(self, report: ProfileReport) -> None:
+        with self._lock:
+            self._reports[report.id] = report
+            while len(self._reports) > self.maxsize:
+                self._reports.popitem(last=False)
+
+
+profile_store = ProfileStore()
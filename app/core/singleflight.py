@@ -0,0 +1,101 @@
+import asyncio
+import threading
+from collections.abc import Awaitable, Callable, Hashable, Mapping, Sequence
+from collections.abc import Set as AbstractSet
+from typing import Any, Generic, TypeVar, cast
+
+from pydantic import BaseModel
+
+from app.core.metrics import registry
+
+T = TypeVar("T")
+
+coalesced_calls = registry.counter(
+    "coalesced_calls",
+    "Calls which shared the execution of an identical call in flight.",
+    ["name"],
+)
+
+
+def freeze(value: Any) -> Hashable:
+    """Hashable equivalent of `value`, to build keys from call arguments."""
+    if isinstance(value, BaseModel):
+        return (type(value), freeze(value.model_dump()))
+    if isinstance(value, Mapping):
+        items: Mapping[Any, Any] = value
+        return tuple(sorted((key, freeze(item)) for key, item in items.items()))
+    if isinstance(value, list | tuple):
+        return tuple(freeze(item) for item in cast(Sequence[Any], value))
+    if isinstance(value, set | frozenset):
+        return frozenset(cast(AbstractSet[Any], value))
+    return value
+
+
+class _Call(Generic[T]):
+    __slots__ = ("done", "error", "result")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: T | None = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """Identical concurrent calls (same key) share a single execution.
+
+    The first caller runs the function, the ones arriving while it runs
+    wait for it and get the same result or exception. Nothing is kept once
+    the call returns: the results are at most as old as the call they joined.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call[Any]] = {}
+
+    def do(self, key: Hashable, function: Callable[[], T]) -> T:
+        with self._lock:
+            call: _Call[T] | None = self._calls.get(key)
+            leader = call is None
+            if call is None:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            coalesced_calls.inc(name=self.name)
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return cast(T, call.result)
+
+        try:
+            call.result = function()
+        except BaseException as err:
+            call.error = err
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+
+class AsyncSingleFlight:
+    """`SingleFlight` for coroutines, within one event loop.
+
+    The shared call runs as a task: a caller being cancelled doesn't cancel
+    it for the others.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._tasks: dict[Hashable, asyncio.Task[Any]] = {}
+
+    async def do(self, key: Hashable, function: Callable[[], Awaitable[T]]) -> T:
+        task: asyncio.Task[T] | None = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(function())
+            self._tasks[key] = task
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+        else:
+            coalesced_calls.inc(name=self.name)
+        return await asyncio.shield(task)
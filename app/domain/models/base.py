@@ -1,4 +1,5 @@
 import uuid
+from enum import StrEnum
 from typing import Generic, NewType, TypeVar
 
 from pydantic import BaseModel, ConfigDict, NonNegativeInt, PositiveInt
@@ -19,12 +20,33 @@ PostId = NewType("PostId", uuid.UUID)
 TagName = NewType("TagName", str)
 
 
+class CountStrategy(StrEnum):
+    EXACT = "exact"
+    ESTIMATED = "estimated"
+    CACHED = "cached"
+    NONE = "none"
+
+
+class ExportFormat(StrEnum):
+    CSV = "csv"
+    BINARY = "binary"
+
+
+class ImportFormat(StrEnum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
 class PaginationParams(BaseModel):
     page: PositiveInt = 1
     limit: PositiveInt = 100
+    after: str | None = None
+    count: CountStrategy = CountStrategy.EXACT
 
 
 class DomainPagination(BaseModel, Generic[Domain_T]):
-    total: NonNegativeInt
+    total: NonNegativeInt | None
+    total_exact: bool = True
     limit: NonNegativeInt
     items: list[Domain_T]
+    next_cursor: str | None = None
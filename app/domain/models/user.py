@@ -1,5 +1,5 @@
 from app.domain.models.address import AddressCompactDomain, AddressCreateDomain
-from app.domain.models.base import DomainModel, UserId
+from app.domain.models.base import DomainModel, PostId, UserId
 from app.domain.models.post import PostDomain
 
 
@@ -11,6 +11,11 @@ class UserDomain(DomainModel):
     posts: list[PostDomain]
 
 
+class PostAuthorDomain(DomainModel):
+    post_id: PostId
+    author: UserDomain
+
+
 class UserCreateDomain(DomainModel):
     username: str
     email: str
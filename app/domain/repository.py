@@ -1,10 +1,12 @@
 import uuid
+from collections.abc import AsyncIterator, Collection, Iterator, Mapping, Sequence
 from typing import Any, Protocol
 
 from app.domain.models.base import (
     Create_T_contra,
     Domain_T,
     DomainPagination,
+    ExportFormat,
     PaginationParams,
     Update_T_contra,
 )
@@ -19,8 +21,102 @@ class AbstractRepository(Protocol[Domain_T, Create_T_contra, Update_T_contra]):
 
     def get_by_id(self, entity_id: uuid.UUID, /, **kwargs: Any) -> Domain_T: ...
 
+    def get_many(
+        self, entity_ids: Collection[uuid.UUID], /, **kwargs: Any
+    ) -> dict[uuid.UUID, Domain_T]: ...
+
+    def get_version(self, entity_id: uuid.UUID, /, **kwargs: Any) -> str: ...
+
+    def get_page_version(
+        self, pagination: PaginationParams | None = None, **kwargs: Any
+    ) -> str: ...
+
+    def iter_all(
+        self,
+        batch_size: int = 1_000,
+        filters: Mapping[str, Any] | None = None,
+        **kwargs: Any,
+    ) -> Iterator[Domain_T]: ...
+
+    def iter_batches(
+        self,
+        batch_size: int = 1_000,
+        filters: Mapping[str, Any] | None = None,
+        **kwargs: Any,
+    ) -> Iterator[list[Domain_T]]: ...
+
+    def copy_to(
+        self, export_format: ExportFormat = ExportFormat.CSV
+    ) -> Iterator[bytes]: ...
+
+    def copy_from(self, data: Mapping[int, Create_T_contra], /) -> dict[int, str]: ...
+
     def create(self, data: Create_T_contra, /) -> Domain_T: ...
 
     def update(self, entity_id: uuid.UUID, data: Update_T_contra, /) -> Domain_T: ...
 
     def delete(self, entity_id: uuid.UUID, /) -> None: ...
+
+    def create_many(self, data: Sequence[Create_T_contra], /) -> list[Domain_T]: ...
+
+    def update_many(
+        self, data: Mapping[uuid.UUID, Update_T_contra], /
+    ) -> list[Domain_T]: ...
+
+    def delete_many(self, entity_ids: Sequence[uuid.UUID], /) -> None: ...
+
+
+class AbstractAsyncRepository(Protocol[Domain_T, Create_T_contra, Update_T_contra]):
+    schema: type[Domain_T]
+
+    async def get_all(
+        self, pagination: PaginationParams | None = None, **kwargs: Any
+    ) -> DomainPagination[Domain_T]: ...
+
+    async def get_by_id(self, entity_id: uuid.UUID, /, **kwargs: Any) -> Domain_T: ...
+
+    async def get_many(
+        self, entity_ids: Collection[uuid.UUID], /, **kwargs: Any
+    ) -> dict[uuid.UUID, Domain_T]: ...
+
+    async def get_version(self, entity_id: uuid.UUID, /, **kwargs: Any) -> str: ...
+
+    async def get_page_version(
+        self, pagination: PaginationParams | None = None, **kwargs: Any
+    ) -> str: ...
+
+    def iter_all(
+        self,
+        batch_size: int = 1_000,
+        filters: Mapping[str, Any] | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[Domain_T]: ...
+
+    def iter_batches(
+        self,
+        batch_size: int = 1_000,
+        filters: Mapping[str, Any] | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[list[Domain_T]]: ...
+
+    def copy_to(
+        self, export_format: ExportFormat = ExportFormat.CSV
+    ) -> AsyncIterator[bytes]: ...
+
+    async def create(self, data: Create_T_contra, /) -> Domain_T: ...
+
+    async def update(
+        self, entity_id: uuid.UUID, data: Update_T_contra, /
+    ) -> Domain_T: ...
+
+    async def delete(self, entity_id: uuid.UUID, /) -> None: ...
+
+    async def create_many(
+        self, data: Sequence[Create_T_contra], /
+    ) -> list[Domain_T]: ...
+
+    async def update_many(
+        self, data: Mapping[uuid.UUID, Update_T_contra], /
+    ) -> list[Domain_T]: ...
+
+    async def delete_many(self, entity_ids: Sequence[uuid.UUID], /) -> None: ...
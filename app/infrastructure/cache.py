@@ -0,0 +1,147 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable, Iterable
+from typing import Generic, TypeVar
+
+from pydantic import BaseModel
+
+from app.domain.models.base import DomainModel
+
+Key_T = TypeVar("Key_T", bound=Hashable)
+Value_T = TypeVar("Value_T")
+
+
+class LRUCache(Generic[Key_T, Value_T]):
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Key_T, Value_T] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Key_T) -> Value_T | None:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Key_T, value: Value_T) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: Key_T) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class CacheStats(BaseModel):
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+
+
+class EntityCache:
+    """LRU cache with TTL whose entries can be invalidated by tag."""
+
+    def __init__(self, maxsize: int = 10_000, ttl: float | None = 60.0) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, tuple[float | None, DomainModel]] = (
+            OrderedDict()
+        )
+        self._tags: dict[Hashable, set[Hashable]] = {}
+        self._keys: dict[Hashable, set[Hashable]] = {}
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._generation = 0
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    @property
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            hits=self._hits,
+            misses=self._misses,
+            evictions=self._evictions,
+            size=len(self._entries),
+        )
+
+    def get(self, key: Hashable) -> DomainModel | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return value
+                self._remove(key)
+
+            self._misses += 1
+            return None
+
+    def set(
+        self,
+        key: Hashable,
+        value: DomainModel,
+        tags: Iterable[Hashable] = (),
+        generation: int | None = None,
+    ) -> None:
+        expires_at = None if self.ttl is None else time.monotonic() + self.ttl
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                # Invalidated while the value was being loaded
+                return
+
+            self._remove(key)
+            self._entries[key] = (expires_at, value)
+            self._tags[key] = set(tags)
+            for tag in self._tags[key]:
+                self._keys.setdefault(tag, set()).add(key)
+
+            while len(self._entries) > self.maxsize:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._evictions += 1
+
+    def invalidate(self, *tags: Hashable) -> None:
+        with self._lock:
+            self._generation += 1
+            for tag in tags:
+                for key in self._keys.pop(tag, set()):
+                    self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._tags.clear()
+            self._keys.clear()
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._hits = self._misses = self._evictions = 0
+
+    def _remove(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+        for tag in self._tags.pop(key, set()):
+            keys = self._keys.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys[tag]
@@ -0,0 +1,64 @@
+import functools
+from collections.abc import Iterator
+from contextlib import ExitStack
+from typing import Any
+
+from sqlalchemy import Engine, create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import Settings, get_settings
+from app.infrastructure.metrics import TimedQueuePool, instrument_engine
+
+
+def create_database_engine(settings: Settings) -> Engine:
+    connect_args: dict[str, Any] = {
+        "application_name": settings.DATABASE_APPLICATION_NAME
+    }
+    if settings.DATABASE_STATEMENT_TIMEOUT is not None:
+        connect_args["options"] = (
+            f"-c statement_timeout={settings.DATABASE_STATEMENT_TIMEOUT}"
+        )
+
+    engine = create_engine(
+        str(settings.SQLALCHEMY_DATABASE_URI),
+        poolclass=TimedQueuePool,
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+        pool_recycle=settings.DATABASE_POOL_RECYCLE,
+        pool_pre_ping=settings.DATABASE_POOL_PRE_PING,
+        connect_args=connect_args,
+    )
+    instrument_engine(engine)
+    return engine
+
+
+def warm_up(engine: Engine, connections: int) -> None:
+    """Open `connections` connections and leave them idle in the pool."""
+    # Held together, a released connection would be handed out again
+    with ExitStack() as stack:
+        for _ in range(connections):
+            stack.enter_context(engine.connect())
+
+
+@functools.lru_cache
+def get_engine() -> Engine:
+    return create_database_engine(get_settings())
+
+
+@functools.lru_cache
+def get_sessionmaker() -> sessionmaker[Session]:
+    return sessionmaker(get_engine(), expire_on_commit=False)
+
+
+def get_session() -> Iterator[Session]:
+    with get_sessionmaker()() as session:
+        yield session
+
+
+def dispose_engine() -> None:
+    """Close the pooled connections, the next use creates a new engine."""
+    if get_engine.cache_info().currsize:
+        get_engine().dispose()
+    get_engine.cache_clear()
+    get_sessionmaker.cache_clear()
@@ -5,3 +5,18 @@ class EntityNotFoundError(RepositoryError): ...
 
 
 class EntityAlreadyExistsError(RepositoryError): ...
+
+
+class InvalidCursorError(RepositoryError): ...
+
+
+class InvalidFieldsError(RepositoryError): ...
+
+
+class QueryBudgetExceededError(RepositoryError): ...
+
+
+class NPlusOneError(RepositoryError): ...
+
+
+class NPlusOneWarning(UserWarning): ...
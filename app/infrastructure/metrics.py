@@ -0,0 +1,145 @@
+import contextvars
+import functools
+import time
+from collections.abc import Callable, Iterable
+from typing import Any, Concatenate, ParamSpec, TypeVar
+
+from sqlalchemy import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry, QueuePool
+
+from app.core.metrics import Gauge, Histogram, Metric, registry
+from app.core.profiling import span
+from app.infrastructure.utils import QUERY_TIME_BUCKETS, SQLAlchemyInstrument
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+repository_duration = registry.histogram(
+    "repository_method_duration_seconds",
+    "Duration of the repository method calls.",
+    ["repository", "method"],
+)
+repository_errors = registry.counter(
+    "repository_method_errors",
+    "Repository method calls which raised an exception.",
+    ["repository", "method", "error"],
+)
+pool_wait = registry.histogram(
+    "db_pool_wait_seconds",
+    "Time spent waiting for a pooled connection.",
+    ["engine"],
+    buckets=(0.0001, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30),
+)
+
+# Set while a repository method is measured, the methods it calls are not
+_measuring: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "measuring", default=False
+)
+
+
+def measured(
+    method: Callable[Concatenate[Any, P], R],
+) -> Callable[Concatenate[Any, P], R]:
+    """Record the duration and the errors of a repository method."""
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self: Any, /, *args: P.args, **kwargs: P.kwargs) -> R:
+        if _measuring.get():
+            return method(self, *args, **kwargs)
+
+        repository = type(self).__name__
+        token = _measuring.set(True)
+        start = time.perf_counter()
+        try:
+            with span("repository", f"{repository}.{name}"):
+                return method(self, *args, **kwargs)
+        except Exception as err:
+            repository_errors.inc(
+                repository=repository, method=name, error=type(err).__name__
+            )
+            raise
+        finally:
+            _measuring.reset(token)
+            repository_duration.observe(
+                time.perf_counter() - start, repository=repository, method=name
+            )
+
+    wrapper.__measured__ = True  # type: ignore[attr-defined]
+    return wrapper
+
+
+def is_measured(method: Callable[..., Any]) -> bool:
+    return getattr(method, "__measured__", False)
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool reporting the time spent waiting for a connection."""
+
+    metrics_name = "default"
+
+    def recreate(self) -> QueuePool:
+        pool = super().recreate()
+        if isinstance(pool, TimedQueuePool):
+            pool.metrics_name = self.metrics_name
+        return pool
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_wait.observe(time.perf_counter() - start, engine=self.metrics_name)
+
+
+class TimedAsyncAdaptedQueuePool(TimedQueuePool, AsyncAdaptedQueuePool): ...
+
+
+_engines: dict[str, Engine] = {}
+
+
+def instrument_engine(engine: Engine, name: str = "default") -> None:
+    """Report the pool of `engine` in the metrics, labelled with `name`."""
+    if isinstance(engine.pool, TimedQueuePool):
+        engine.pool.metrics_name = name
+    _engines[name] = engine
+    registry.add_collector("db_pool", collect_pools)
+
+
+def collect_pools() -> Iterable[Metric]:
+    size = Gauge("db_pool_size", "Number of connections kept in the pool.", ["engine"])
+    checked_out = Gauge(
+        "db_pool_checked_out", "Connections currently in use.", ["engine"]
+    )
+    checked_in = Gauge(
+        "db_pool_checked_in", "Idle connections in the pool.", ["engine"]
+    )
+    overflow = Gauge(
+        "db_pool_overflow",
+        "Connections opened beyond the pool size (negative while below).",
+        ["engine"],
+    )
+    for name, engine in list(_engines.items()):
+        pool = engine.pool
+        if not isinstance(pool, QueuePool):
+            continue
+        size.set(pool.size(), engine=name)
+        checked_out.set(pool.checkedout(), engine=name)
+        checked_in.set(pool.checkedin(), engine=name)
+        overflow.set(pool.overflow(), engine=name)
+    return [size, checked_out, checked_in, overflow]
+
+
+def collect_queries() -> Iterable[Metric]:
+    """Query latency from the statistics of SQLAlchemyInstrument, which have
+    to be enabled, by operation (SELECT, INSERT, ...)."""
+    histogram = Histogram(
+        "db_query_duration_seconds",
+        "Duration of the SQL statements.",
+        ["operation"],
+        buckets=[bound / 1000 for bound in QUERY_TIME_BUCKETS],
+    )
+    for stats in SQLAlchemyInstrument().get_stats():
+        operation = stats.fingerprint.split(" ", 1)[0].upper()
+        histogram.add(stats.histogram, stats.total_time / 1000, operation=operation)
+    return [histogram]
@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import Column, ForeignKey, Table, UniqueConstraint
+from sqlalchemy import Column, ForeignKey, Index, Table, UniqueConstraint, text
 from sqlalchemy.orm import (
     DeclarativeBase,
     Mapped,
@@ -16,6 +16,8 @@ class Base(DeclarativeBase):
         return cls.__name__.lower()
 
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    # Bumped by every update, see the repositories `get_version`
+    version: Mapped[int] = mapped_column(server_default=text("1"))
 
 
 post_tag = Table(
@@ -50,6 +52,8 @@ class User(Base):
     address: Mapped[Address] = relationship(cascade="all, delete-orphan")
     posts: Mapped[list["Post"]] = relationship(cascade="all, delete-orphan")
 
+    __table_args__ = (Index("ix_user_username_id", "username", "id"),)
+
 
 class Post(Base):
     title: Mapped[str]
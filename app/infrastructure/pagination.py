@@ -0,0 +1,71 @@
+import base64
+import binascii
+import json
+import threading
+import time
+from collections.abc import Sequence
+from typing import Any, cast
+
+from sqlalchemy.orm import InstrumentedAttribute
+
+from app.infrastructure.exceptions import InvalidCursorError
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    payload = json.dumps([str(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(
+    cursor: str, columns: Sequence[InstrumentedAttribute[Any]]
+) -> list[Any]:
+    padding = "=" * (-len(cursor) % 4)
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + padding))
+    except (binascii.Error, UnicodeDecodeError, ValueError) as err:
+        raise InvalidCursorError() from err
+
+    if not isinstance(payload, list):
+        raise InvalidCursorError()
+
+    values = cast(list[Any], payload)
+    if len(values) != len(columns):
+        raise InvalidCursorError()
+
+    try:
+        return [
+            column.type.python_type(value)
+            for column, value in zip(columns, values, strict=True)
+        ]
+    except (TypeError, ValueError) as err:
+        raise InvalidCursorError() from err
+
+
+class CountCache:
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: dict[str, tuple[float, int]] = {}
+
+    def get(self, key: str) -> int | None:
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, total = entry
+        if expires_at < time.monotonic():
+            return None
+        return total
+
+    def set(self, key: str, total: int) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, total)
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -1,4 +1,5 @@
 import uuid
+from collections.abc import Mapping, Sequence
 from typing import Never
 
 from app.core.exceptions import OperationNotAllowedError
@@ -26,3 +27,15 @@ class AddressSQLAlchemyRepository(
 
     def delete(self, entity_id: uuid.UUID, /) -> None:
         raise OperationNotAllowedError()
+
+    def create_many(self, data: Sequence[Never], /) -> list[AddressDomain]:
+        raise OperationNotAllowedError()
+
+    def update_many(self, data: Mapping[uuid.UUID, Never], /) -> list[AddressDomain]:
+        raise OperationNotAllowedError()
+
+    def delete_many(self, entity_ids: Sequence[uuid.UUID], /) -> None:
+        raise OperationNotAllowedError()
+
+    def copy_from(self, data: Mapping[int, Never], /) -> dict[int, str]:
+        raise OperationNotAllowedError()
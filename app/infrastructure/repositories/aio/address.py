@@ -0,0 +1,18 @@
+from typing import Never
+
+from app.domain.models.address import AddressDomain
+from app.infrastructure.models import Address
+from app.infrastructure.repositories.address import AddressSQLAlchemyRepository
+from app.infrastructure.repositories.aio.base import AsyncSQLAlchemyRepositoryBase
+
+
+class AsyncAddressSQLAlchemyRepository(
+    AsyncSQLAlchemyRepositoryBase[
+        Address,
+        AddressDomain,
+        Never,
+        Never,
+    ]
+):
+    repository_class = AddressSQLAlchemyRepository
+    schema = AddressDomain
@@ -0,0 +1,176 @@
+import uuid
+from collections.abc import AsyncIterator, Callable, Collection, Mapping, Sequence
+from typing import Any, Generic, TypeVar
+
+import psycopg
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.exceptions import RepositoryError
+from app.domain.models.base import (
+    Create_T_contra,
+    Domain_T,
+    DomainPagination,
+    ExportFormat,
+    PaginationParams,
+    Update_T_contra,
+)
+from app.domain.repository import AbstractAsyncRepository
+from app.infrastructure.repositories.base import Model_T, SQLAlchemyRepositoryBase
+
+Result_T = TypeVar("Result_T")
+
+
+class AsyncSQLAlchemyRepositoryBase(
+    AbstractAsyncRepository[Domain_T, Create_T_contra, Update_T_contra],
+    Generic[
+        Model_T,
+        Domain_T,
+        Create_T_contra,
+        Update_T_contra,
+    ],
+):
+    repository_class: type[
+        SQLAlchemyRepositoryBase[Model_T, Domain_T, Create_T_contra, Update_T_contra]
+    ]
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_all(
+        self, pagination: PaginationParams | None = None, **kwargs: Any
+    ) -> DomainPagination[Domain_T]:
+        return await self._run_sync(
+            lambda repository: repository.get_all(pagination, **kwargs)
+        )
+
+    async def get_by_id(self, entity_id: uuid.UUID, /, **kwargs: Any) -> Domain_T:
+        return await self._run_sync(
+            lambda repository: repository.get_by_id(entity_id, **kwargs)
+        )
+
+    async def get_many(
+        self, entity_ids: Collection[uuid.UUID], /, **kwargs: Any
+    ) -> dict[uuid.UUID, Domain_T]:
+        return await self._run_sync(
+            lambda repository: repository.get_many(entity_ids, **kwargs)
+        )
+
+    async def get_version(self, entity_id: uuid.UUID, /, **kwargs: Any) -> str:
+        return await self._run_sync(
+            lambda repository: repository.get_version(entity_id, **kwargs)
+        )
+
+    async def get_page_version(
+        self, pagination: PaginationParams | None = None, **kwargs: Any
+    ) -> str:
+        return await self._run_sync(
+            lambda repository: repository.get_page_version(pagination, **kwargs)
+        )
+
+    async def iter_all(
+        self,
+        batch_size: int = 1_000,
+        filters: Mapping[str, Any] | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[Domain_T]:
+        async for batch in self.iter_batches(batch_size, filters=filters, **kwargs):
+            for item in batch:
+                yield item
+
+    async def iter_batches(
+        self,
+        batch_size: int = 1_000,
+        filters: Mapping[str, Any] | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[list[Domain_T]]:
+        # The synchronous generator is driven one batch at a time, each step
+        # running in a greenlet like the other calls.
+        batches = await self._run_sync(
+            lambda repository: repository.iter_batches(
+                batch_size, filters=filters, **kwargs
+            )
+        )
+        try:
+            while (
+                batch := await self.session.run_sync(lambda _: next(batches, None))
+            ) is not None:
+                yield batch
+        finally:
+            await self.session.run_sync(lambda _: batches.close())
+
+    async def copy_to(
+        self,
+        export_format: ExportFormat = ExportFormat.CSV,
+        chunk_size: int = 64 * 1024,
+    ) -> AsyncIterator[bytes]:
+        # The driver connection is asynchronous: the copy is read here
+        # rather than in the synchronous repository.
+        statement, params = await self._run_sync(
+            lambda repository: repository.get_copy_query(export_format)
+        )
+        connection = await self.session.connection()
+        raw_connection = await connection.get_raw_connection()
+        driver_connection: psycopg.AsyncConnection[Any] | None = (
+            raw_connection.driver_connection
+        )
+        if driver_connection is None:
+            raise RepositoryError()
+
+        buffer = bytearray()
+        async with (
+            driver_connection.cursor() as cursor,
+            cursor.copy(statement, params) as copy,
+        ):
+            async for data in copy:
+                buffer += data
+                if len(buffer) >= chunk_size:
+                    yield bytes(buffer)
+                    buffer.clear()
+        if buffer:
+            yield bytes(buffer)
+
+    async def create(self, data: Create_T_contra, /) -> Domain_T:
+        return await self._run_sync(lambda repository: repository.create(data))
+
+    async def update(self, entity_id: uuid.UUID, data: Update_T_contra, /) -> Domain_T:
+        return await self._run_sync(
+            lambda repository: repository.update(entity_id, data)
+        )
+
+    async def delete(self, entity_id: uuid.UUID, /) -> None:
+        await self._run_sync(lambda repository: repository.delete(entity_id))
+
+    async def create_many(self, data: Sequence[Create_T_contra], /) -> list[Domain_T]:
+        return await self._run_sync(lambda repository: repository.create_many(data))
+
+    async def update_many(
+        self, data: Mapping[uuid.UUID, Update_T_contra], /
+    ) -> list[Domain_T]:
+        return await self._run_sync(lambda repository: repository.update_many(data))
+
+    async def delete_many(self, entity_ids: Sequence[uuid.UUID], /) -> None:
+        await self._run_sync(lambda repository: repository.delete_many(entity_ids))
+
+    async def _run_sync(
+        self,
+        fn: Callable[
+            [
+                SQLAlchemyRepositoryBase[
+                    Model_T, Domain_T, Create_T_contra, Update_T_contra
+                ]
+            ],
+            Result_T,
+        ],
+    ) -> Result_T:
+        # The synchronous repository runs in a greenlet on top of the async
+        # driver: every database call is awaited on the event loop instead of
+        # blocking a worker thread.
+        return await self.session.run_sync(
+            lambda session: fn(self._get_repository(session))
+        )
+
+    def _get_repository(
+        self, session: Session
+    ) -> SQLAlchemyRepositoryBase[Model_T, Domain_T, Create_T_contra, Update_T_contra]:
+        return self.repository_class(session)
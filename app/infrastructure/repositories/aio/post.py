@@ -0,0 +1,16 @@
+from app.domain.models.post import PostCreateDomain, PostDomain, PostUpdateDomain
+from app.infrastructure.models import Post
+from app.infrastructure.repositories.aio.base import AsyncSQLAlchemyRepositoryBase
+from app.infrastructure.repositories.post import PostSQLAlchemyRepository
+
+
+class AsyncPostSQLAlchemyRepository(
+    AsyncSQLAlchemyRepositoryBase[
+        Post,
+        PostDomain,
+        PostCreateDomain,
+        PostUpdateDomain,
+    ]
+):
+    repository_class = PostSQLAlchemyRepository
+    schema = PostDomain
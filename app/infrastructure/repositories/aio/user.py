@@ -0,0 +1,16 @@
+from app.domain.models.user import UserCreateDomain, UserDomain, UserUpdateDomain
+from app.infrastructure.models import User
+from app.infrastructure.repositories.aio.base import AsyncSQLAlchemyRepositoryBase
+from app.infrastructure.repositories.user import UserSQLAlchemyRepository
+
+
+class AsyncUserSQLAlchemyRepository(
+    AsyncSQLAlchemyRepositoryBase[
+        User,
+        UserDomain,
+        UserCreateDomain,
+        UserUpdateDomain,
+    ]
+):
+    repository_class = UserSQLAlchemyRepository
+    schema = UserDomain
@@ -1,25 +1,163 @@
+import hashlib
 import uuid
+from collections import defaultdict
+from collections.abc import (
+    Collection,
+    Generator,
+    Iterable,
+    Iterator,
+    Mapping,
+    Sequence,
+)
+from contextlib import contextmanager
 from typing import Any, ClassVar, Generic, TypeVar
 
-from psycopg.errors import UniqueViolation
-from sqlalchemy import Select, func, select
-from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
+import psycopg
+from psycopg import sql
+from psycopg.errors import ForeignKeyViolation, UniqueViolation
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    ColumnElement,
+    Integer,
+    MetaData,
+    Row,
+    Select,
+    Table,
+    Uuid,
+    any_,
+    bindparam,
+    cast,
+    column,
+    delete,
+    exists,
+    func,
+    insert,
+    inspect,
+    select,
+    table,
+    text,
+    tuple_,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, REGCLASS
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlalchemy.orm import (
+    InstrumentedAttribute,
+    Session,
+    aliased,
+    load_only,
+    noload,
+    raiseload,
+    selectinload,
+)
 from sqlalchemy.orm.interfaces import LoaderOption
 
 from app.core.exceptions import RepositoryError
+from app.core.profiling import profiled
 from app.domain.models.base import (
+    CountStrategy,
     Create_T_contra,
     Domain_T,
     DomainPagination,
+    ExportFormat,
     PaginationParams,
     Update_T_contra,
 )
 from app.domain.repository import AbstractRepository
-from app.infrastructure.exceptions import EntityAlreadyExistsError, EntityNotFoundError
+from app.infrastructure.exceptions import (
+    EntityAlreadyExistsError,
+    EntityNotFoundError,
+    InvalidFieldsError,
+)
+from app.infrastructure.metrics import is_measured, measured
 from app.infrastructure.models import Base
+from app.infrastructure.pagination import CountCache, decode_cursor, encode_cursor
 
 Model_T = TypeVar("Model_T", bound=Base)
+Entity_T = TypeVar("Entity_T", bound=Base)
+Row_T = TypeVar("Row_T", bound=tuple[Any, ...])
+
+MEASURED_METHODS = (
+    "get_all",
+    "get_by_id",
+    "get_many",
+    "get_version",
+    "get_page_version",
+    "create",
+    "update",
+    "delete",
+    "create_many",
+    "update_many",
+    "delete_many",
+    "copy_from",
+)
+
+pg_class = table("pg_class", column("oid"), column("reltuples"))
+
+
+def in_ids(
+    id_column: ColumnElement[uuid.UUID] | InstrumentedAttribute[uuid.UUID],
+    ids: Iterable[uuid.UUID],
+) -> ColumnElement[bool]:
+    # A single array parameter keeps the statement (and its cached
+    # compilation) identical whatever the number of ids.
+    return id_column == any_(bindparam(None, list(ids), type_=ARRAY(Uuid())))
+
+
+def has_null_character(value: object) -> bool:
+    """PostgreSQL text can't contain NUL, COPY fails on the first one."""
+    if isinstance(value, str):
+        return "\x00" in value
+    if isinstance(value, list | tuple):
+        return any(map(has_null_character, value))  # pyright: ignore[reportUnknownArgumentType]
+    return False
+
+
+def to_repository_error(error: BaseException | None) -> RepositoryError:
+    """Domain error of a driver error."""
+    if isinstance(error, UniqueViolation):
+        return EntityAlreadyExistsError()
+    if isinstance(error, ForeignKeyViolation):
+        # A referenced entity doesn't exist
+        return EntityNotFoundError()
+    return RepositoryError()
+
+
+def insert_cte(model: type[Entity_T], values: Mapping[str, Any]) -> type[Entity_T]:
+    """Entity to select the row from once inserted, see `update_cte`."""
+    table = model.metadata.tables[model.__tablename__]
+    inserted = (
+        insert(table)
+        .values(dict(values))
+        .returning(*table.c)
+        .cte(f"inserted_{table.name}")
+    )
+    return aliased(model, inserted)
+
+
+def update_cte(
+    model: type[Entity_T],
+    whereclause: ColumnElement[bool],
+    values: Mapping[str, Any],
+) -> type[Entity_T]:
+    """Entity to select the rows from once updated with `values`.
+
+    The UPDATE ... RETURNING runs as a CTE of the statement selecting from it,
+    the statement itself would only see the rows as they were before.
+    The version of the rows is bumped, even when `values` is empty.
+    """
+    table = model.metadata.tables[model.__tablename__]
+    updated = (
+        update(table)
+        .where(whereclause)
+        .values({**values, "version": table.c.version + 1})
+        .returning(*table.c)
+        .cte(f"updated_{table.name}")
+    )
+    return aliased(model, updated)
 
 
 class SQLAlchemyRepositoryBase(
@@ -33,61 +171,434 @@ class SQLAlchemyRepositoryBase(
 ):
     model: type[Model_T]
     default_loading_options: ClassVar[list[LoaderOption]] = []
+    sort_key: ClassVar[str] = "id"
+    count_cache: ClassVar[CountCache] = CountCache(ttl=5.0)
+    batch_size: ClassVar[int] = 5_000
+    # Raise on any lazy load instead of silently emitting a query per access
+    strict_loading: ClassVar[bool] = False
 
     def __init__(self, session: Session):
         self.session = session
 
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        # Time the public methods of each repository (overridden or not)
+        for name in MEASURED_METHODS:
+            method = getattr(cls, name)
+            if name in cls.__dict__ or not is_measured(method):
+                setattr(cls, name, measured(method))
+
     def get_all(
         self, pagination: PaginationParams | None = None, **kwargs: Any
     ) -> DomainPagination[Domain_T]:
-        count_stmt = select(func.count()).select_from(self.model)
-        total = self.session.scalar(count_stmt) or 0
-
-        stmt = select(self.model)
+        stmt = self._get_select_statement(**kwargs)
         stmt = self._apply_pagination(stmt=stmt, pagination=pagination)
-        stmt = self._apply_loading_options(stmt=stmt, **kwargs)
 
-        results = self.session.scalars(stmt)
-        items = [self._to_domain(result) for result in results]
+        rows, total, total_exact = self._get_page(stmt, pagination=pagination)
+        items = self._rows_to_domains(rows, **kwargs)
 
-        return DomainPagination(total=total, limit=len(items), items=items)
+        return DomainPagination(
+            total=total,
+            total_exact=total_exact,
+            limit=len(items),
+            items=items,
+            next_cursor=self._get_next_cursor(
+                rows, pagination=pagination, raw=bool(kwargs.get("raw"))
+            ),
+        )
 
     def get_by_id(self, entity_id: uuid.UUID, /, **kwargs: Any) -> Domain_T:
+        if kwargs.get("raw"):
+            stmt = self._get_raw_statement_checked(**kwargs)
+            stmt = stmt.where(self.model.id == entity_id)
+            if row := self.session.execute(stmt).one_or_none():
+                return self._from_row(row)
+            raise EntityNotFoundError()
+
         entity = self._get_entity_by_id(entity_id, **kwargs)
-        return self._to_domain(entity)
+        return self._to_projected_domain(entity, kwargs.get("fields"))
+
+    def get_many(
+        self, entity_ids: Collection[uuid.UUID], /, **kwargs: Any
+    ) -> dict[uuid.UUID, Domain_T]:
+        """Entities found among `entity_ids`, by id, with a single query.
+
+        Rows are mapped without the ORM (see `raw`), missing ids are left out.
+        """
+        return self._get_domains(entity_ids, **kwargs)
+
+    def get_version(self, entity_id: uuid.UUID, /, **kwargs: Any) -> str:
+        """Version of the entity as read with `kwargs`, without loading it."""
+        stmt = select(self._get_version_column(**kwargs)).where(
+            self.model.id == entity_id
+        )
+        version = self.session.scalar(stmt)
+        if version is None:
+            raise EntityNotFoundError()
+        return str(version)
+
+    def get_page_version(
+        self, pagination: PaginationParams | None = None, **kwargs: Any
+    ) -> str:
+        """Version of the `get_all` page, from the ids and versions of its rows
+        and the total."""
+        stmt = select(self.model.id, self._get_version_column(**kwargs))
+        stmt = self._apply_pagination(stmt=stmt, pagination=pagination)
+
+        rows, total, total_exact = self._get_page(stmt, pagination=pagination)
+        digest = hashlib.blake2b(f"{total}:{total_exact}".encode(), digest_size=16)
+        for row in rows:
+            digest.update(f";{row[0]}:{row[1]}".encode())
+        return digest.hexdigest()
+
+    def iter_all(
+        self,
+        batch_size: int = 1_000,
+        filters: Mapping[str, Any] | None = None,
+        **kwargs: Any,
+    ) -> Iterator[Domain_T]:
+        for batch in self.iter_batches(batch_size, filters=filters, **kwargs):
+            yield from batch
+
+    def iter_batches(
+        self,
+        batch_size: int = 1_000,
+        filters: Mapping[str, Any] | None = None,
+        **kwargs: Any,
+    ) -> Generator[list[Domain_T], None, None]:
+        # yield_per streams the rows through a server-side cursor, only one
+        # batch is held in memory at a time. The session can't be used for
+        # anything else until the iteration is over.
+        stmt = self._get_select_statement(filters, **kwargs)
+        result = self.session.execute(stmt, execution_options={"yield_per": batch_size})
+        try:
+            for rows in result.partitions():
+                yield self._rows_to_domains(rows, **kwargs)
+        finally:
+            result.close()
+
+    def copy_to(
+        self,
+        export_format: ExportFormat = ExportFormat.CSV,
+        chunk_size: int = 64 * 1024,
+    ) -> Generator[bytes, None, None]:
+        """Stream all the entities with COPY (SELECT ...) TO STDOUT.
+
+        The rows are not converted at all: they are read as encoded by the
+        server and yielded in chunks of about `chunk_size` bytes.
+        """
+        statement, params = self.get_copy_query(export_format)
+        connection = self._get_driver_connection()
+
+        buffer = bytearray()
+        with (
+            connection.cursor() as cursor,
+            cursor.copy(statement, params) as copy,
+        ):
+            # libpq hands the data over row by row
+            for data in copy:
+                buffer += data
+                if len(buffer) >= chunk_size:
+                    yield bytes(buffer)
+                    buffer.clear()
+        if buffer:
+            yield bytes(buffer)
+
+    def get_copy_query(
+        self, export_format: ExportFormat = ExportFormat.CSV
+    ) -> tuple[bytes, Mapping[str, Any]]:
+        """COPY statement of `copy_to` and its parameters, which psycopg
+        merges client-side."""
+        compiled = self._get_copy_statement().compile(
+            dialect=self.session.get_bind().dialect
+        )
+        options = (
+            "FORMAT csv, HEADER"
+            if export_format is ExportFormat.CSV
+            else "FORMAT binary"
+        )
+        statement = f"COPY ({compiled}) TO STDOUT WITH ({options})"
+        return statement.encode(), compiled.params
+
+    def copy_from(self, data: Mapping[int, Create_T_contra], /) -> dict[int, str]:
+        """Insert the entities with COPY FROM STDIN, in one transaction.
+
+        The rows are loaded into a temporary staging table and merged with
+        set-based statements. Rows which can't be inserted (conflicts,
+        unknown references, NUL characters) are left out instead of failing
+        the whole batch: they are returned, by key, with the reason. Other
+        errors roll the batch back.
+        """
+        if not data:
+            return {}
+
+        rejected: dict[int, str] = {}
+        with self._handle_copy_error():
+            staging = self._create_staging_table()
+            names = [
+                staging_column.name
+                for staging_column in staging.c
+                if staging_column.server_default is None
+            ]
+            statement = sql.SQL("COPY {} ({}) FROM STDIN").format(
+                sql.Identifier(staging.name),
+                sql.SQL(", ").join(map(sql.Identifier, names)),
+            )
+            connection = self._get_driver_connection()
+            with connection.cursor() as cursor, cursor.copy(statement) as copy:
+                for key, item in data.items():
+                    row = self._to_staging_row(item)
+                    if has_null_character(row):
+                        rejected[key] = "Null character not allowed"
+                        continue
+                    copy.write_row((key, *row))
+            # Temporary tables are never analyzed automatically
+            self.session.execute(text(f"ANALYZE {staging.name}"))
+
+            rejected |= self._merge_staging(staging)
+        self._commit_core_write()
+        self._invalidate_counts()
+        return rejected
 
     def create(self, data: Create_T_contra, /) -> Domain_T:
         db_model = self._create_model(data=data)
         self.session.add(db_model)
         self._commit()
+        self._invalidate_counts()
         return self._to_domain(db_model)
 
     def update(self, entity_id: uuid.UUID, data: Update_T_contra, /) -> Domain_T:
-        entity = self._get_entity_by_id(entity_id)
+        entity = update_cte(
+            self.model,
+            self.model.id == entity_id,
+            self._get_update_values(data),
+        )
+        stmt = self._get_raw_statement(entity).where(entity.id == entity_id)
+        return self._write_returning(stmt)
 
-        entity_data = data.model_dump(exclude_unset=True)
-        for key, value in entity_data.items():
-            setattr(entity, key, value)
+    def delete(self, entity_id: uuid.UUID, /) -> None:
+        self.delete_many([entity_id])
+
+    def create_many(self, data: Sequence[Create_T_contra], /) -> list[Domain_T]:
+        if not data:
+            return []
 
+        with self._handle_integrity_error():
+            entity_ids = self._insert_many(data)
         self._commit()
-        return self._to_domain(entity)
+        self._invalidate_counts()
 
-    def delete(self, entity_id: uuid.UUID, /) -> None:
-        entity = self._get_entity_by_id(entity_id)
-        self.session.delete(entity)
-        self.session.commit()
+        return self._get_domains_by_ids(entity_ids)
+
+    def update_many(
+        self, data: Mapping[uuid.UUID, Update_T_contra], /
+    ) -> list[Domain_T]:
+        if not data:
+            return []
+
+        with self._handle_integrity_error():
+            found = self._update_many(data)
+            self._ensure_found(data, found=found)
+        self._commit_core_write()
+
+        return self._get_domains_by_ids(list(data))
+
+    def delete_many(self, entity_ids: Sequence[uuid.UUID], /) -> None:
+        if not entity_ids:
+            return
+
+        stmt = (
+            delete(self.model)
+            .where(in_ids(self.model.id, entity_ids))
+            .returning(self.model.id)
+        )
+        deleted = set(self.session.scalars(stmt))
+        self._ensure_found(entity_ids, found=deleted)
+        self._commit_core_write()
+        self._invalidate_counts()
 
     def _get_entity_by_id(self, entity_id: uuid.UUID, /, **kwargs: Any) -> Model_T:
         stmt = select(self.model).where(self.model.id == entity_id)
-        stmt = self._apply_loading_options(stmt=stmt, **kwargs)
+        stmt = self._apply_projection(stmt=stmt, **kwargs)
         if entity := self.session.scalar(stmt):
             return entity
 
         raise EntityNotFoundError()
 
+    def _get_domains_by_ids(self, entity_ids: Sequence[uuid.UUID], /) -> list[Domain_T]:
+        entities = self._get_domains(entity_ids)
+        return [entities[entity_id] for entity_id in entity_ids]
+
+    def _get_domains(
+        self, entity_ids: Collection[uuid.UUID], /, **kwargs: Any
+    ) -> dict[uuid.UUID, Domain_T]:
+        if not entity_ids:
+            return {}
+        stmt = self._get_raw_statement_checked(**kwargs).where(
+            in_ids(self.model.id, entity_ids)
+        )
+        return {row.id: self._from_row(row) for row in self.session.execute(stmt)}
+
+    def _write_returning(self, stmt: Select[Any]) -> Domain_T:
+        # Single round trip: the write runs as a CTE of the returned statement
+        with self._handle_integrity_error():
+            row = self.session.execute(stmt).one_or_none()
+        if row is None:
+            self.session.rollback()
+            raise EntityNotFoundError()
+
+        self._commit_core_write()
+        return self._from_row(row)
+
+    def _ensure_found(
+        self, entity_ids: Iterable[uuid.UUID], found: set[uuid.UUID]
+    ) -> None:
+        if not found.issuperset(entity_ids):
+            self.session.rollback()
+            raise EntityNotFoundError()
+
+    @profiled("conversion")
     def _to_domain(self, model: Model_T, /) -> Domain_T:
         return self.schema.model_validate(model)
 
+    @profiled("conversion")
+    def _to_projected_domain(
+        self, model: Model_T, fields: Collection[str] | None, /
+    ) -> Domain_T:
+        if fields is None:
+            return self._to_domain(model)
+
+        # Partial domain object: only the requested fields are set and validated
+        domain = self.schema.model_construct(_fields_set=set(fields))
+        validator = self.schema.__pydantic_validator__
+        for field in fields:
+            value = self._get_field_value(model, field)
+            validator.validate_assignment(domain, field, value, from_attributes=True)
+        return domain
+
+    def _get_select_statement(
+        self, filters: Mapping[str, Any] | None = None, **kwargs: Any
+    ) -> Select[Any]:
+        if kwargs.get("raw"):
+            stmt = self._get_raw_statement_checked(**kwargs)
+        else:
+            stmt = self._apply_projection(stmt=select(self.model), **kwargs)
+
+        if not filters:
+            return stmt
+
+        if not filters.keys() <= set(inspect(self.model).columns.keys()):
+            raise InvalidFieldsError()
+        return stmt.where(
+            *(getattr(self.model, name) == value for name, value in filters.items())
+        )
+
+    def _get_raw_statement_checked(self, **kwargs: Any) -> Select[Any]:
+        # Raw rows are whole entities: a projection on `fields` would be ignored
+        if kwargs.get("fields") is not None:
+            raise InvalidFieldsError()
+        return self._get_raw_statement(**kwargs)
+
+    @profiled("conversion")
+    def _rows_to_domains(
+        self, rows: Sequence[Row[Any]], **kwargs: Any
+    ) -> list[Domain_T]:
+        if kwargs.get("raw"):
+            return [self._from_row(row) for row in rows]
+
+        fields: Collection[str] | None = kwargs.get("fields")
+        return [self._to_projected_domain(row[0], fields) for row in rows]
+
+    def _get_driver_connection(self) -> psycopg.Connection[Any]:
+        connection: psycopg.Connection[Any] | None = (
+            self.session.connection().connection.driver_connection
+        )
+        if connection is None:
+            raise RepositoryError()
+        return connection
+
+    def _create_staging_table(self) -> Table:
+        # Dropped at the end of the transaction, rolled back or not
+        staging = Table(
+            f"{self.model.__tablename__}_staging",
+            MetaData(),
+            Column[int]("key", Integer, primary_key=True, autoincrement=False),
+            Column[uuid.UUID]("id", Uuid, server_default=func.gen_random_uuid()),
+            *self._get_staging_columns(),
+            prefixes=["TEMPORARY"],
+            postgresql_on_commit="DROP",
+        )
+        staging.create(self.session.connection())
+        return staging
+
+    def _get_staging_columns(self) -> list[Column[Any]]:
+        # The columns of the model, but the generated ones
+        return [
+            Column(model_column.name, model_column.type)
+            for model_column in self._get_table(self.model).c
+            if not model_column.primary_key and model_column.server_default is None
+        ]
+
+    def _to_staging_row(self, item: Create_T_contra, /) -> tuple[Any, ...]:
+        # In the order of `_get_staging_columns`
+        data = item.model_dump()
+        return tuple(
+            data[model_column.name]
+            for model_column in self._get_table(self.model).c
+            if not model_column.primary_key and model_column.server_default is None
+        )
+
+    def _merge_staging(self, staging: Table) -> dict[int, str]:
+        table = self._get_table(self.model)
+        columns = [
+            staging_column
+            for staging_column in staging.c
+            if staging_column.name != "key"
+        ]
+        self.session.execute(
+            pg_insert(table)
+            .from_select(
+                [staging_column.name for staging_column in columns], select(*columns)
+            )
+            .on_conflict_do_nothing()
+        )
+        return self._reject(
+            staging, ~exists().where(table.c.id == staging.c.id), "Already exists"
+        )
+
+    def _reject(
+        self, staging: Table, whereclause: ColumnElement[bool], reason: str
+    ) -> dict[int, str]:
+        """Remove the matching rows from the staging table, by key."""
+        stmt = delete(staging).where(whereclause).returning(staging.c.key)
+        return dict.fromkeys(self.session.scalars(stmt), reason)
+
+    def _get_copy_statement(self) -> Select[Any]:
+        return self._get_raw_statement()
+
+    def _get_version_column(
+        self, **kwargs: Any
+    ) -> ColumnElement[Any] | InstrumentedAttribute[Any]:
+        return self.model.version
+
+    def _get_raw_statement(
+        self, entity: type[Model_T] | None = None, **kwargs: Any
+    ) -> Select[Any]:
+        # Columns in the order of the schema fields, see `_from_row`
+        entity = entity or self.model
+        return select(*(getattr(entity, field) for field in self.schema.model_fields))
+
+    @profiled("conversion")
+    def _from_row(self, row: Row[Any], /) -> Domain_T:
+        # Rows come straight from the database and are not validated again.
+        # Trailing columns (such as the page total) are ignored.
+        return self.schema.model_construct(
+            **dict(zip(self.schema.model_fields, row, strict=False))
+        )
+
+    def _get_field_value(self, model: Model_T, field: str, /) -> Any:
+        return getattr(model, field)
+
     def _apply_loading_options(
         self, stmt: Select[tuple[Model_T]], **kwargs: Any
     ) -> Select[tuple[Model_T]]:
@@ -95,23 +606,262 @@ class SQLAlchemyRepositoryBase(
             stmt = stmt.options(*self.default_loading_options)
         return stmt
 
-    @staticmethod
-    def _apply_pagination(
-        stmt: Select[tuple[Model_T]], pagination: PaginationParams | None
+    def _apply_projection(
+        self, stmt: Select[tuple[Model_T]], **kwargs: Any
     ) -> Select[tuple[Model_T]]:
+        fields: Collection[str] | None = kwargs.get("fields")
+        if fields is None:
+            stmt = self._apply_loading_options(stmt=stmt, **kwargs)
+        else:
+            stmt = self._apply_fields(stmt, fields)
+
+        if self.strict_loading:
+            stmt = stmt.options(raiseload("*"))
+        return stmt
+
+    def _apply_fields(
+        self, stmt: Select[tuple[Model_T]], fields: Collection[str]
+    ) -> Select[tuple[Model_T]]:
+        if not fields or not self.schema.model_fields.keys() >= set(fields):
+            raise InvalidFieldsError()
+
+        # Only load the requested columns (plus the primary key and the sort
+        # columns) and relationships, the other ones are not loaded at all.
+        mapper = inspect(self.model)
+        columns: list[InstrumentedAttribute[Any]] = [
+            *self._get_sort_columns(),
+            *(
+                getattr(self.model, field)
+                for field in fields
+                if field in mapper.columns
+            ),
+        ]
+        relationships = [
+            self._get_relationship_loader(relationship.key)
+            if relationship.key in fields
+            else noload(relationship.class_attribute)
+            for relationship in mapper.relationships
+        ]
+        return stmt.options(
+            load_only(*columns, raiseload=self.strict_loading), *relationships
+        )
+
+    def _get_relationship_loader(self, key: str) -> LoaderOption:
+        """Loader of a relationship requested in `fields`."""
+        return selectinload(getattr(self.model, key))
+
+    def _apply_pagination(
+        self, stmt: Select[Row_T], pagination: PaginationParams | None
+    ) -> Select[Row_T]:
         if pagination is None:
             return stmt
 
-        offset = (pagination.page - 1) * pagination.limit
-        return stmt.offset(offset).limit(pagination.limit)
+        sort_columns = self._get_sort_columns()
+        stmt = stmt.order_by(*sort_columns).limit(pagination.limit)
+
+        if pagination.after is None:
+            offset = (pagination.page - 1) * pagination.limit
+            return stmt.offset(offset)
+
+        # Keyset pagination: seek past the last row of the previous page
+        # instead of scanning and discarding the skipped rows.
+        values = decode_cursor(pagination.after, columns=sort_columns)
+        seek: ColumnElement[bool]
+        if len(sort_columns) == 1:
+            seek = sort_columns[0] > values[0]
+        else:
+            seek = tuple_(*sort_columns) > tuple_(*values)
+        return stmt.where(seek)
+
+    def _get_sort_columns(self) -> list[InstrumentedAttribute[Any]]:
+        sort_column: InstrumentedAttribute[Any] = getattr(self.model, self.sort_key)
+        if self.sort_key == "id":
+            return [sort_column]
+        return [sort_column, self.model.id]
+
+    def _get_next_cursor(
+        self,
+        rows: Sequence[Row[Any]],
+        pagination: PaginationParams | None,
+        raw: bool = False,
+    ) -> str | None:
+        if pagination is None or len(rows) < pagination.limit:
+            return None
+
+        # Raw rows carry the sort columns, ORM rows the entity
+        last: Any = rows[-1] if raw else rows[-1][0]
+        return encode_cursor(
+            [getattr(last, column.key) for column in self._get_sort_columns()]
+        )
+
+    def _get_page(
+        self, stmt: Select[Row_T], pagination: PaginationParams | None
+    ) -> tuple[Sequence[Row[Any]], int | None, bool]:
+        if pagination is None:
+            rows = self.session.execute(stmt).all()
+            return rows, len(rows), True
+
+        strategy = pagination.count
+        table_name = self.model.__tablename__
+
+        if strategy is CountStrategy.NONE:
+            return self.session.execute(stmt).all(), None, False
+
+        if strategy is CountStrategy.CACHED:
+            total = self.count_cache.get(table_name)
+            if total is not None:
+                return self.session.execute(stmt).all(), total, False
+
+        # Fetch the total as an extra (last) column of the page query
+        # to avoid a separate round trip.
+        total_column = self._get_total_column(pagination)
+        rows = self.session.execute(stmt.add_columns(total_column)).all()
+        total: int | None = rows[0][-1] if rows else None
+        total_exact = strategy is not CountStrategy.ESTIMATED
+
+        if total is None:
+            # An empty page carries no total
+            total = self.session.scalar(self._get_count_statement(strategy))
+
+        if total is None or total < 0:
+            # Planner estimate is unavailable until the table is analyzed
+            total = self.session.scalar(self._get_count_statement()) or 0
+            total_exact = True
+
+        if strategy is CountStrategy.CACHED:
+            self.count_cache.set(table_name, total)
+
+        return rows, total, total_exact
+
+    def _get_total_column(self, pagination: PaginationParams) -> ColumnElement[int]:
+        if pagination.count is CountStrategy.ESTIMATED:
+            return self._get_count_statement(pagination.count).scalar_subquery()
+
+        if pagination.after is None:
+            return func.count().over()
+
+        # A window count would only see the rows past the cursor
+        return self._get_count_statement().scalar_subquery()
+
+    def _get_count_statement(
+        self, strategy: CountStrategy = CountStrategy.EXACT
+    ) -> Select[tuple[int]]:
+        if strategy is CountStrategy.ESTIMATED:
+            return select(cast(pg_class.c.reltuples, BigInteger)).where(
+                pg_class.c.oid == cast(self.model.__tablename__, REGCLASS)
+            )
+
+        return select(func.count()).select_from(self.model)
 
     def _create_model(self, data: Create_T_contra) -> Model_T:
         return self.model(**data.model_dump())
 
+    def _insert_many(self, data: Sequence[Create_T_contra]) -> list[uuid.UUID]:
+        return self._insert_rows(self.model, [item.model_dump() for item in data])
+
+    def _insert_rows(
+        self, model: type[Base], rows: Sequence[dict[str, Any]]
+    ) -> list[uuid.UUID]:
+        # Batched into multi-row INSERT ... RETURNING statements
+        stmt = insert(model).returning(model.id, sort_by_parameter_order=True)
+        return list(self.session.scalars(stmt, rows))
+
+    def _update_many(self, data: Mapping[uuid.UUID, Update_T_contra]) -> set[uuid.UUID]:
+        rows = {
+            entity_id: self._get_update_values(item) for entity_id, item in data.items()
+        }
+        return self._update_model_rows(rows)
+
+    def _get_update_values(self, data: Update_T_contra, /) -> dict[str, Any]:
+        """Columns of the model table set by an update."""
+        return data.model_dump(exclude_unset=True)
+
+    def _update_model_rows(
+        self, rows: Mapping[uuid.UUID, dict[str, Any]]
+    ) -> set[uuid.UUID]:
+        return self._update_rows(self._get_table(self.model), rows)
+
+    def _update_rows(
+        self,
+        table: Table,
+        rows: Mapping[uuid.UUID, dict[str, Any]],
+        key: str = "id",
+    ) -> set[uuid.UUID]:
+        # One UPDATE ... FROM (VALUES ...) per distinct set of updated columns.
+        # Rows without values still get their version bumped.
+        groups: defaultdict[tuple[str, ...], list[uuid.UUID]] = defaultdict(list)
+        for entity_id, row in rows.items():
+            groups[tuple(sorted(row))].append(entity_id)
+
+        key_column = table.c[key]
+        updated: set[uuid.UUID] = set()
+        for names, entity_ids in groups.items():
+            data = values(
+                column(key, key_column.type),
+                *(column(name, table.c[name].type) for name in names),
+                name="data",
+            ).data(
+                [
+                    (entity_id, *(rows[entity_id][name] for name in names))
+                    for entity_id in entity_ids
+                ]
+            )
+            stmt = (
+                update(table)
+                .where(key_column == data.c[key])
+                .values(
+                    {
+                        **{name: data.c[name] for name in names},
+                        "version": table.c.version + 1,
+                    }
+                )
+                .returning(key_column)
+            )
+            updated.update(self.session.scalars(stmt))
+
+        return updated
+
+    @staticmethod
+    def _get_table(model: type[Base]) -> Table:
+        return model.metadata.tables[model.__tablename__]
+
     def _commit(self) -> None:
-        try:
+        with self._handle_integrity_error():
             self.session.commit()
+
+    def _commit_core_write(self) -> None:
+        self._commit()
+        # Core statements bypass the identity map: objects loaded before
+        # would otherwise keep their old state in this session.
+        self.session.expire_all()
+
+    def _invalidate_counts(self) -> None:
+        """Forget the cached totals after rows were inserted or deleted.
+
+        The tables referencing the model table are included: their rows are
+        written along (e.g. the addresses of the users) or deleted by cascade.
+        """
+        table = self._get_table(self.model)
+        for item in table.metadata.sorted_tables:
+            if item is table or any(key.references(table) for key in item.foreign_keys):
+                self.count_cache.invalidate(item.name)
+
+    @contextmanager
+    def _handle_integrity_error(self) -> Iterator[None]:
+        try:
+            yield
         except IntegrityError as err:
-            if isinstance(err.orig, UniqueViolation):
-                raise EntityAlreadyExistsError() from err
-            raise RepositoryError() from err
+            self.session.rollback()
+            raise to_repository_error(err.orig) from err
+
+    @contextmanager
+    def _handle_copy_error(self) -> Iterator[None]:
+        # COPY runs on the driver connection: its errors aren't wrapped
+        try:
+            yield
+        except psycopg.Error as err:
+            self.session.rollback()
+            raise to_repository_error(err) from err
+        except DBAPIError as err:
+            self.session.rollback()
+            raise to_repository_error(err.orig) from err
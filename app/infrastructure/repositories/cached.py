@@ -0,0 +1,256 @@
+import uuid
+from collections.abc import Collection, Hashable, Iterator, Mapping, Sequence
+from typing import Any, ClassVar, Generic
+
+from app.core.singleflight import freeze
+from app.domain.models.address import AddressDomain
+from app.domain.models.base import (
+    Create_T_contra,
+    Domain_T,
+    DomainPagination,
+    ExportFormat,
+    PaginationParams,
+    Update_T_contra,
+)
+from app.domain.models.post import PostDomain
+from app.domain.models.user import UserDomain
+from app.domain.repository import AbstractRepository
+from app.infrastructure.cache import EntityCache
+
+CacheTag = tuple[str, uuid.UUID]
+
+
+class CachePolicy(Generic[Domain_T]):
+    """Which tags a cached entity depends on and which tags a write invalidates."""
+
+    namespace: ClassVar[str]
+
+    def get_key(self, entity_id: uuid.UUID, kwargs: dict[str, Any]) -> Hashable:
+        return (self.namespace, entity_id, freeze(kwargs))
+
+    def get_tag(self, entity_id: uuid.UUID) -> CacheTag:
+        return (self.namespace, entity_id)
+
+    def get_dependencies(
+        self, entity_id: uuid.UUID, entity: Domain_T
+    ) -> list[CacheTag]:
+        return [self.get_tag(entity_id)]
+
+    def get_invalidations(
+        self, entity_id: uuid.UUID, entity: Domain_T | None
+    ) -> list[CacheTag]:
+        """Tags to invalidate after an update, `entity` is None on deletion."""
+        return [self.get_tag(entity_id)]
+
+    def get_creation_invalidations(self, entity: Domain_T) -> list[CacheTag]:
+        return []
+
+
+class UserCachePolicy(CachePolicy[UserDomain]):
+    namespace = "user"
+
+    def get_dependencies(
+        self, entity_id: uuid.UUID, entity: UserDomain
+    ) -> list[CacheTag]:
+        # Users loaded with their posts go stale when one of them changes,
+        # or when the author gets a new one.
+        return [
+            *super().get_dependencies(entity_id, entity),
+            ("user-posts", entity_id),
+            *(("post", post.id) for post in entity.posts),
+        ]
+
+    def get_invalidations(
+        self, entity_id: uuid.UUID, entity: UserDomain | None
+    ) -> list[CacheTag]:
+        tags = super().get_invalidations(entity_id, entity)
+        if entity is None:
+            # Posts and address are deleted along with the user
+            tags.append(("owner", entity_id))
+        return tags
+
+
+class PostCachePolicy(CachePolicy[PostDomain]):
+    namespace = "post"
+
+    def get_dependencies(
+        self, entity_id: uuid.UUID, entity: PostDomain
+    ) -> list[CacheTag]:
+        return [
+            *super().get_dependencies(entity_id, entity),
+            ("owner", entity.author_id),
+        ]
+
+    def get_invalidations(
+        self, entity_id: uuid.UUID, entity: PostDomain | None
+    ) -> list[CacheTag]:
+        tags = super().get_invalidations(entity_id, entity)
+        if entity is not None:
+            # The post may have moved to another author
+            tags.append(("user-posts", entity.author_id))
+        return tags
+
+    def get_creation_invalidations(self, entity: PostDomain) -> list[CacheTag]:
+        return [("user-posts", entity.author_id)]
+
+
+class AddressCachePolicy(CachePolicy[AddressDomain]):
+    namespace = "address"
+
+    def get_dependencies(
+        self, entity_id: uuid.UUID, entity: AddressDomain
+    ) -> list[CacheTag]:
+        tags = super().get_dependencies(entity_id, entity)
+        if entity.user_id is not None:
+            # Addresses are updated through their user
+            tags.append(("user", entity.user_id))
+        return tags
+
+
+class CachedRepository(
+    AbstractRepository[Domain_T, Create_T_contra, Update_T_contra],
+    Generic[Domain_T, Create_T_contra, Update_T_contra],
+):
+    """Read-through cache of `get_by_id` results, invalidated on writes."""
+
+    def __init__(
+        self,
+        repository: AbstractRepository[Domain_T, Create_T_contra, Update_T_contra],
+        cache: EntityCache,
+        policy: CachePolicy[Domain_T],
+    ):
+        self.repository = repository
+        self.schema = repository.schema
+        self.cache = cache
+        self.policy = policy
+
+    def get_all(
+        self, pagination: PaginationParams | None = None, **kwargs: Any
+    ) -> DomainPagination[Domain_T]:
+        return self.repository.get_all(pagination, **kwargs)
+
+    def get_by_id(self, entity_id: uuid.UUID, /, **kwargs: Any) -> Domain_T:
+        key = self.policy.get_key(entity_id, kwargs)
+        cached = self.cache.get(key)
+        if isinstance(cached, self.schema):
+            return cached
+
+        generation = self.cache.generation
+        entity = self.repository.get_by_id(entity_id, **kwargs)
+        self.cache.set(
+            key,
+            entity,
+            tags=self.policy.get_dependencies(entity_id, entity),
+            generation=generation,
+        )
+        return entity
+
+    def get_many(
+        self, entity_ids: Collection[uuid.UUID], /, **kwargs: Any
+    ) -> dict[uuid.UUID, Domain_T]:
+        entities: dict[uuid.UUID, Domain_T] = {}
+        for entity_id in entity_ids:
+            cached = self.cache.get(self.policy.get_key(entity_id, kwargs))
+            if isinstance(cached, self.schema):
+                entities[entity_id] = cached
+
+        # Only the missing entities are loaded, in one query
+        missing = [entity_id for entity_id in entity_ids if entity_id not in entities]
+        if not missing:
+            return entities
+        generation = self.cache.generation
+        loaded = self.repository.get_many(missing, **kwargs)
+        for entity_id, entity in loaded.items():
+            self.cache.set(
+                self.policy.get_key(entity_id, kwargs),
+                entity,
+                tags=self.policy.get_dependencies(entity_id, entity),
+                generation=generation,
+            )
+        return entities | loaded
+
+    def get_version(self, entity_id: uuid.UUID, /, **kwargs: Any) -> str:
+        return self.repository.get_version(entity_id, **kwargs)
+
+    def get_page_version(
+        self, pagination: PaginationParams | None = None, **kwargs: Any
+    ) -> str:
+        return self.repository.get_page_version(pagination, **kwargs)
+
+    def iter_all(
+        self,
+        batch_size: int = 1_000,
+        filters: Mapping[str, Any] | None = None,
+        **kwargs: Any,
+    ) -> Iterator[Domain_T]:
+        return self.repository.iter_all(batch_size, filters=filters, **kwargs)
+
+    def iter_batches(
+        self,
+        batch_size: int = 1_000,
+        filters: Mapping[str, Any] | None = None,
+        **kwargs: Any,
+    ) -> Iterator[list[Domain_T]]:
+        return self.repository.iter_batches(batch_size, filters=filters, **kwargs)
+
+    def copy_to(
+        self, export_format: ExportFormat = ExportFormat.CSV
+    ) -> Iterator[bytes]:
+        return self.repository.copy_to(export_format)
+
+    def copy_from(self, data: Mapping[int, Create_T_contra], /) -> dict[int, str]:
+        rejected = self.repository.copy_from(data)
+        # The imported entities are not known: everything may depend on them
+        self.cache.clear()
+        return rejected
+
+    def create(self, data: Create_T_contra, /) -> Domain_T:
+        entity = self.repository.create(data)
+        self._invalidate_created([entity])
+        return entity
+
+    def update(self, entity_id: uuid.UUID, data: Update_T_contra, /) -> Domain_T:
+        entity = self.repository.update(entity_id, data)
+        self.cache.invalidate(*self.policy.get_invalidations(entity_id, entity))
+        return entity
+
+    def delete(self, entity_id: uuid.UUID, /) -> None:
+        self.repository.delete(entity_id)
+        self.cache.invalidate(*self.policy.get_invalidations(entity_id, None))
+
+    def create_many(self, data: Sequence[Create_T_contra], /) -> list[Domain_T]:
+        entities = self.repository.create_many(data)
+        self._invalidate_created(entities)
+        return entities
+
+    def update_many(
+        self, data: Mapping[uuid.UUID, Update_T_contra], /
+    ) -> list[Domain_T]:
+        entities = self.repository.update_many(data)
+        self.cache.invalidate(
+            *(
+                tag
+                for entity_id, entity in zip(data, entities, strict=True)
+                for tag in self.policy.get_invalidations(entity_id, entity)
+            )
+        )
+        return entities
+
+    def delete_many(self, entity_ids: Sequence[uuid.UUID], /) -> None:
+        self.repository.delete_many(entity_ids)
+        self.cache.invalidate(
+            *(
+                tag
+                for entity_id in entity_ids
+                for tag in self.policy.get_invalidations(entity_id, None)
+            )
+        )
+
+    def _invalidate_created(self, entities: Sequence[Domain_T]) -> None:
+        self.cache.invalidate(
+            *(
+                tag
+                for entity in entities
+                for tag in self.policy.get_creation_invalidations(entity)
+            )
+        )
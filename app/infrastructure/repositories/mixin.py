@@ -1,6 +1,8 @@
+from sqlalchemy import ScalarSelect, func, literal_column, select
+
 from app.domain.models.base import PostId, TagName, UserId
 from app.domain.models.post import PostDomain
-from app.infrastructure.models import Post
+from app.infrastructure.models import Post, Tag, post_tag
 
 
 class DomainConverterMixin:
@@ -13,3 +15,13 @@ class DomainConverterMixin:
             author_id=UserId(post.author_id),
             tags=[TagName(tag.name) for tag in post.tags],
         )
+
+    @staticmethod
+    def _get_post_tags_column(post: type[Post] = Post) -> ScalarSelect[list[str]]:
+        # Tag names of the enclosing post, aggregated in an array
+        return (
+            select(func.coalesce(func.array_agg(Tag.name), literal_column("'{}'")))
+            .join(post_tag, post_tag.c.tag_id == Tag.id)
+            .where(post_tag.c.post_id == post.id)
+            .scalar_subquery()
+        )
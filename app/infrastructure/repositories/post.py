@@ -1,14 +1,36 @@
 import uuid
-from typing import ClassVar
+from collections.abc import Iterable, Mapping, Sequence
+from itertools import batched
+from typing import Any, ClassVar
 
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import (
+    Column,
+    Row,
+    Select,
+    String,
+    Table,
+    Uuid,
+    any_,
+    bindparam,
+    column,
+    delete,
+    exists,
+    func,
+    insert,
+    select,
+    values,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import selectinload
 from sqlalchemy.orm.interfaces import LoaderOption
 
+from app.core.profiling import profiled
 from app.domain.models.post import PostCreateDomain, PostDomain, PostUpdateDomain
-from app.infrastructure.models import Post, Tag
-from app.infrastructure.repositories.base import SQLAlchemyRepositoryBase
+from app.infrastructure.cache import LRUCache
+from app.infrastructure.models import Post, Tag, User, post_tag
+from app.infrastructure.repositories.base import SQLAlchemyRepositoryBase, in_ids
 from app.infrastructure.repositories.mixin import DomainConverterMixin
-from app.infrastructure.repositories.user import UserSQLAlchemyRepository
 
 
 class PostSQLAlchemyRepository(
@@ -24,37 +46,207 @@ class PostSQLAlchemyRepository(
     schema = PostDomain
     default_loading_options: ClassVar[list[LoaderOption]] = [selectinload(Post.tags)]
 
-    def __init__(self, session: Session, user_repository: UserSQLAlchemyRepository):
-        super().__init__(session)
-        self.user_repository = user_repository
+    tag_cache: ClassVar[LRUCache[str, uuid.UUID]] = LRUCache(maxsize=10_000)
 
     def create(self, data: PostCreateDomain, /) -> PostDomain:
-        # Check if user exists
-        self.user_repository.get_by_id(data.author_id)
+        return self.create_many([data])[0]
 
-        post = self.model(
-            title=data.title,
-            content=data.content,
-            author_id=data.author_id,
-            tags=[Tag(name=tag) for tag in data.tags],
+    def update(self, entity_id: uuid.UUID, data: PostUpdateDomain, /) -> PostDomain:
+        if data.tags is None:
+            return super().update(entity_id, data)
+        return self.update_many({entity_id: data})[0]
+
+    def _get_update_values(self, data: PostUpdateDomain, /) -> dict[str, Any]:
+        # Tags are linked separately, an explicit null leaves them unchanged
+        return data.model_dump(exclude_unset=True, exclude={"tags"})
+
+    def _insert_many(self, data: Sequence[PostCreateDomain]) -> list[uuid.UUID]:
+        # Unknown authors are reported by the foreign key
+        post_ids = self._insert_rows(
+            Post, [item.model_dump(exclude={"tags"}) for item in data]
+        )
+        self._link_tags(
+            {post_id: item.tags for item, post_id in zip(data, post_ids, strict=True)}
         )
-        self.session.add(post)
+        return post_ids
 
-        self._commit()
-        return self._to_domain(post)
+    def _update_many(
+        self, data: Mapping[uuid.UUID, PostUpdateDomain]
+    ) -> set[uuid.UUID]:
+        posts = {
+            entity_id: self._get_update_values(item) for entity_id, item in data.items()
+        }
+        found = self._update_model_rows(posts)
 
-    def update(self, entity_id: uuid.UUID, data: PostUpdateDomain, /) -> PostDomain:
-        entity = self._get_entity_by_id(entity_id)
-        entity_data = data.model_dump(exclude_unset=True)
+        tags = {
+            entity_id: item.tags
+            for entity_id, item in data.items()
+            if item.tags is not None and entity_id in found
+        }
+        if tags:
+            self.session.execute(
+                delete(post_tag).where(in_ids(post_tag.c.post_id, tags))
+            )
+            self._link_tags(tags)
+
+        return found
+
+    def _link_tags(self, tags: Mapping[uuid.UUID, Iterable[str]]) -> None:
+        links = {
+            post_id: list(dict.fromkeys(post_tags))
+            for post_id, post_tags in tags.items()
+        }
+        names = {name for post_tags in links.values() for name in post_tags}
+        tag_ids = self._get_tag_ids(names)
+
+        stale = self._insert_links(
+            (post_id, tag_ids[name])
+            for post_id, post_tags in links.items()
+            for name in post_tags
+        )
+        if not stale:
+            return
+
+        # Some cached tags no longer exist: resolve them again from the database
+        stale_names = {name for name in names if tag_ids[name] in stale}
+        for name in stale_names:
+            self.tag_cache.delete(name)
+        tag_ids = self._get_tag_ids(stale_names)
+        self._insert_links(
+            (post_id, tag_ids[name])
+            for post_id, post_tags in links.items()
+            for name in post_tags
+            if name in stale_names
+        )
+
+    def _get_tag_ids(self, names: Iterable[str]) -> dict[str, uuid.UUID]:
+        tag_ids: dict[str, uuid.UUID] = {}
+        missing: set[str] = set()
+        for name in names:
+            if (tag_id := self.tag_cache.get(name)) is not None:
+                tag_ids[name] = tag_id
+            else:
+                missing.add(name)
+
+        if missing:
+            resolved = self._upsert_tags(missing)
+            for name, tag_id in resolved.items():
+                self.tag_cache.set(name, tag_id)
+            tag_ids.update(resolved)
+
+        return tag_ids
+
+    def _upsert_tags(self, names: set[str]) -> dict[str, uuid.UUID]:
+        tag_ids: dict[str, uuid.UUID] = {}
+        # Sorted to always take the unique index locks in the same order
+        for batch in batched(sorted(names), self.batch_size):
+            stmt = (
+                pg_insert(Tag)
+                .values([{"name": name} for name in batch])
+                .on_conflict_do_nothing(index_elements=[Tag.name])
+                .returning(Tag.name, Tag.id)
+            )
+            tag_ids.update(self.session.execute(stmt).tuples().all())
 
-        if "tags" in entity_data:
-            entity.tags = [Tag(name=tag) for tag in entity_data.pop("tags")]
+        existing = names - tag_ids.keys()
+        if existing:
+            names_param = bindparam(None, list(existing), type_=ARRAY(String()))
+            stmt = select(Tag.name, Tag.id).where(Tag.name == any_(names_param))
+            tag_ids.update(self.session.execute(stmt).tuples().all())
 
-        for key, value in entity_data.items():
-            setattr(entity, key, value)
+        return tag_ids
 
-        self._commit()
-        return self._to_domain(entity)
+    def _insert_links(
+        self, links: Iterable[tuple[uuid.UUID, uuid.UUID]]
+    ) -> set[uuid.UUID]:
+        """Insert post_tag rows and return the tag ids which no longer exist."""
+        stale: set[uuid.UUID] = set()
+        for batch in batched(links, self.batch_size):
+            data = values(
+                column("post_id", Uuid()), column("tag_id", Uuid()), name="data"
+            ).data(list(batch))
+            stmt = (
+                insert(post_tag)
+                .from_select(
+                    ["post_id", "tag_id"],
+                    select(data.c.post_id, Tag.id).join(Tag, Tag.id == data.c.tag_id),
+                )
+                .returning(post_tag.c.tag_id)
+            )
+            linked = set(self.session.scalars(stmt))
+            stale.update(tag_id for _, tag_id in batch if tag_id not in linked)
 
+        return stale
+
+    def _get_staging_columns(self) -> list[Column[Any]]:
+        return [
+            Column("title", String),
+            Column("content", String),
+            Column("author_id", Uuid),
+            Column("tags", ARRAY(String)),
+        ]
+
+    def _to_staging_row(self, item: PostCreateDomain, /) -> tuple[Any, ...]:
+        tags = list(dict.fromkeys(item.tags))
+        return (item.title, item.content, item.author_id, tags)
+
+    def _merge_staging(self, staging: Table) -> dict[int, str]:
+        row = staging.c
+        rejected = self._reject(
+            staging, ~exists().where(User.id == row.author_id), "Author not found"
+        )
+        self.session.execute(
+            insert(self._get_table(Post)).from_select(
+                ["id", "title", "content", "author_id"],
+                select(row.id, row.title, row.content, row.author_id),
+            )
+        )
+
+        # Sorted to always take the unique index locks in the same order
+        names = select(func.unnest(row.tags).label("name")).distinct().subquery()
+        self.session.execute(
+            pg_insert(self._get_table(Tag))
+            .from_select(
+                ["id", "name"],
+                select(func.gen_random_uuid(), names.c.name).order_by(names.c.name),
+            )
+            .on_conflict_do_nothing(index_elements=["name"])
+        )
+        self.session.execute(
+            insert(post_tag).from_select(
+                ["post_id", "tag_id"],
+                select(row.id, Tag.id).join(Tag, Tag.name == any_(row.tags)),
+            )
+        )
+        return rejected
+
+    @profiled("conversion")
     def _to_domain(self, model: Post, /) -> PostDomain:
         return self._convert_post_to_domain(post=model)
+
+    def _get_raw_statement(
+        self, entity: type[Post] | None = None, **kwargs: Any
+    ) -> Select[Any]:
+        post = entity or Post
+        return select(
+            post.id,
+            post.title,
+            post.content,
+            post.author_id,
+            self._get_post_tags_column(post).label("tags"),
+        )
+
+    @profiled("conversion")
+    def _from_row(self, row: Row[Any], /) -> PostDomain:
+        return PostDomain.model_construct(
+            id=row.id,
+            title=row.title,
+            content=row.content,
+            author_id=row.author_id,
+            tags=row.tags,
+        )
+
+    def _get_field_value(self, model: Post, field: str, /) -> Any:
+        if field == "tags":
+            return [tag.name for tag in model.tags]
+        return super()._get_field_value(model, field)
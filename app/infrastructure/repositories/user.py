@@ -1,15 +1,39 @@
 import uuid
+from collections.abc import Mapping, Sequence
 from typing import Any, ClassVar
 
-from sqlalchemy import Select
-from sqlalchemy.orm import noload, selectinload
+from sqlalchemy import (
+    Column,
+    ColumnElement,
+    FromClause,
+    Row,
+    Select,
+    String,
+    Table,
+    and_,
+    delete,
+    exists,
+    func,
+    literal,
+    null,
+    select,
+)
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import InstrumentedAttribute, noload, selectinload
 from sqlalchemy.orm.interfaces import LoaderOption
 
-from app.domain.models.address import AddressCompactDomain
+from app.core.profiling import profiled
+from app.domain.models.address import AddressCompactDomain, AddressCreateDomain
 from app.domain.models.base import UserId
+from app.domain.models.post import PostDomain
 from app.domain.models.user import UserCreateDomain, UserDomain, UserUpdateDomain
-from app.infrastructure.models import Address, User
-from app.infrastructure.repositories.base import SQLAlchemyRepositoryBase
+from app.infrastructure.models import Address, Post, User
+from app.infrastructure.repositories.base import (
+    SQLAlchemyRepositoryBase,
+    insert_cte,
+    update_cte,
+)
 from app.infrastructure.repositories.mixin import DomainConverterMixin
 
 
@@ -28,21 +52,29 @@ class UserSQLAlchemyRepository(
         selectinload(User.address),
         noload(User.posts),
     ]
+    sort_key: ClassVar[str] = "username"
+
+    def create(self, data: UserCreateDomain, /) -> UserDomain:
+        user_id = uuid.uuid4()
+        user = insert_cte(User, {**data.model_dump(exclude={"address"}), "id": user_id})
+        address = insert_cte(Address, {**data.address.model_dump(), "user_id": user_id})
+        result = self._write_returning(self._get_raw_statement(user, address=address))
+        self._invalidate_counts()
+        return result
 
     def update(self, entity_id: uuid.UUID, data: UserUpdateDomain, /) -> UserDomain:
-        user = self._get_entity_by_id(entity_id)
         user_data = data.model_dump(exclude_unset=True)
+        address_data: dict[str, Any] = user_data.pop("address", None) or {}
 
-        if "address" in user_data:
-            address_data = user_data.pop("address")
-            for key, value in address_data.items():
-                setattr(user.address, key, value)
-
-        for key, value in user_data.items():
-            setattr(user, key, value)
-
-        self._commit()
-        return self._to_domain(user)
+        # The user version is bumped along with its address
+        user = update_cte(User, User.id == entity_id, user_data)
+        address = (
+            update_cte(Address, Address.user_id == entity_id, address_data)
+            if address_data
+            else Address
+        )
+        stmt = self._get_raw_statement(user, address=address)
+        return self._write_returning(stmt.where(user.id == entity_id))
 
     def _apply_loading_options(
         self, stmt: Select[tuple[User]], **kwargs: Any
@@ -50,18 +82,206 @@ class UserSQLAlchemyRepository(
         options = [selectinload(User.address)]
 
         if kwargs.get("include_posts"):
-            options.append(selectinload(User.posts))
+            options.append(selectinload(User.posts).selectinload(Post.tags))
         else:
             options.append(noload(User.posts))
 
         stmt = stmt.options(*options)
         return stmt
 
-    def _create_model(self, data: UserCreateDomain) -> User:
-        user_data = data.model_dump(exclude={"address"})
-        address_data = data.address.model_dump()
-        return User(**user_data, address=Address(**address_data))
+    def _get_relationship_loader(self, key: str) -> LoaderOption:
+        if key == "posts":
+            return selectinload(User.posts).selectinload(Post.tags)
+        return super()._get_relationship_loader(key)
+
+    def _get_field_value(self, model: User, field: str, /) -> Any:
+        if field == "posts":
+            return [self._convert_post_to_domain(post) for post in model.posts]
+        return super()._get_field_value(model, field)
+
+    def _get_copy_statement(self) -> Select[Any]:
+        # Users with their address, without the (null) posts column
+        stmt = self._get_raw_statement()
+        return stmt.with_only_columns(
+            *(column for column in stmt.selected_columns if column.key != "posts"),
+            maintain_column_froms=True,
+        )
+
+    def _get_version_column(
+        self, **kwargs: Any
+    ) -> ColumnElement[Any] | InstrumentedAttribute[Any]:
+        if not kwargs.get("include_posts"):
+            return User.version
+
+        # The posts are part of the user: a new, deleted or updated post
+        # changes its version.
+        posts = (
+            select(
+                func.string_agg(
+                    func.concat(Post.id, ":", Post.version),
+                    aggregate_order_by(literal(","), Post.id),
+                )
+            )
+            .where(Post.author_id == User.id)
+            .scalar_subquery()
+        )
+        return func.concat(User.version, "-", func.md5(posts))
+
+    def _get_raw_statement(
+        self,
+        entity: type[User] | None = None,
+        address: type[Address] | None = None,
+        **kwargs: Any,
+    ) -> Select[Any]:
+        user = entity or User
+        address = address or Address
+        stmt = select(
+            user.id,
+            user.username,
+            user.email,
+            address.id.label("address_id"),
+            address.street,
+            address.city,
+            address.zip_code,
+            address.country,
+        ).join(address, address.user_id == user.id)
+
+        if not kwargs.get("include_posts"):
+            return stmt.add_columns(null().label("posts"))
+
+        posts = (
+            select(
+                func.json_agg(
+                    func.json_build_object(
+                        "id",
+                        Post.id,
+                        "title",
+                        Post.title,
+                        "content",
+                        Post.content,
+                        "author_id",
+                        Post.author_id,
+                        "tags",
+                        self._get_post_tags_column(),
+                    )
+                )
+            )
+            .where(Post.author_id == user.id)
+            .scalar_subquery()
+        )
+        return stmt.add_columns(posts.label("posts"))
+
+    @profiled("conversion")
+    def _from_row(self, row: Row[Any], /) -> UserDomain:
+        posts: list[dict[str, Any]] = row.posts or []
+        return UserDomain.model_construct(
+            id=row.id,
+            username=row.username,
+            email=row.email,
+            address=AddressCompactDomain.model_construct(
+                id=row.address_id,
+                street=row.street,
+                city=row.city,
+                zip_code=row.zip_code,
+                country=row.country,
+            ),
+            # Posts come as JSON and need to be validated
+            posts=[PostDomain.model_validate(post) for post in posts],
+        )
+
+    def _insert_many(self, data: Sequence[UserCreateDomain]) -> list[uuid.UUID]:
+        user_ids = self._insert_rows(
+            User, [item.model_dump(exclude={"address"}) for item in data]
+        )
+        self._insert_rows(
+            Address,
+            [
+                {**item.address.model_dump(), "user_id": user_id}
+                for item, user_id in zip(data, user_ids, strict=True)
+            ],
+        )
+        return user_ids
+
+    def _update_many(
+        self, data: Mapping[uuid.UUID, UserUpdateDomain]
+    ) -> set[uuid.UUID]:
+        users = {
+            entity_id: item.model_dump(exclude_unset=True, exclude={"address"})
+            for entity_id, item in data.items()
+        }
+        addresses = {
+            entity_id: item.address.model_dump(exclude_unset=True)
+            for entity_id, item in data.items()
+            if item.address is not None
+        }
+
+        found = self._update_model_rows(users)
+        self._update_rows(self._get_table(Address), addresses, key="user_id")
+        return found
+
+    def _get_staging_columns(self) -> list[Column[Any]]:
+        return [
+            Column(name, String)
+            for name in ("username", "email", *AddressCreateDomain.model_fields)
+        ]
+
+    def _to_staging_row(self, item: UserCreateDomain, /) -> tuple[Any, ...]:
+        return (item.username, item.email, *item.address.model_dump().values())
+
+    def _merge_staging(self, staging: Table) -> dict[int, str]:
+        row = staging.c
+        other = staging.alias("other")
+        addresses = self._get_table(Address)
+        address_fields = list(AddressCreateDomain.model_fields)
+
+        def same_address(table: FromClause) -> ColumnElement[bool]:
+            return and_(*(table.c[name] == row[name] for name in address_fields))
+
+        # The first row of the import wins over the following duplicates
+        rejected: dict[int, str] = {}
+        for whereclause, reason in (
+            (exists().where(User.email == row.email), "Email already exists"),
+            (
+                exists().where(other.c.email == row.email, other.c.key < row.key),
+                "Duplicate email",
+            ),
+            (exists().where(same_address(addresses)), "Address already exists"),
+            (
+                exists().where(same_address(other), other.c.key < row.key),
+                "Duplicate address",
+            ),
+        ):
+            rejected |= self._reject(staging, whereclause, reason)
+
+        # Rows inserted concurrently since the checks are skipped too
+        self.session.execute(
+            pg_insert(self._get_table(User))
+            .from_select(
+                ["id", "username", "email"], select(row.id, row.username, row.email)
+            )
+            .on_conflict_do_nothing()
+        )
+        rejected |= self._reject(
+            staging, ~exists().where(User.id == row.id), "Email already exists"
+        )
+        self.session.execute(
+            pg_insert(addresses)
+            .from_select(
+                ["id", "user_id", *address_fields],
+                select(
+                    func.gen_random_uuid(),
+                    row.id,
+                    *(row[name] for name in address_fields),
+                ),
+            )
+            .on_conflict_do_nothing()
+        )
+        without_address = ~exists().where(Address.user_id == row.id)
+        self.session.execute(delete(User).where(User.id == row.id, without_address))
+        rejected |= self._reject(staging, without_address, "Address already exists")
+        return rejected
 
+    @profiled("conversion")
     def _to_domain(self, model: User, /) -> UserDomain:
         return UserDomain(
             id=UserId(model.id),
@@ -1,37 +1,295 @@
+import bisect
+import contextvars
+import functools
+import inspect
 import logging
+import random
+import re
+import threading
 import time
-from collections.abc import Iterator
+import warnings
+from collections import Counter, deque
+from collections.abc import Awaitable, Callable, Iterator
 from contextlib import contextmanager
-from typing import Any, Self
+from types import TracebackType
+from typing import Any, Literal, ParamSpec, Self, TypeVar, cast
 
 from pydantic import BaseModel
 from sqlalchemy import Engine, event
 from sqlalchemy.engine import Connection
 from sqlalchemy.engine.interfaces import DBAPICursor, ExecutionContext
 
+from app.core.profiling import get_profile
+from app.infrastructure.exceptions import (
+    NPlusOneError,
+    NPlusOneWarning,
+    QueryBudgetExceededError,
+)
+
 logger = logging.getLogger("infra.repository")
 
+P = ParamSpec("P")
+R = TypeVar("R")
+
 
 class TimedExecutionContext(ExecutionContext):
-    start: float
+    # Set by the before hook, None when the execution is not instrumented
+    start: float | None
 
 
 class QueryInfo(BaseModel):
+    statement: str
+    parameters: dict[str, Any] | list[dict[str, Any]]
+    duration: float
+
+
+class QuerySummary(BaseModel):
+    queries_count: int
+    duration: float
+    slowest: QueryInfo | None
+
+    @property
+    def headers(self) -> dict[str, str]:
+        return {
+            "Server-Timing": (
+                f'db;dur={self.duration:.2f};desc="{self.queries_count} queries"'
+            ),
+            "X-Query-Count": str(self.queries_count),
+        }
+
+    def __str__(self) -> str:
+        summary = f"{self.queries_count} queries in {self.duration:.2f} ms"
+        if self.slowest is not None:
+            summary += (
+                f", slowest [{self.slowest.duration:.2f} ms] {self.slowest.statement}"
+            )
+        return summary
+
+
+class QueryScope:
+    """Queries executed while the scope is active.
+
+    `repeat_threshold` flags N+1 patterns: when a statement fingerprint runs
+    more than that many times, a NPlusOneWarning is emitted (or NPlusOneError
+    raised with `on_repeat="raise"`).
+    """
+
+    def __init__(
+        self,
+        log: bool = True,
+        repeat_threshold: int | None = None,
+        on_repeat: Literal["warn", "raise"] = "warn",
+    ) -> None:
+        self.log = log
+        self.repeat_threshold = repeat_threshold
+        self.on_repeat = on_repeat
+        self._queries: list[QueryInfo] = []
+        self._fingerprints: Counter[str] = Counter()
+
+    @property
+    def queries(self) -> list[QueryInfo]:
+        return list(self._queries)
+
+    @property
+    def queries_count(self) -> int:
+        return len(self._queries)
+
+    @property
+    def summary(self) -> QuerySummary:
+        return QuerySummary(
+            queries_count=len(self._queries),
+            duration=sum(query.duration for query in self._queries),
+            slowest=max(self._queries, key=lambda query: query.duration, default=None),
+        )
+
+    def get_repeated(self, threshold: int = 1) -> dict[str, int]:
+        """Fingerprints which ran more than `threshold` times."""
+        return {
+            key: count for key, count in self._fingerprints.items() if count > threshold
+        }
+
+    def add(self, query: QueryInfo) -> None:
+        self._queries.append(query)
+        key = fingerprint(query.statement)
+        self._fingerprints[key] += 1
+
+        if self._fingerprints[key] - 1 != self.repeat_threshold:
+            return
+        message = f"Statement ran more than {self.repeat_threshold} times: {key}"
+        if self.on_repeat == "raise":
+            raise NPlusOneError(message)
+        warnings.warn(message, NPlusOneWarning, stacklevel=2)
+
+
+class QueryBudget:
+    """Fail when more than `limit` queries run in the block or the function.
+
+    Usable as a context manager or as a decorator of sync and async functions.
+    """
+
+    def __init__(self, limit: int, **kwargs: Any) -> None:
+        self.limit = limit
+        self.kwargs = kwargs
+        self._scopes: list[QueryScope] = []
+
+    def __enter__(self) -> QueryScope:
+        scope = QueryScope(log=False, **self.kwargs)
+        SQLAlchemyInstrument().push_scope(scope)
+        self._scopes.append(scope)
+        return scope
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        scope = self._scopes.pop()
+        SQLAlchemyInstrument().pop_scope(scope)
+        if exc_type is None and scope.queries_count > self.limit:
+            statements = "\n".join(
+                f"  {count} x {key}" for key, count in scope.get_repeated(0).items()
+            )
+            raise QueryBudgetExceededError(
+                f"{scope.queries_count} queries executed, "
+                f"the budget is {self.limit}:\n{statements}"
+            )
+
+    def __call__(self, fn: Callable[P, R]) -> Callable[P, R]:
+        # A budget per call, the decorated function may run concurrently
+        if inspect.iscoroutinefunction(fn):
+            async_fn = cast(Callable[P, Awaitable[Any]], fn)
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args: P.args, **kwargs: P.kwargs) -> Any:
+                with QueryBudget(self.limit, **self.kwargs):
+                    return await async_fn(*args, **kwargs)
+
+            return cast(Callable[P, R], async_wrapper)
+
+        @functools.wraps(fn)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            with QueryBudget(self.limit, **self.kwargs):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+
+def max_queries(limit: int, **kwargs: Any) -> QueryBudget:
+    """Query budget for service methods and tests, see `QueryBudget`."""
+    return QueryBudget(limit, **kwargs)
+
+
+# Upper bounds (ms) of the query time histogram buckets, plus +Inf
+QUERY_TIME_BUCKETS = (1.0, 5.0, 10.0, 50.0, 100.0, 500.0, 1000.0)
+
+_PARAMETER = re.compile(r"(?:%\(\w+\)s|%s|\$\d+|\?)(?:::\w+(?:\[\])?)?")
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PARAMETER_LIST = re.compile(r"\(\?(?:\s*,\s*\?)*\)")
+_ROW_LIST = re.compile(r"\(\?\.\.\.\)(?:\s*,\s*\(\?\.\.\.\))+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@functools.lru_cache(maxsize=4096)
+def fingerprint(statement: str) -> str:
+    """Normalize a statement so that executions differing only by their
+    values, number of IN parameters or number of VALUES rows are grouped."""
+    statement = _WHITESPACE.sub(" ", statement).strip()
+    statement = _PARAMETER.sub("?", statement)
+    statement = _LITERAL.sub("?", statement)
+    statement = _PARAMETER_LIST.sub("(?...)", statement)
+    return _ROW_LIST.sub("(?...)", statement)
+
+
+class QueryStats(BaseModel):
+    fingerprint: str
+    calls: int
+    total_time: float
+    min_time: float
+    max_time: float
+    rows: int
+    histogram: list[int]
+
+    @property
+    def mean_time(self) -> float:
+        return self.total_time / self.calls
+
+
+class _QueryCounters:
+    __slots__ = ("calls", "histogram", "max_time", "min_time", "rows", "total_time")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.total_time = 0.0
+        self.min_time = float("inf")
+        self.max_time = 0.0
+        self.rows = 0
+        self.histogram = [0] * (len(QUERY_TIME_BUCKETS) + 1)
+
+    def add(self, duration: float, rows: int) -> None:
+        self.calls += 1
+        self.total_time += duration
+        self.min_time = min(self.min_time, duration)
+        self.max_time = max(self.max_time, duration)
+        self.rows += rows
+        self.histogram[bisect.bisect_left(QUERY_TIME_BUCKETS, duration)] += 1
+
+    @property
+    def summary(self) -> QuerySummary:
+        return QuerySummary(
+            queries_count=self.calls, duration=self.total_time, slowest=None
+        )
+
+
+class QueryPlan(BaseModel):
+    fingerprint: str
     statement: str
     parameters: dict[str, Any]
     duration: float
+    captured_at: float
+    plan: list[dict[str, Any]]
+
+
+class ExplainSettings(BaseModel):
+    threshold: float
+    sample_rate: float
+    interval: float
+
+
+# Recording scopes of the current thread or task (and the tasks it spawns)
+_scopes: contextvars.ContextVar[tuple[QueryScope, ...]] = contextvars.ContextVar(
+    "query_scopes", default=()
+)
+# Counters of the current thread or task, cheaper than a recording scope
+_counters: contextvars.ContextVar[tuple[_QueryCounters, ...]] = contextvars.ContextVar(
+    "query_counters", default=()
+)
+# Set while a plan is captured, its own statements are not instrumented
+_explaining: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "explaining", default=False
+)
 
 
 class SQLAlchemyInstrument:
     _instance: Self | None = None
-    _enabled: bool
-    _queries: list[QueryInfo]
+    _stats_enabled: bool
+    _stats: dict[str, _QueryCounters]
+    _stats_lock: threading.Lock
+    _explain: ExplainSettings | None
+    _plans: deque[QueryPlan]
+    _explained_at: dict[str, float]
+    _plans_lock: threading.Lock
 
     def __new__(cls) -> Self:
         if cls._instance is None:
             cls._instance = super().__new__(cls)
-            cls._instance._enabled = False
-            cls._instance._queries = []
+            cls._instance._stats_enabled = False
+            cls._instance._stats = {}
+            cls._instance._stats_lock = threading.Lock()
+            cls._instance._explain = None
+            cls._instance._plans = deque(maxlen=100)
+            cls._instance._explained_at = {}
+            cls._instance._plans_lock = threading.Lock()
 
             event.listen(
                 Engine,
@@ -47,30 +305,137 @@ class SQLAlchemyInstrument:
         return cls._instance
 
     @property
-    def queries_count(self) -> int:
-        return len(self._queries)
+    def stats_enabled(self) -> bool:
+        return self._stats_enabled
+
+    def enable_stats(self) -> None:
+        """Aggregate every query per fingerprint, without logging them."""
+        self._stats_enabled = True
+
+    def disable_stats(self) -> None:
+        self._stats_enabled = False
+
+    def get_stats(self, limit: int | None = None) -> list[QueryStats]:
+        """Snapshot of the statistics, the most time consuming queries first."""
+        with self._stats_lock:
+            stats = [
+                QueryStats(
+                    fingerprint=fingerprint,
+                    calls=counters.calls,
+                    total_time=counters.total_time,
+                    min_time=counters.min_time,
+                    max_time=counters.max_time,
+                    rows=counters.rows,
+                    histogram=list(counters.histogram),
+                )
+                for fingerprint, counters in self._stats.items()
+            ]
+
+        stats.sort(key=lambda item: item.total_time, reverse=True)
+        return stats[:limit]
+
+    def reset_stats(self) -> None:
+        with self._stats_lock:
+            self._stats.clear()
+
+    @property
+    def explain_enabled(self) -> bool:
+        return self._explain is not None
+
+    def enable_explain(
+        self,
+        threshold: float = 100.0,
+        sample_rate: float = 0.1,
+        interval: float = 60.0,
+        maxlen: int = 100,
+    ) -> None:
+        """Capture the plan of queries slower than `threshold` ms.
+
+        A sampled (`sample_rate`) slow query is explained on its connection,
+        within a savepoint rolled back afterwards, at most once per
+        fingerprint every `interval` seconds.
+        The `maxlen` latest plans are kept.
+
+        SELECT statements are run again with EXPLAIN ANALYZE, the other
+        statements are only planned. The capture is synchronous: it adds
+        the query duration again to the slow execution which triggered it.
+        """
+        with self._plans_lock:
+            if maxlen != self._plans.maxlen:
+                self._plans = deque(self._plans, maxlen=maxlen)
+        self._explain = ExplainSettings(
+            threshold=threshold, sample_rate=sample_rate, interval=interval
+        )
+
+    def disable_explain(self) -> None:
+        self._explain = None
+
+    def get_plans(self, fingerprint: str | None = None) -> list[QueryPlan]:
+        """Captured plans, the most recent first."""
+        with self._plans_lock:
+            plans = list(reversed(self._plans))
+        if fingerprint is None:
+            return plans
+        return [plan for plan in plans if plan.fingerprint == fingerprint]
+
+    def reset_plans(self) -> None:
+        with self._plans_lock:
+            self._plans.clear()
+            self._explained_at.clear()
 
     @classmethod
     @contextmanager
-    def record(cls) -> Iterator[Self]:
+    def record(
+        cls,
+        log: bool = True,
+        repeat_threshold: int | None = None,
+        on_repeat: Literal["warn", "raise"] = "warn",
+    ) -> Iterator[QueryScope]:
         instance = cls()
-        instance._enabled = True
-        instance._queries = []
+        scope = QueryScope(
+            log=log, repeat_threshold=repeat_threshold, on_repeat=on_repeat
+        )
+        instance.push_scope(scope)
         try:
-            yield instance
+            yield scope
         finally:
-            instance._enabled = False
+            instance.pop_scope(scope)
+
+    @classmethod
+    @contextmanager
+    def count(cls) -> Iterator[_QueryCounters]:
+        """Count the queries and their duration, without keeping them."""
+        cls()
+        counters = _QueryCounters()
+        _counters.set((*_counters.get(), counters))
+        try:
+            yield counters
+        finally:
+            _counters.set(
+                tuple(item for item in _counters.get() if item is not counters)
+            )
+
+    @property
+    def scopes(self) -> tuple[QueryScope, ...]:
+        return _scopes.get()
+
+    def push_scope(self, scope: QueryScope) -> None:
+        _scopes.set((*_scopes.get(), scope))
+
+    def pop_scope(self, scope: QueryScope) -> None:
+        _scopes.set(tuple(item for item in _scopes.get() if item is not scope))
 
     def _before_cursor_execute(
         self,
         conn: Connection,
         cursor: DBAPICursor,
         statement: str,
-        parameters: dict[str, Any],
+        parameters: dict[str, Any] | list[dict[str, Any]],
         context: TimedExecutionContext,
         executemany: bool,
     ) -> None:
-        if not self._enabled:
+        if _explaining.get() or not self._is_active():
+            context.start = None
             return
 
         context.start = time.perf_counter()
@@ -80,18 +445,110 @@ class SQLAlchemyInstrument:
         conn: Connection,
         cursor: DBAPICursor,
         statement: str,
-        parameters: dict[str, Any],
+        parameters: dict[str, Any] | list[dict[str, Any]],
         context: TimedExecutionContext,
         executemany: bool,
     ) -> None:
-        if not self._enabled:
+        # Instrumented when it started, even if it isn't anymore
+        start: float | None = getattr(context, "start", None)
+        if start is None:
+            return
+
+        duration = (time.perf_counter() - start) * 1000
+        rows = max(cursor.rowcount, 0)
+        for counters in _counters.get():
+            counters.add(duration, rows)
+        if self._stats_enabled:
+            self._add_stats(statement, duration, rows)
+        if self._explain is not None and duration >= self._explain.threshold:
+            self._explain_statement(conn, statement, parameters, duration)
+        if (profile := get_profile()) is not None:
+            profile.add("db", fingerprint(statement), duration / 1000)
+
+        scopes = _scopes.get()
+        if not scopes:
             return
 
-        duration = (time.perf_counter() - context.start) * 1000
         statement = statement.replace("\n", " ").strip()
-        logger.info(f"[{duration:6.2f} ms] {statement}")
+        if any(scope.log for scope in scopes):
+            logger.info(f"[{duration:6.2f} ms] {statement}")
 
         query_info = QueryInfo(
             statement=statement, parameters=parameters, duration=duration
         )
-        self._queries.append(query_info)
+        for scope in scopes:
+            scope.add(query_info)
+
+    def _is_active(self) -> bool:
+        return (
+            bool(_scopes.get())
+            or bool(_counters.get())
+            or self._stats_enabled
+            or self.explain_enabled
+            or get_profile() is not None
+        )
+
+    def _explain_statement(
+        self,
+        conn: Connection,
+        statement: str,
+        parameters: dict[str, Any] | list[dict[str, Any]],
+        duration: float,
+    ) -> None:
+        settings = self._explain
+        if (
+            settings is None
+            or not isinstance(parameters, dict)  # executemany
+            or random.random() >= settings.sample_rate
+        ):
+            return
+
+        key = fingerprint(statement)
+        now = time.monotonic()
+        with self._plans_lock:
+            explained_at = self._explained_at.get(key)
+            if explained_at is not None and now - explained_at < settings.interval:
+                return
+            self._explained_at[key] = now
+
+        options = "FORMAT JSON"
+        if statement.lstrip()[:6].upper() == "SELECT":
+            options = "ANALYZE, BUFFERS, FORMAT JSON"
+
+        # On the same connection: another one from the pool could deadlock
+        # when it is exhausted, and wouldn't see the uncommitted rows.
+        token = _explaining.set(True)
+        try:
+            savepoint = conn.begin_nested()
+            try:
+                plan = conn.exec_driver_sql(
+                    f"EXPLAIN ({options}) {statement}", parameters
+                ).scalar_one()
+            finally:
+                # Never keep the effects of the statement
+                savepoint.rollback()
+        except Exception:
+            logger.warning(f"Failed to explain {key}", exc_info=True)
+            return
+        finally:
+            _explaining.reset(token)
+
+        with self._plans_lock:
+            self._plans.append(
+                QueryPlan(
+                    fingerprint=key,
+                    statement=statement,
+                    parameters=parameters,
+                    duration=duration,
+                    captured_at=time.time(),
+                    plan=plan,
+                )
+            )
+
+    def _add_stats(self, statement: str, duration: float, rows: int) -> None:
+        key = fingerprint(statement)
+        with self._stats_lock:
+            counters = self._stats.get(key)
+            if counters is None:
+                counters = self._stats[key] = _QueryCounters()
+            counters.add(duration, rows)
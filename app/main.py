@@ -1,3 +1,155 @@
-from fastapi import FastAPI
+import logging
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager, nullcontext
 
-app = FastAPI()
+from fastapi import FastAPI, Request, Response, status
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.routing import BaseRoute
+
+from app.application.cache import MemoryCacheBackend, ResponseCache
+from app.application.routes import addresses, metrics, posts, profiles, users
+from app.application.routes.profiles import is_profiling_token
+from app.core.config import get_settings
+from app.core.exceptions import OperationNotAllowedError
+from app.core.memory import collect_memory, memory_tracker
+from app.core.metrics import registry
+from app.core.profiling import profile, profile_store
+from app.infrastructure.database import dispose_engine, get_engine, warm_up
+from app.infrastructure.exceptions import (
+    EntityAlreadyExistsError,
+    EntityNotFoundError,
+    InvalidCursorError,
+    InvalidFieldsError,
+)
+from app.infrastructure.metrics import collect_queries
+from app.infrastructure.utils import SQLAlchemyInstrument
+
+logger = logging.getLogger("app")
+
+http_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "Duration of the HTTP requests.",
+    ["method", "route"],
+)
+http_requests = registry.counter(
+    "http_requests", "HTTP requests by response status.", ["method", "route", "status"]
+)
+
+registry.add_collector("db_queries", collect_queries)
+registry.add_collector("memory", collect_memory)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    settings = get_settings()
+    # Query latency histograms are built from the query statistics
+    SQLAlchemyInstrument().enable_stats()
+    app.state.query_recording = settings.QUERY_RECORDING
+    if settings.MEMORY_TRACKING:
+        memory_tracker.enable(frames=settings.MEMORY_TRACKING_FRAMES)
+    if settings.RESPONSE_CACHE_TTL is not None:
+        # Replace the backend by a KeyValueCacheBackend to share the cache
+        # between the processes.
+        backend = MemoryCacheBackend(maxsize=settings.RESPONSE_CACHE_MAXSIZE)
+        app.state.response_cache = ResponseCache(
+            backend, ttl=settings.RESPONSE_CACHE_TTL
+        )
+    if settings.DATABASE_POOL_WARMUP:
+        # The first requests don't wait for the connections to be opened
+        await run_in_threadpool(warm_up, get_engine(), settings.DATABASE_POOL_SIZE)
+    yield
+    SQLAlchemyInstrument().disable_stats()
+    memory_tracker.disable()
+    dispose_engine()
+
+
+app = FastAPI(lifespan=lifespan)
+app.include_router(users.router)
+app.include_router(posts.router)
+app.include_router(addresses.router)
+app.include_router(metrics.router)
+app.include_router(profiles.router)
+
+error_status_codes: dict[type[Exception], int] = {
+    EntityNotFoundError: status.HTTP_404_NOT_FOUND,
+    EntityAlreadyExistsError: status.HTTP_409_CONFLICT,
+    InvalidCursorError: status.HTTP_400_BAD_REQUEST,
+    InvalidFieldsError: status.HTTP_400_BAD_REQUEST,
+    OperationNotAllowedError: status.HTTP_405_METHOD_NOT_ALLOWED,
+}
+
+
+async def application_error_handler(request: Request, exc: Exception) -> Response:
+    status_code = next(
+        error_status_codes[cls]
+        for cls in type(exc).__mro__
+        if cls in error_status_codes
+    )
+    return JSONResponse({"detail": type(exc).__name__}, status_code=status_code)
+
+
+for error in error_status_codes:
+    app.add_exception_handler(error, application_error_handler)
+
+
+@app.middleware("http")
+async def query_summary(
+    request: Request, call_next: Callable[[Request], Awaitable[Response]]
+) -> Response:
+    start = time.perf_counter()
+    recording: bool = getattr(request.app.state, "query_recording", False)
+    with (
+        SQLAlchemyInstrument.record(log=False) if recording else nullcontext() as scope,
+        SQLAlchemyInstrument.count() as counters,
+        memory_tracker.track(request.url.path) as memory,
+    ):
+        response = await call_next(request)
+
+        # Label with the route template rather than the path, to bound cardinality
+        route: BaseRoute | None = request.scope.get("route")
+        route_path: str = getattr(route, "path", "unmatched")
+        if memory is not None:
+            memory.name = f"{request.method} {route_path}"
+    http_duration.observe(
+        time.perf_counter() - start, method=request.method, route=route_path
+    )
+    http_requests.inc(
+        method=request.method, route=route_path, status=str(response.status_code)
+    )
+
+    summary = counters.summary if scope is None else scope.summary
+    response.headers.update(summary.headers)
+    logger.info(f"{request.method} {request.url.path}: {summary}")
+    return response
+
+
+@app.middleware("http")
+async def profiling(
+    request: Request, call_next: Callable[[Request], Awaitable[Response]]
+) -> Response:
+    token = request.headers.get("X-Profile") or request.query_params.get("profile")
+    if token is None or request.url.path.startswith("/profiles"):
+        return await call_next(request)
+
+    settings = get_settings()
+    if not is_profiling_token(settings, token):
+        return await call_next(request)
+
+    name = f"{request.method} {request.url.path}"
+    with profile(
+        name, mode=settings.PROFILING_MODE, interval=settings.PROFILING_INTERVAL
+    ) as current:
+        response = await call_next(request)
+
+    report = current.report()
+    profile_store.add(report)
+    response.headers["X-Profile-Id"] = str(report.id)
+    response.headers.append(
+        "Server-Timing",
+        ", ".join(
+            f"{layer};dur={duration:.2f}" for layer, duration in report.layers.items()
+        ),
+    )
+    return response
@@ -0,0 +1,21 @@
+from fastapi.testclient import TestClient
+
+from tests.fixtures.factories.factories import UserFactory
+
+
+def test_get_addresses(user_factory: UserFactory, client: TestClient) -> None:
+    count = 3
+    user_factory.create_many(count)
+
+    response = client.get("/addresses")
+
+    assert response.status_code == 200  # noqa
+    assert response.json()["total"] == count
+
+
+def test_get_address(user_factory: UserFactory, client: TestClient) -> None:
+    user = user_factory.create_one()
+
+    response = client.get(f"/addresses/{user.address.id}")
+
+    assert response.json()["user_id"] == str(user.id)
@@ -0,0 +1,49 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.memory import memory_tracker
+from app.core.metrics import CONTENT_TYPE
+from app.main import app
+from tests.fixtures.factories.factories import UserFactory
+
+
+def test_get_metrics() -> None:
+    client = TestClient(app)
+    client.get("/metrics")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200  # noqa
+    assert response.headers["content-type"] == CONTENT_TYPE
+    assert response.headers["x-query-count"] == "0"
+    lines = response.text.splitlines()
+    assert 'http_requests_total{method="GET",route="/metrics",status="200"} 1' in lines
+    assert lines[-1] == "# EOF"
+
+
+def test_query_summary(
+    user_factory: UserFactory, client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    user = user_factory.create_one()
+
+    counted = client.get(f"/users/{user.id}")
+    monkeypatch.setattr(app.state, "query_recording", True, raising=False)
+    recorded = client.get(f"/users/{user.id}")
+
+    assert int(counted.headers["x-query-count"]) > 0
+    assert counted.headers["x-query-count"] == recorded.headers["x-query-count"]
+    assert counted.headers["server-timing"].startswith("db;dur=")
+
+
+def test_memory_tracking() -> None:
+    memory_tracker.reset_stats()
+    memory_tracker.enable()
+    try:
+        TestClient(app).get("/metrics")
+        stats = memory_tracker.get_stats()
+    finally:
+        memory_tracker.disable()
+        memory_tracker.reset_stats()
+
+    assert [item.name for item in stats] == ["GET /metrics"]
+    assert stats[0].top
@@ -0,0 +1,220 @@
+import csv
+import io
+import uuid
+
+import pytest
+from faker import Faker
+from fastapi.testclient import TestClient
+
+from tests.fixtures.factories.factories import PostFactory, UserFactory
+
+
+def test_get_posts(post_factory: PostFactory, client: TestClient) -> None:
+    count = 3
+    post_factory.create_many(count)
+
+    response = client.get("/posts", params={"count": "none"})
+
+    assert response.status_code == 200  # noqa
+    result = response.json()
+    assert result["total"] is None
+    assert len(result["items"]) == count
+
+
+def test_get_post(post_factory: PostFactory, client: TestClient) -> None:
+    post = post_factory.create_one()
+
+    response = client.get(f"/posts/{post.id}", params={"fields": ["title", "tags"]})
+
+    assert response.json() == {
+        "title": post.title,
+        "tags": [tag.name for tag in post.tags],
+    }
+
+
+@pytest.mark.parametrize("path", ["/posts", "/posts/{post_id}"])
+def test_get_posts_raw_fields(
+    post_factory: PostFactory, client: TestClient, path: str
+) -> None:
+    post = post_factory.create_one()
+
+    response = client.get(
+        path.format(post_id=post.id), params={"fields": ["title"], "raw": True}
+    )
+
+    assert response.status_code == 400  # noqa
+    assert response.json() == {"detail": "InvalidFieldsError"}
+
+
+def test_get_post_authors(
+    post_factory: PostFactory, user_factory: UserFactory, client: TestClient
+) -> None:
+    user = user_factory.create_one()
+    posts = [
+        *post_factory.create_many(2, author_id=user.id),
+        *post_factory.create_many(3),
+    ]
+
+    response = client.get(
+        "/posts/authors", params={"id": [str(post.id) for post in posts]}
+    )
+
+    assert response.status_code == 200  # noqa
+    assert response.headers["x-query-count"] == "2"
+    assert [(item["post_id"], item["author"]["id"]) for item in response.json()] == [
+        (str(post.id), str(post.author_id)) for post in posts
+    ]
+
+
+def test_get_post_authors_not_found(client: TestClient) -> None:
+    response = client.get("/posts/authors", params={"id": str(uuid.uuid4())})
+
+    assert response.status_code == 404  # noqa
+
+
+def test_create_post(
+    faker: Faker, user_factory: UserFactory, client: TestClient
+) -> None:
+    user = user_factory.create_one()
+    data = {
+        "title": faker.sentence(),
+        "content": faker.text(),
+        "author_id": str(user.id),
+        "tags": [faker.unique.word()],
+    }
+
+    response = client.post("/posts", json=data)
+
+    assert response.status_code == 201  # noqa
+    assert response.json()["tags"] == data["tags"]
+
+
+def test_create_posts(
+    faker: Faker, user_factory: UserFactory, client: TestClient
+) -> None:
+    user = user_factory.create_one()
+    data = [
+        {"title": faker.sentence(), "content": faker.text(), "author_id": str(user.id)}
+        for _ in range(3)
+    ]
+
+    response = client.post("/posts/bulk", json=data)
+
+    assert response.status_code == 201  # noqa
+    assert [item["title"] for item in response.json()] == [
+        item["title"] for item in data
+    ]
+
+    post_id = response.json()[0]["id"]
+    response = client.patch("/posts/bulk", json={post_id: {"tags": ["tag"]}})
+    assert response.status_code == 200  # noqa
+    assert response.json()[0]["tags"] == ["tag"]
+
+
+def test_create_posts_invalid_json(client: TestClient) -> None:
+    response = client.post(
+        "/posts/bulk", content=b"[{", headers={"Content-Type": "application/json"}
+    )
+
+    assert response.status_code == 422  # noqa
+    assert response.json()["detail"][0]["type"] == "json_invalid"
+
+
+def test_create_post_unknown_author(faker: Faker, client: TestClient) -> None:
+    data = {
+        "title": faker.sentence(),
+        "content": faker.text(),
+        "author_id": str(uuid.uuid4()),
+    }
+
+    response = client.post("/posts", json=data)
+
+    assert response.status_code == 404  # noqa
+
+
+def test_update_post(
+    faker: Faker, post_factory: PostFactory, client: TestClient
+) -> None:
+    post = post_factory.create_one()
+    title = faker.sentence()
+
+    response = client.patch(f"/posts/{post.id}", json={"title": title})
+
+    assert response.json()["title"] == title
+
+
+def test_update_post_null_tags(post_factory: PostFactory, client: TestClient) -> None:
+    post = post_factory.create_one()
+    tags = sorted(tag.name for tag in post.tags)
+
+    response = client.patch(f"/posts/{post.id}", json={"tags": None})
+
+    assert response.status_code == 200  # noqa
+    assert sorted(response.json()["tags"]) == tags
+    assert sorted(client.get(f"/posts/{post.id}").json()["tags"]) == tags
+
+
+def test_delete_post(post_factory: PostFactory, client: TestClient) -> None:
+    post = post_factory.create_one()
+
+    response = client.delete(f"/posts/{post.id}")
+
+    assert response.status_code == 204  # noqa
+
+
+def test_get_post_not_modified(
+    faker: Faker, post_factory: PostFactory, client: TestClient
+) -> None:
+    post = post_factory.create_one()
+    etag = client.get(f"/posts/{post.id}").headers["etag"]
+
+    response = client.get(f"/posts/{post.id}", headers={"If-None-Match": etag})
+    assert response.status_code == 304  # noqa
+
+    client.patch(f"/posts/{post.id}", json={"tags": [faker.unique.word()]})
+    response = client.get(f"/posts/{post.id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200  # noqa
+
+
+def test_export_posts(post_factory: PostFactory, client: TestClient) -> None:
+    posts = post_factory.create_many(3)
+
+    response = client.get("/posts/export")
+
+    assert response.status_code == 200  # noqa
+    assert response.headers["content-type"].startswith("text/csv")
+    assert 'filename="posts.csv"' in response.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert {row["id"] for row in rows} == {str(post.id) for post in posts}
+
+
+def test_import_posts_csv(
+    faker: Faker, post_factory: PostFactory, client: TestClient
+) -> None:
+    post = post_factory.create_one()
+    exported = client.get("/posts/export").content
+    missing_author = f",{faker.sentence()},content,{uuid.uuid4()},{{}}"
+
+    response = client.post(
+        "/posts/import",
+        params={"format": "csv"},
+        files={"file": ("posts.csv", exported + missing_author.encode())},
+    )
+
+    result = response.json()
+    assert result["imported"] == 1
+    assert [error["errors"] for error in result["errors"]] == [["Author not found"]]
+    response = client.get("/posts")
+    items = response.json()["items"]
+    assert len(items) == 2  # noqa
+    for item in items:
+        assert sorted(item["tags"]) == sorted(tag.name for tag in post.tags)
+
+
+def test_export_posts_binary(post_factory: PostFactory, client: TestClient) -> None:
+    post_factory.create_one()
+
+    response = client.get("/posts/export", params={"format": "binary"})
+
+    assert response.headers["content-type"] == "application/octet-stream"
+    assert response.content.startswith(b"PGCOPY")
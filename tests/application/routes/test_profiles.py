@@ -0,0 +1,77 @@
+from collections.abc import Iterator
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import Settings, get_settings
+from app.main import app
+
+token = "secret"
+
+
+@pytest.fixture
+def client(settings: Settings, monkeypatch: pytest.MonkeyPatch) -> Iterator[TestClient]:
+    profiling_settings = settings.model_copy(
+        update={"PROFILING_TOKEN": token, "PROFILING_MODE": "deterministic"}
+    )
+    monkeypatch.setattr("app.main.get_settings", lambda: profiling_settings)
+    app.dependency_overrides[get_settings] = lambda: profiling_settings
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def test_profile_request(client: TestClient) -> None:
+    response = client.get("/metrics", headers={"X-Profile": token})
+
+    profile_id = response.headers["x-profile-id"]
+    assert "http;dur=" in response.headers["server-timing"]
+
+    response = client.get(f"/profiles/{profile_id}", headers={"X-Profile": token})
+    assert response.status_code == 200  # noqa
+    report = response.json()
+    assert report["name"] == "GET /metrics"
+    assert report["mode"] == "deterministic"
+    assert "http" in report["layers"]
+    assert report["stats"]
+
+
+def test_profile_query_parameter(client: TestClient) -> None:
+    response = client.get("/metrics", params={"profile": token})
+
+    assert "x-profile-id" in response.headers
+
+
+def test_profile_invalid_token(client: TestClient) -> None:
+    response = client.get("/metrics", headers={"X-Profile": "invalid"})
+
+    assert "x-profile-id" not in response.headers
+
+
+def test_profile_non_ascii_token(client: TestClient) -> None:
+    response = client.get("/metrics", params={"profile": "sécret"})
+
+    assert response.status_code == 200  # noqa
+    assert "x-profile-id" not in response.headers
+
+    response = client.get(
+        "/profiles/00000000-0000-0000-0000-000000000000",
+        headers=[(b"X-Profile", "sécret".encode())],
+    )
+    assert response.status_code == 403  # noqa
+
+
+def test_get_profile_forbidden(client: TestClient) -> None:
+    response = client.get("/metrics", headers={"X-Profile": token})
+    profile_id = response.headers["x-profile-id"]
+
+    response = client.get(f"/profiles/{profile_id}")
+
+    assert response.status_code == 403  # noqa
+
+
+def test_get_profile_not_found(client: TestClient) -> None:
+    response = client.get(
+        "/profiles/00000000-0000-0000-0000-000000000000", headers={"X-Profile": token}
+    )
+
+    assert response.status_code == 404  # noqa
@@ -0,0 +1,349 @@
+import json
+import uuid
+
+import pytest
+from faker import Faker
+from fastapi.testclient import TestClient
+
+from app.application.cache import MemoryCacheBackend, ResponseCache
+from app.application.dependencies import get_response_cache
+from app.main import app
+from tests.fixtures.factories.factories import PostFactory, UserFactory
+
+
+def test_get_users(user_factory: UserFactory, client: TestClient) -> None:
+    count = 3
+    user_factory.create_many(count)
+
+    response = client.get("/users", params={"limit": 2})
+
+    assert response.status_code == 200  # noqa
+    assert response.headers["content-type"] == "application/json"
+    result = response.json()
+    assert result["total"] == count
+    assert len(result["items"]) == 2  # noqa
+    assert result["next_cursor"] is not None
+
+    response = client.get("/users", params={"limit": 2, "after": result["next_cursor"]})
+    assert len(response.json()["items"]) == 1
+
+
+def test_get_users_fields(user_factory: UserFactory, client: TestClient) -> None:
+    user_factory.create_one()
+
+    response = client.get("/users", params={"fields": ["id", "username"]})
+
+    (item,) = response.json()["items"]
+    assert item.keys() == {"id", "username"}
+
+
+def test_get_users_fields_posts(
+    user_factory: UserFactory, post_factory: PostFactory, client: TestClient
+) -> None:
+    user = user_factory.create_one()
+    post = post_factory.create_one(author_id=user.id)
+
+    response = client.get("/users", params={"fields": ["posts"]})
+
+    assert response.status_code == 200  # noqa
+    [item] = response.json()["items"]
+    assert list(item) == ["posts"]
+    [result] = item["posts"]
+    assert result["id"] == str(post.id)
+    assert sorted(result["tags"]) == sorted(tag.name for tag in post.tags)
+
+
+def test_get_users_invalid_fields(client: TestClient) -> None:
+    response = client.get("/users", params={"fields": ["password"]})
+
+    assert response.status_code == 400  # noqa
+
+
+def test_get_user(post_factory: PostFactory, client: TestClient) -> None:
+    post = post_factory.create_one()
+
+    response = client.get(f"/users/{post.author_id}", params={"include_posts": True})
+
+    result = response.json()
+    assert result["id"] == str(post.author_id)
+    assert [item["id"] for item in result["posts"]] == [str(post.id)]
+
+
+def test_get_user_raw(post_factory: PostFactory, client: TestClient) -> None:
+    post = post_factory.create_one()
+    params = {"include_posts": True}
+
+    response = client.get(f"/users/{post.author_id}", params=params)
+    raw_response = client.get(
+        f"/users/{post.author_id}", params={**params, "raw": True}
+    )
+
+    assert raw_response.json() == response.json()
+
+
+def test_get_user_not_found(client: TestClient) -> None:
+    response = client.get(f"/users/{uuid.uuid4()}")
+
+    assert response.status_code == 404  # noqa
+
+
+def test_create_user(faker: Faker, client: TestClient) -> None:
+    data = {
+        "username": faker.user_name(),
+        "email": faker.email(),
+        "address": {
+            "street": faker.street_address(),
+            "city": faker.city(),
+            "zip_code": faker.zipcode(),
+            "country": faker.country(),
+        },
+    }
+
+    response = client.post("/users", json=data)
+
+    assert response.status_code == 201  # noqa
+    result = response.json()
+    assert result["username"] == data["username"]
+    assert client.get(f"/users/{result['id']}").json() == result
+
+
+def test_create_users(faker: Faker, client: TestClient) -> None:
+    data = [
+        {
+            "username": faker.user_name(),
+            "email": faker.unique.email(),
+            "address": {
+                "street": faker.unique.street_address(),
+                "city": faker.city(),
+                "zip_code": faker.zipcode(),
+                "country": faker.country(),
+            },
+        }
+        for _ in range(3)
+    ]
+
+    response = client.post("/users/bulk", json=data)
+
+    assert response.status_code == 201  # noqa
+    assert [item["email"] for item in response.json()] == [
+        item["email"] for item in data
+    ]
+
+
+def test_create_users_invalid(faker: Faker, client: TestClient) -> None:
+    data = [{"username": faker.user_name()}, {"email": faker.email()}]
+
+    response = client.post("/users/bulk", json=data)
+
+    assert response.status_code == 422  # noqa
+    locations = {tuple(error["loc"]) for error in response.json()["detail"]}
+    assert ("body", 0, "email") in locations
+    assert ("body", 1, "username") in locations
+    assert client.get("/users").json()["total"] == 0
+
+
+def test_update_users(user_factory: UserFactory, client: TestClient) -> None:
+    users = user_factory.create_many(2)
+    data = {
+        str(user.id): {"username": f"user-{index}"} for index, user in enumerate(users)
+    }
+
+    response = client.patch("/users/bulk", json=data)
+
+    assert response.status_code == 200  # noqa
+    assert [item["username"] for item in response.json()] == ["user-0", "user-1"]
+
+
+def test_create_user_invalid(client: TestClient) -> None:
+    response = client.post("/users", json={"username": "username"})
+
+    assert response.status_code == 422  # noqa
+
+
+def test_update_user(
+    faker: Faker, user_factory: UserFactory, client: TestClient
+) -> None:
+    user = user_factory.create_one()
+    username = faker.user_name()
+
+    response = client.patch(f"/users/{user.id}", json={"username": username})
+
+    assert response.status_code == 200  # noqa
+    assert response.json()["username"] == username
+
+
+def test_delete_user(user_factory: UserFactory, client: TestClient) -> None:
+    user = user_factory.create_one()
+
+    response = client.delete(f"/users/{user.id}")
+
+    assert response.status_code == 204  # noqa
+    assert client.get(f"/users/{user.id}").status_code == 404  # noqa
+
+
+def test_get_user_not_modified(
+    faker: Faker, user_factory: UserFactory, client: TestClient
+) -> None:
+    user = user_factory.create_one()
+    response = client.get(f"/users/{user.id}")
+    etag = response.headers["etag"]
+
+    not_modified = client.get(f"/users/{user.id}", headers={"If-None-Match": etag})
+
+    assert not_modified.status_code == 304  # noqa
+    assert not_modified.headers["etag"] == etag
+    assert not_modified.headers["x-query-count"] == "1"
+    assert not_modified.content == b""
+
+    client.patch(f"/users/{user.id}", json={"username": faker.user_name()})
+    modified = client.get(f"/users/{user.id}", headers={"If-None-Match": etag})
+    assert modified.status_code == 200  # noqa
+    assert modified.headers["etag"] != etag
+
+
+def test_get_user_etag_by_representation(
+    user_factory: UserFactory, client: TestClient
+) -> None:
+    user = user_factory.create_one()
+
+    etag = client.get(f"/users/{user.id}").headers["etag"]
+    response = client.get(
+        f"/users/{user.id}",
+        params={"fields": ["id"]},
+        headers={"If-None-Match": etag},
+    )
+
+    assert response.status_code == 200  # noqa
+    assert response.headers["etag"] != etag
+
+
+def test_get_users_not_modified(user_factory: UserFactory, client: TestClient) -> None:
+    user_factory.create_many(3)
+    etag = client.get("/users", params={"limit": 2}).headers["etag"]
+
+    response = client.get(
+        "/users", params={"limit": 2}, headers={"If-None-Match": f'W/{etag}, "other"'}
+    )
+
+    assert response.status_code == 304  # noqa
+
+    user_factory.create_one()
+    response = client.get(
+        "/users", params={"limit": 2}, headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200  # noqa
+
+
+@pytest.fixture
+def cached_client(client: TestClient) -> TestClient:
+    cache = ResponseCache(MemoryCacheBackend(), ttl=60.0)
+    app.dependency_overrides[get_response_cache] = lambda: cache
+    return client
+
+
+def test_get_users_cached(
+    faker: Faker, user_factory: UserFactory, cached_client: TestClient
+) -> None:
+    user = user_factory.create_one()
+    response = cached_client.get("/users")
+
+    cached = cached_client.get("/users")
+
+    assert cached.content == response.content
+    assert cached.headers["etag"] == response.headers["etag"]
+    assert cached.headers["content-type"] == "application/json"
+    assert cached.headers["x-query-count"] == "0"
+
+    not_modified = cached_client.get(
+        "/users", headers={"If-None-Match": response.headers["etag"]}
+    )
+    assert not_modified.status_code == 304  # noqa
+    assert not_modified.headers["x-query-count"] == "0"
+
+    username = faker.user_name()
+    cached_client.patch(f"/users/{user.id}", json={"username": username})
+    (item,) = cached_client.get("/users").json()["items"]
+    assert item["username"] == username
+
+
+def test_get_users_cached_with_posts(
+    faker: Faker, post_factory: PostFactory, cached_client: TestClient
+) -> None:
+    post = post_factory.create_one()
+    params = {"include_posts": True}
+    cached_client.get("/users", params=params)
+
+    title = faker.sentence()
+    cached_client.patch(f"/posts/{post.id}", json={"title": title})
+
+    (item,) = cached_client.get("/users", params=params).json()["items"]
+    assert [post["title"] for post in item["posts"]] == [title]
+
+
+def test_export_users(user_factory: UserFactory, client: TestClient) -> None:
+    users = user_factory.create_many(3)
+
+    response = client.get("/users/export")
+
+    assert response.status_code == 200  # noqa
+    assert len(response.text.splitlines()) == 1 + len(users)
+
+
+def test_import_users(
+    faker: Faker, user_factory: UserFactory, client: TestClient
+) -> None:
+    user = user_factory.create_one()
+    records = [
+        {
+            "username": faker.user_name(),
+            "email": email,
+            "address": {
+                "street": faker.unique.street_address(),
+                "city": faker.city(),
+                "zip_code": faker.zipcode(),
+                "country": faker.country(),
+            },
+        }
+        for email in (faker.unique.email(), user.email)
+    ]
+    lines = [json.dumps(record) for record in records]
+    lines.insert(1, json.dumps({"username": faker.user_name()}))
+    lines.insert(2, "")
+    lines.append("{")
+
+    response = client.post(
+        "/users/import", files={"file": ("users.ndjson", "\n".join(lines))}
+    )
+
+    assert response.status_code == 200  # noqa
+    result = response.json()
+    assert result["total"] == 4  # noqa
+    assert result["imported"] == 1
+    assert [error["row"] for error in result["errors"]] == [2, 4, 5]
+    assert result["errors"][0]["errors"] == [
+        "email: Field required",
+        "address: Field required",
+    ]
+    assert result["errors"][1]["errors"] == ["Email already exists"]
+    response = client.get("/users", params={"fields": ["email"]})
+    assert records[0]["email"] in {item["email"] for item in response.json()["items"]}
+
+
+def test_import_users_csv(user_factory: UserFactory, client: TestClient) -> None:
+    users = user_factory.create_many(2)
+    exported = client.get("/users/export").content
+    client.delete(f"/users/{users[0].id}")
+
+    response = client.post(
+        "/users/import",
+        params={"format": "csv"},
+        files={"file": ("users.csv", exported)},
+    )
+
+    result = response.json()
+    assert result["imported"] == 1
+    assert [error["errors"] for error in result["errors"]] == [["Email already exists"]]
+    response = client.get("/users")
+    assert {item["email"] for item in response.json()["items"]} == {
+        user.email for user in users
+    }
@@ -0,0 +1,17 @@
+import pytest
+
+from app.application.services.aio.address import AsyncAddressService
+from tests.fixtures.factories.factories import UserFactory
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_get_address_by_id(
+    user_factory: UserFactory, async_address_service: AsyncAddressService
+) -> None:
+    user = user_factory.create_one()
+
+    result = await async_address_service.get_by_id(user.address.id)
+
+    assert result.id == user.address.id
+    assert result.user_id == user.id
@@ -0,0 +1,36 @@
+import uuid
+
+import pytest
+
+from app.application.services.aio.post import AsyncPostService
+from app.infrastructure.exceptions import EntityNotFoundError
+from tests.fixtures.factories.factories import PostFactory
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_get_post_by_id(
+    post_factory: PostFactory, async_post_service: AsyncPostService
+) -> None:
+    post = post_factory.create_one()
+
+    result = await async_post_service.get_by_id(post.id)
+
+    assert result.id == post.id
+    assert result.title == post.title
+
+
+async def test_delete_post(
+    post_factory: PostFactory, async_post_service: AsyncPostService
+) -> None:
+    post = post_factory.create_one()
+
+    await async_post_service.delete(post.id)
+
+    with pytest.raises(EntityNotFoundError):
+        await async_post_service.get_by_id(post.id)
+
+
+async def test_delete_post_not_found(async_post_service: AsyncPostService) -> None:
+    with pytest.raises(EntityNotFoundError):
+        await async_post_service.delete(uuid.uuid4())
@@ -0,0 +1,39 @@
+import uuid
+
+import pytest
+from faker import Faker
+
+from app.application.services.aio.user import AsyncUserService
+from app.domain.models.user import UserUpdateDomain
+from app.infrastructure.exceptions import EntityNotFoundError
+from tests.fixtures.factories.factories import UserFactory
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_get_users(
+    user_factory: UserFactory, async_user_service: AsyncUserService
+) -> None:
+    count = 3
+    user_factory.create_many(count)
+
+    results = await async_user_service.get_all()
+
+    assert results.total == count
+    assert len(results.items) == count
+
+
+async def test_update_user(
+    faker: Faker, user_factory: UserFactory, async_user_service: AsyncUserService
+) -> None:
+    user = user_factory.create_one()
+    data = UserUpdateDomain(username=faker.user_name())
+
+    result = await async_user_service.update(user.id, data)
+
+    assert result.username == data.username
+
+
+async def test_delete_user_not_found(async_user_service: AsyncUserService) -> None:
+    with pytest.raises(EntityNotFoundError):
+        await async_user_service.delete(uuid.uuid4())
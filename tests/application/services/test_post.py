@@ -48,7 +48,7 @@ def test_create_post(
         title=faker.sentence(),
         content=faker.text(),
         author_id=UserId(user.id),
-        tags=[TagName(faker.word()) for _ in range(3)],
+        tags=[TagName(faker.unique.word()) for _ in range(3)],
     )
 
     result = post_service.create(data)
@@ -64,7 +64,7 @@ def test_create_post_author_not_found(faker: Faker, post_service: PostService) -
         title=faker.sentence(),
         content=faker.text(),
         author_id=UserId(uuid.uuid4()),
-        tags=[TagName(faker.word()) for _ in range(3)],
+        tags=[TagName(faker.unique.word()) for _ in range(3)],
     )
 
     with pytest.raises(EntityNotFoundError):
@@ -89,7 +89,7 @@ def test_update_post_tags(
     faker: Faker, post_factory: PostFactory, post_service: PostService
 ) -> None:
     post = post_factory.create_one()
-    tags = [TagName(faker.word()) for _ in range(3)]
+    tags = [TagName(faker.unique.word()) for _ in range(3)]
     data = PostUpdateDomain(tags=tags)
 
     result = post_service.update(post.id, data)
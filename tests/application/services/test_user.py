@@ -1,11 +1,13 @@
+import threading
 import uuid
+from typing import Any
 
 import pytest
 from faker import Faker
 
 from app.application.services.user import UserService
 from app.domain.models.address import AddressCreateDomain
-from app.domain.models.user import UserCreateDomain, UserUpdateDomain
+from app.domain.models.user import UserCreateDomain, UserDomain, UserUpdateDomain
 from app.infrastructure.exceptions import EntityNotFoundError
 from tests.fixtures.factories.factories import PostFactory, UserFactory
 
@@ -21,6 +23,66 @@ def test_get_users(user_factory: UserFactory, user_service: UserService) -> None
     assert len(results.items) == count
 
 
+class JoinedCalls:
+    """Stands for the coalesced calls counter: counts the callers which
+    joined the call in flight."""
+
+    def __init__(self) -> None:
+        self.joined = threading.Semaphore(0)
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        self.joined.release()
+
+
+def test_concurrent_get_user_by_id(
+    monkeypatch: pytest.MonkeyPatch,
+    user_factory: UserFactory,
+    user_service: UserService,
+) -> None:
+    user = user_factory.create_one()
+    get_by_id = user_service.repository.get_by_id
+    calls: list[uuid.UUID] = []
+    entered, release = threading.Event(), threading.Event()
+
+    def blocking_get_by_id(entity_id: uuid.UUID, /, **kwargs: Any) -> UserDomain:
+        calls.append(entity_id)
+        entered.set()
+        release.wait(timeout=5)
+        return get_by_id(entity_id, **kwargs)
+
+    monkeypatch.setattr(user_service.repository, "get_by_id", blocking_get_by_id)
+    joined_calls = JoinedCalls()
+    monkeypatch.setattr("app.core.singleflight.coalesced_calls", joined_calls)
+    results: list[UserDomain] = []
+
+    def call() -> None:
+        results.append(user_service.get_by_id(user.id, include_posts=True))
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    assert entered.wait(timeout=5)
+    followers = [threading.Thread(target=call) for _ in range(4)]
+    for thread in followers:
+        thread.start()
+    # The leader's call is still running: every follower joins it
+    for _ in followers:
+        assert joined_calls.joined.acquire(timeout=5)
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join()
+
+    assert calls == [user.id]
+    assert [result.id for result in results] == [user.id] * 5
+
+
+def test_iter_users(user_factory: UserFactory, user_service: UserService) -> None:
+    users = user_factory.create_many(3)
+
+    results = list(user_service.iter_all(batch_size=2))
+
+    assert {user.id for user in results} == {user.id for user in users}
+
+
 def test_get_user_by_id(
     user_factory: UserFactory, post_factory: PostFactory, user_service: UserService
 ) -> None:
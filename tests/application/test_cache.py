@@ -0,0 +1,151 @@
+import threading
+import time
+from collections.abc import Sequence
+
+import pytest
+from fastapi import Response, status
+
+from app.application.cache import (
+    CachedResponse,
+    KeyValueCacheBackend,
+    MemoryCacheBackend,
+    ResponseCache,
+    ResponseCacheBackend,
+)
+
+
+class DictClient:
+    """In-memory stand-in for a key-value store client, expiry ignored."""
+
+    def __init__(self) -> None:
+        self.data: dict[str, bytes] = {}
+
+    def get(self, name: str) -> bytes | None:
+        return self.data.get(name)
+
+    def set(self, name: str, value: bytes, ex: int | None = None) -> None:
+        self.data[name] = value
+
+    def mget(self, keys: Sequence[str]) -> list[bytes | None]:
+        return [self.data.get(key) for key in keys]
+
+    def incr(self, name: str) -> int:
+        value = int(self.data.get(name, b"0")) + 1
+        self.data[name] = str(value).encode()
+        return value
+
+
+@pytest.fixture(params=["memory", "key-value"])
+def backend(request: pytest.FixtureRequest) -> ResponseCacheBackend:
+    if request.param == "memory":
+        return MemoryCacheBackend()
+    return KeyValueCacheBackend(DictClient())
+
+
+class Loader:
+    def __init__(self, delay: float = 0.0) -> None:
+        self.calls = 0
+        self.delay = delay
+
+    def __call__(self) -> Response:
+        self.calls += 1
+        time.sleep(self.delay)
+        return Response(f"body {self.calls}".encode(), headers={"ETag": '"tag"'})
+
+
+def get_body(result: CachedResponse | Response) -> bytes:
+    assert isinstance(result, CachedResponse)
+    return result.body
+
+
+def test_get_or_set(backend: ResponseCacheBackend) -> None:
+    cache = ResponseCache(backend)
+    load = Loader()
+
+    first = cache.get_or_set("key", ["user"], load)
+    second = cache.get_or_set("key", ["user"], load)
+
+    assert get_body(first) == get_body(second) == b"body 1"
+    assert isinstance(second, CachedResponse)
+    assert second.headers["etag"] == '"tag"'
+    assert load.calls == 1
+
+
+def test_invalidate(backend: ResponseCacheBackend) -> None:
+    cache = ResponseCache(backend)
+    load = Loader()
+    cache.get_or_set("key", ["user", "post"], load)
+
+    cache.invalidate("post")
+
+    assert get_body(cache.get_or_set("key", ["user", "post"], load)) == b"body 2"
+
+
+def test_invalidate_during_load(backend: ResponseCacheBackend) -> None:
+    cache = ResponseCache(backend)
+
+    def load() -> Response:
+        cache.invalidate("user")
+        return Response(b"stale")
+
+    cache.get_or_set("key", ["user"], load)
+
+    assert get_body(cache.get_or_set("key", ["user"], Loader())) == b"body 1"
+
+
+def test_expired(backend: ResponseCacheBackend) -> None:
+    cache = ResponseCache(backend, ttl=0.0)
+    load = Loader()
+
+    cache.get_or_set("key", ["user"], load)
+    cache.get_or_set("key", ["user"], load)
+
+    assert load.calls == 2  # noqa
+
+
+def test_not_cached_error(backend: ResponseCacheBackend) -> None:
+    cache = ResponseCache(backend)
+
+    result = cache.get_or_set(
+        "key", ["user"], lambda: Response(status_code=status.HTTP_404_NOT_FOUND)
+    )
+
+    assert isinstance(result, Response)
+    assert backend.get("key") is None
+
+
+def test_concurrent_misses_load_once(backend: ResponseCacheBackend) -> None:
+    cache = ResponseCache(backend)
+    load = Loader(delay=0.05)
+    results: list[CachedResponse | Response] = []
+
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(cache.get_or_set("key", ["user"], load))
+        )
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert load.calls == 1
+    assert {get_body(result) for result in results} == {b"body 1"}
+
+
+def test_expired_served_while_loading(backend: ResponseCacheBackend) -> None:
+    cache = ResponseCache(backend, ttl=0.0)
+    cache.get_or_set("key", ["user"], Loader())
+    slow_load = Loader(delay=0.1)
+
+    thread = threading.Thread(
+        target=cache.get_or_set, args=("key", ["user"], slow_load)
+    )
+    thread.start()
+    time.sleep(0.02)
+    result = cache.get_or_set("key", ["user"], Loader())
+    thread.join()
+
+    assert get_body(result) == b"body 1"
+    assert slow_load.calls == 1
@@ -0,0 +1,83 @@
+import io
+from collections.abc import Mapping
+
+import pytest
+
+from app.application.imports import (
+    ImportRecord,
+    parse_array,
+    read_csv,
+    read_ndjson,
+    run_import,
+    user_csv_record,
+)
+from app.domain.models.post import PostCreateDomain
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        ("", []),
+        ("{}", []),
+        ("{a,b}", ["a", "b"]),
+        ('{"a b","c,d","e\\"f"}', ["a b", "c,d", 'e"f']),
+    ],
+)
+def test_parse_array(value: str, expected: list[str]) -> None:
+    assert parse_array(value) == expected
+
+
+def test_read_ndjson() -> None:
+    file = io.BytesIO(b'{"a": 1}\n\n{"a": 2}\n')
+
+    assert list(read_ndjson(file)) == [(1, b'{"a": 1}\n'), (3, b'{"a": 2}\n')]
+
+
+def test_read_csv() -> None:
+    file = io.BytesIO(
+        b"\xef\xbb\xbfusername,email,street,city,zip_code,country\n"
+        b'user,user@example.com,"1 Main\nStreet",City,123,Country\n'
+    )
+
+    records = list(read_csv(file, user_csv_record))
+
+    assert records == [
+        (
+            3,
+            {
+                "username": "user",
+                "email": "user@example.com",
+                "address": {
+                    "street": "1 Main\nStreet",
+                    "city": "City",
+                    "zip_code": "123",
+                    "country": "Country",
+                },
+            },
+        )
+    ]
+    assert not file.closed
+
+
+def test_run_import_chunks() -> None:
+    author_id = "7c4a4a4e-2b5e-4b55-9f3e-0e3c1c1d6a51"
+    records: list[ImportRecord] = [
+        (row, f'{{"title": "{row}", "content": "", "author_id": "{author_id}"}}')
+        for row in range(1, 6)
+    ]
+    records.insert(2, (10, '{"title": "invalid"}'))
+    chunks: list[list[int]] = []
+
+    def load(chunk: Mapping[int, PostCreateDomain]) -> dict[int, str]:
+        chunks.append(list(chunk))
+        return {4: "Author not found"} if 4 in chunk else {}  # noqa
+
+    report = run_import(records, PostCreateDomain, load, chunk_size=2)
+
+    assert chunks == [[1, 2], [3, 4], [5]]
+    assert report.total == 6  # noqa
+    assert report.imported == 4  # noqa
+    assert [(error.row, error.errors) for error in report.errors] == [
+        (4, ["Author not found"]),
+        (10, ["content: Field required", "author_id: Field required"]),
+    ]
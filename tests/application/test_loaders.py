@@ -0,0 +1,43 @@
+import uuid
+
+import pytest
+
+from app.application.loaders import AsyncLoaders, Loaders
+from app.application.services.aio.post import AsyncPostService
+from app.application.services.aio.user import AsyncUserService
+from app.application.services.post import PostService
+from app.application.services.user import UserService
+from app.infrastructure.exceptions import EntityNotFoundError
+from app.infrastructure.utils import SQLAlchemyInstrument
+from tests.fixtures.factories.factories import PostFactory
+
+
+def test_load_authors(
+    post_factory: PostFactory, user_service: UserService, post_service: PostService
+) -> None:
+    posts = post_factory.create_many(10)
+    loaders = Loaders(user_service, post_service)
+    author_ids = [post.author_id for post in posts]
+
+    with SQLAlchemyInstrument.record() as sqlalchemy_instrument:
+        authors = loaders.users.load_many([*author_ids, uuid.uuid4()])
+
+    assert sqlalchemy_instrument.queries_count == 1
+    assert [getattr(author, "id", None) for author in authors[:-1]] == author_ids
+    assert isinstance(authors[-1], EntityNotFoundError)
+
+
+@pytest.mark.anyio
+async def test_async_load_authors(
+    post_factory: PostFactory,
+    async_user_service: AsyncUserService,
+    async_post_service: AsyncPostService,
+) -> None:
+    posts = post_factory.create_many(10)
+    loaders = AsyncLoaders(async_user_service, async_post_service)
+
+    authors = await loaders.users.load_many(post.author_id for post in posts)
+
+    assert [getattr(author, "id", None) for author in authors] == [
+        post.author_id for post in posts
+    ]
@@ -0,0 +1,69 @@
+import logging
+import time
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+
+from app.domain.models.base import DomainPagination, PaginationParams
+from app.infrastructure.models import Tag
+from app.infrastructure.repositories.post import PostSQLAlchemyRepository
+from app.infrastructure.repositories.user import UserSQLAlchemyRepository
+from tests.fixtures.factories.factories import PostFactory, UserFactory
+
+logger = logging.getLogger(__name__)
+
+pytestmark = pytest.mark.benchmark
+
+ROWS = 1_000
+ROUNDS = 20
+
+
+def measure(name: str, fn: Callable[[], DomainPagination[Any]]) -> float:
+    results = fn()  # Warm up the statement caches
+    assert len(results.items) == ROWS
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        fn()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    rows_per_second = ROWS * ROUNDS / elapsed
+    logger.info(
+        f"{name:<12} {rows_per_second:>10,.0f} rows/s {peak / ROWS:>8,.0f} B/row"
+    )
+    return rows_per_second
+
+
+def test_get_posts(
+    post_factory: PostFactory, post_repository: PostSQLAlchemyRepository
+) -> None:
+    # Shared tags, the factory would run out of unique words
+    tags = [Tag(name=f"tag-{i}") for i in range(3)]
+    post_factory.create_many(ROWS, tags=tags)
+    pagination = PaginationParams(limit=ROWS)
+
+    orm = measure("posts orm", lambda: post_repository.get_all(pagination))
+    raw = measure("posts raw", lambda: post_repository.get_all(pagination, raw=True))
+
+    logger.info(f"posts speedup x{raw / orm:.1f}")
+
+
+def test_get_users(
+    user_factory: UserFactory, user_repository: UserSQLAlchemyRepository
+) -> None:
+    user_factory.create_many(ROWS)
+    pagination = PaginationParams(limit=ROWS)
+
+    orm = measure("users orm", lambda: user_repository.get_all(pagination))
+    raw = measure("users raw", lambda: user_repository.get_all(pagination, raw=True))
+
+    logger.info(f"users speedup x{raw / orm:.1f}")
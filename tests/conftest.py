@@ -11,6 +11,7 @@ pytest_plugins = [
     "tests.fixtures.repositories",
     "tests.fixtures.services",
     "tests.fixtures.factories.fixtures",
+    "tests.fixtures.client",
 ]
 
 
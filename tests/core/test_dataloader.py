@@ -0,0 +1,111 @@
+import asyncio
+from collections.abc import Mapping
+
+import pytest
+
+from app.core.dataloader import AsyncDataLoader, DataLoader
+
+
+class MissingError(Exception):
+    pass
+
+
+class BatchLoad:
+    def __init__(self) -> None:
+        self.batches: list[list[int]] = []
+
+    def __call__(self, keys: list[int]) -> Mapping[int, str]:
+        self.batches.append(keys)
+        # Odd keys only
+        return {key: str(key) for key in keys if key % 2}
+
+    async def load_async(self, keys: list[int]) -> Mapping[int, str]:
+        return self(keys)
+
+
+def fail(keys: list[int]) -> Mapping[int, str]:
+    raise ConnectionError
+
+
+async def fail_async(keys: list[int]) -> Mapping[int, str]:
+    return fail(keys)
+
+
+def test_load_batched() -> None:
+    batch_load = BatchLoad()
+    loader = DataLoader(batch_load, missing=lambda _: MissingError())
+
+    deferred = [loader.load(key) for key in (5, 1, 3, 1)]
+
+    assert batch_load.batches == []
+    assert [item.get() for item in deferred] == ["5", "1", "3", "1"]
+    assert batch_load.batches == [[5, 1, 3]]
+
+
+def test_load_many_missing() -> None:
+    loader = DataLoader(BatchLoad(), missing=lambda _: MissingError())
+
+    results = loader.load_many([3, 2, 1])
+
+    assert results[0] == "3"
+    assert isinstance(results[1], MissingError)
+    assert results[2] == "1"
+    with pytest.raises(MissingError):
+        loader.load(2).get()
+
+
+def test_results_kept() -> None:
+    batch_load = BatchLoad()
+    loader = DataLoader(batch_load, missing=lambda _: MissingError())
+
+    loader.load_many([1, 3])
+    loader.load_many([3, 5])
+    loader.clear(3)
+    loader.load_many([1, 3])
+
+    assert batch_load.batches == [[1, 3], [5], [3]]
+
+
+def test_load_many_batch_error() -> None:
+    loader = DataLoader(fail, missing=lambda _: MissingError())
+
+    with pytest.raises(ConnectionError):
+        loader.load_many([1, 2])
+    loader.batch_load = BatchLoad()
+    assert loader.load_many([1, 2])[0] == "1"
+
+
+@pytest.mark.anyio
+async def test_async_load_batched() -> None:
+    batch_load = BatchLoad()
+    loader = AsyncDataLoader(batch_load.load_async, missing=lambda _: MissingError())
+
+    results = await asyncio.gather(*(loader.load(key) for key in (5, 1, 3, 1)))
+
+    assert results == ["5", "1", "3", "1"]
+    assert batch_load.batches == [[5, 1, 3]]
+
+
+@pytest.mark.anyio
+async def test_async_load_many_missing() -> None:
+    batch_load = BatchLoad()
+    loader = AsyncDataLoader(batch_load.load_async, missing=lambda _: MissingError())
+
+    results = await loader.load_many([3, 2, 1])
+
+    assert results[0] == "3"
+    assert isinstance(results[1], MissingError)
+    assert results[2] == "1"
+    with pytest.raises(MissingError):
+        await loader.load(2)
+    assert batch_load.batches == [[3, 2, 1]]
+
+
+@pytest.mark.anyio
+async def test_async_load_many_batch_error() -> None:
+    loader = AsyncDataLoader(fail_async, missing=lambda _: MissingError())
+
+    with pytest.raises(ConnectionError):
+        await loader.load_many([1, 2])
+    loader.batch_load = BatchLoad().load_async
+    assert (await loader.load_many([1, 2]))[0] == "1"
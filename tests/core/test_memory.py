@@ -0,0 +1,118 @@
+import threading
+from collections.abc import Iterator
+
+import pytest
+
+from app.application.services.user import UserService
+from app.core.memory import (
+    MemoryTracker,
+    MemoryTracking,
+    collect_memory,
+    memory_tracker,
+)
+from tests.fixtures.factories.factories import PostFactory
+
+size = 1_000_000
+
+
+@pytest.fixture
+def tracker() -> Iterator[MemoryTracker]:
+    memory_tracker.reset_stats()
+    memory_tracker.enable()
+    try:
+        yield memory_tracker
+    finally:
+        memory_tracker.disable()
+        memory_tracker.reset_stats()
+
+
+def allocate() -> int:
+    data = bytearray(size)
+    return len(data)
+
+
+def test_track(tracker: MemoryTracker) -> None:
+    with tracker.track("block") as tracking:
+        data = bytearray(size)
+
+    assert tracking is not None
+    assert tracking.peak >= size
+    assert tracking.top[0].size >= size
+    assert __file__ in tracking.top[0].location
+    del data
+
+    (stats,) = tracker.get_stats()
+    assert stats.name == "block"
+    assert stats.calls == 1
+    assert stats.max_peak == stats.mean_peak == tracking.peak
+
+
+def test_track_freed(tracker: MemoryTracker) -> None:
+    with tracker.track("block") as tracking:
+        allocate()
+
+    # Freed before the end of the block: counted in the peak only
+    assert tracking is not None
+    assert tracking.peak >= size
+    assert all(site.size < size for site in tracking.top)
+
+
+def test_track_nested(tracker: MemoryTracker) -> None:
+    with tracker.track("outer") as outer:
+        with tracker.track("inner") as inner:
+            allocate()
+        allocate()
+
+    assert outer is not None
+    assert inner is not None
+    assert inner.top == []
+    assert inner.peak >= size
+    assert outer.peak >= inner.peak
+
+
+def test_track_disabled() -> None:
+    with memory_tracker.track("block") as tracking:
+        allocate()
+
+    assert tracking is None
+    assert memory_tracker.get_stats() == []
+
+
+def test_track_concurrent_root(tracker: MemoryTracker) -> None:
+    trackings: list[MemoryTracking | None] = []
+
+    def run() -> None:
+        with tracker.track("thread") as tracking:
+            trackings.append(tracking)
+
+    with tracker.track("block"):
+        thread = threading.Thread(target=run)
+        thread.start()
+        thread.join()
+
+    assert trackings == [None]
+
+
+def test_track_service(
+    post_factory: PostFactory, user_service: UserService, tracker: MemoryTracker
+) -> None:
+    post_factory.create_many(3)
+
+    user_service.get_all(include_posts=True)
+
+    stats = {item.name: item for item in tracker.get_stats()}
+    assert stats["UserService.get_all"].top
+    assert stats["SQLAlchemyRepositoryBase._rows_to_domains"].calls == 1
+    assert stats["UserSQLAlchemyRepository._to_domain"].calls == 3  # noqa
+    assert stats["UserSQLAlchemyRepository._to_domain"].top == []
+
+
+def test_collect_memory(tracker: MemoryTracker) -> None:
+    with tracker.track("block"):
+        allocate()
+
+    metrics = {metric.name: list(metric.samples()) for metric in collect_memory()}
+
+    ((_, labels, value),) = metrics["memory_peak_max_bytes"]
+    assert labels == {"name": "block"}
+    assert value >= size
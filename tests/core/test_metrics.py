@@ -0,0 +1,105 @@
+import pytest
+
+from app.core.metrics import Counter, Gauge, Histogram, Metric, MetricsRegistry
+
+
+def test_counter() -> None:
+    counter = Counter("requests", "Requests.", ["status"])
+
+    counter.inc(status="200")
+    counter.inc(2, status="200")
+    counter.inc(status="500")
+
+    assert counter.render().splitlines() == [
+        "# TYPE requests counter",
+        "# HELP requests Requests.",
+        'requests_total{status="200"} 3',
+        'requests_total{status="500"} 1',
+    ]
+
+
+def test_gauge() -> None:
+    gauge = Gauge("connections", "Connections.")
+
+    gauge.set(3)
+    gauge.set(2)
+
+    assert gauge.render().splitlines()[-1] == "connections 2"
+
+
+def test_histogram() -> None:
+    histogram = Histogram("duration", "Duration.", buckets=[0.1, 1])
+
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    histogram.observe(0.5)
+    histogram.observe(2)
+
+    assert histogram.render().splitlines()[2:] == [
+        'duration_bucket{le="0.1"} 1',
+        'duration_bucket{le="1"} 3',
+        'duration_bucket{le="+Inf"} 4',
+        "duration_count 4",
+        "duration_sum 3.05",
+    ]
+
+
+def test_histogram_add() -> None:
+    histogram = Histogram("duration", "Duration.", ["operation"], buckets=[1])
+
+    histogram.add([1, 2], 4.5, operation="SELECT")
+
+    assert histogram.render().splitlines()[2:] == [
+        'duration_bucket{operation="SELECT",le="1"} 1',
+        'duration_bucket{operation="SELECT",le="+Inf"} 3',
+        'duration_count{operation="SELECT"} 3',
+        'duration_sum{operation="SELECT"} 4.5',
+    ]
+
+
+def test_label_escaping() -> None:
+    counter = Counter("requests", "Requests.", ["route"])
+
+    counter.inc(route='a"b\\c\n')
+
+    assert (
+        counter.render().splitlines()[-1] == 'requests_total{route="a\\"b\\\\c\\n"} 1'
+    )
+
+
+def test_labels_mismatch() -> None:
+    counter = Counter("requests", "Requests.", ["status"])
+
+    with pytest.raises(ValueError):
+        counter.inc(route="/")
+
+
+def test_metric_without_samples() -> None:
+    class Untyped(Metric):
+        type = "unknown"
+
+    with pytest.raises(TypeError):
+        Untyped("untyped", "Untyped.")  # pyright: ignore[reportAbstractUsage]
+
+
+def test_registry() -> None:
+    registry = MetricsRegistry()
+    registry.counter("requests", "Requests.").inc()
+    registry.add_collector("connections", lambda: [Gauge("connections", "Conn.")])
+
+    assert registry.render().splitlines() == [
+        "# TYPE requests counter",
+        "# HELP requests Requests.",
+        "requests_total 1",
+        "# TYPE connections gauge",
+        "# HELP connections Conn.",
+        "# EOF",
+    ]
+
+
+def test_registry_duplicate() -> None:
+    registry = MetricsRegistry()
+    registry.counter("requests", "Requests.")
+
+    with pytest.raises(ValueError):
+        registry.gauge("requests", "Requests.")
@@ -0,0 +1,170 @@
+import threading
+import time
+
+import pytest
+
+from app.application.services.user import UserService
+from app.core.profiling import (
+    Profile,
+    get_profile,
+    profile,
+    profile_methods,
+    profiled,
+    span,
+)
+from app.infrastructure.utils import SQLAlchemyInstrument
+from tests.fixtures.factories.factories import PostFactory
+
+
+@profiled("service")
+def sleep(duration: float) -> None:
+    with span("db", "sleep"):
+        time.sleep(duration)
+
+
+@profiled("service")
+async def async_sleep(duration: float) -> None:
+    sleep(duration)
+
+
+@profile_methods("service")
+class Service:
+    def run(self) -> int:
+        return 1
+
+    def _private(self) -> int:
+        return 2
+
+
+def test_profile() -> None:
+    with profile("test") as current:
+        sleep(0.01)
+        sleep(0.01)
+
+    report = current.report()
+    assert get_profile() is None
+    assert set(report.layers) == {"http", "service", "db"}
+    assert report.layers["db"] >= 20  # noqa
+    assert report.layers["service"] < report.layers["db"]
+    assert report.duration >= sum(report.layers.values()) - 0.1
+    entry = next(entry for entry in report.entries if entry.category == "service")
+    assert entry.calls == 2  # noqa
+    assert entry.name == sleep.__qualname__
+    assert entry.total_time >= entry.self_time
+
+
+@pytest.mark.anyio
+async def test_profile_async() -> None:
+    with profile("test") as current:
+        await async_sleep(0.001)
+
+    names = {entry.name for entry in current.report().entries}
+    assert names == {"test", async_sleep.__qualname__, sleep.__qualname__, "sleep"}
+
+
+def test_profiled_without_profile() -> None:
+    sleep(0)
+
+    assert get_profile() is None
+
+
+def test_profile_methods() -> None:
+    with profile("test") as current:
+        Service().run()
+        Service()._private()  # pyright: ignore[reportPrivateUsage]
+
+    names = {entry.name for entry in current.report().entries}
+    assert "Service.run" in names
+    assert "Service._private" not in names
+
+
+def test_profile_deterministic() -> None:
+    with profile("test", mode="deterministic") as current:
+        sleep(0.001)
+
+    report = current.report()
+    assert report.mode == "deterministic"
+    assert report.stats is not None
+    assert "sleep" in report.stats
+
+
+def test_profile_deterministic_concurrent() -> None:
+    with (
+        profile("outer", mode="deterministic"),
+        profile("inner", mode="deterministic") as inner,
+    ):
+        sleep(0)
+
+    assert inner.report().mode == "spans"
+
+
+def test_profile_sampling() -> None:
+    with profile("test", mode="sampling", interval=0.001) as current:
+        sleep(0.05)
+
+    report = current.report()
+    assert report.stacks
+    assert any(stack.endswith(sleep.__qualname__) for stack in report.stacks)
+
+
+def busy_inside(duration: float) -> None:
+    time.sleep(duration)
+
+
+def busy_outside(duration: float) -> None:
+    time.sleep(duration)
+
+
+def test_profile_sampling_pooled_thread() -> None:
+    def serve(current: Profile) -> None:
+        with current.span("service", "request"):
+            busy_inside(0.05)
+        # Same thread, serving another request
+        busy_outside(0.05)
+
+    with profile("test", mode="sampling", interval=0.001) as current:
+        thread = threading.Thread(target=serve, args=(current,))
+        thread.start()
+        thread.join()
+
+    stacks = current.report().stacks or {}
+    assert any(stack.endswith(busy_inside.__qualname__) for stack in stacks)
+    assert not any(busy_outside.__qualname__ in stack for stack in stacks)
+
+
+def test_profile_layers(post_factory: PostFactory, user_service: UserService) -> None:
+    post = post_factory.create_one()
+    SQLAlchemyInstrument()  # Reports the queries
+
+    with profile("test") as current:
+        user_service.get_by_id(post.author_id, include_posts=True)
+
+    report = current.report()
+    assert set(report.layers) == {"http", "service", "repository", "conversion", "db"}
+    names = {(entry.category, entry.name) for entry in report.entries}
+    assert ("service", "UserService.get_by_id") in names
+    assert ("repository", "UserSQLAlchemyRepository.get_by_id") in names
+    assert ("conversion", "UserSQLAlchemyRepository._to_projected_domain") not in names
+    db = [entry for entry in report.entries if entry.category == "db"]
+    assert sum(entry.calls for entry in db) == 4  # noqa
+
+
+def test_profile_isolation() -> None:
+    current = Profile("test")
+
+    current.add("db", "query", 0.5)
+
+    assert current.report().layers == {"db": 500}
+
+
+def test_profile_threads() -> None:
+    current = Profile("test")
+
+    with current.span("service", "request"):
+        # Another thread of the same profile, e.g. a worker of the request
+        thread = threading.Thread(target=current.add, args=("db", "query", 0.5))
+        thread.start()
+        thread.join()
+
+    entry = next(entry for entry in current.report().entries if entry.name == "request")
+    assert entry.self_time == entry.total_time
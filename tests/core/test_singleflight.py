@@ -0,0 +1,111 @@
+import asyncio
+import threading
+import time
+from collections.abc import Callable
+
+import pytest
+
+from app.core.singleflight import AsyncSingleFlight, SingleFlight, freeze
+from app.domain.models.base import PaginationParams
+
+
+class Loader:
+    def __init__(self, delay: float = 0.05) -> None:
+        self.calls = 0
+        self.delay = delay
+
+    def __call__(self) -> int:
+        self.calls += 1
+        time.sleep(self.delay)
+        return self.calls
+
+    async def load_async(self) -> int:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.calls
+
+
+def run_threads(count: int, target: Callable[[], object]) -> None:
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_freeze() -> None:
+    pagination = PaginationParams(limit=10)
+
+    assert freeze(pagination) == freeze(PaginationParams(limit=10))
+    assert freeze(pagination) != freeze(PaginationParams(limit=20))
+    assert freeze({"b": [1], "a": {2}}) == (("a", frozenset({2})), ("b", (1,)))
+
+
+def test_concurrent_calls_share_execution() -> None:
+    flight = SingleFlight("test")
+    load = Loader()
+    results: list[int] = []
+
+    run_threads(5, lambda: results.append(flight.do("key", load)))
+
+    assert load.calls == 1
+    assert results == [1] * 5
+
+
+def test_different_keys() -> None:
+    flight = SingleFlight("test")
+    load = Loader(delay=0.0)
+
+    flight.do("key", load)
+    flight.do("other", load)
+    # Nothing is kept once the call returned
+    flight.do("key", load)
+
+    assert load.calls == 3  # noqa
+
+
+def test_error_shared() -> None:
+    flight = SingleFlight("test")
+    errors: list[Exception] = []
+
+    def fail() -> int:
+        time.sleep(0.05)
+        raise ValueError
+
+    def call() -> None:
+        try:
+            flight.do("key", fail)
+        except ValueError as err:
+            errors.append(err)
+
+    run_threads(3, call)
+
+    assert len(errors) == 3  # noqa
+    assert flight.do("key", Loader(delay=0.0)) == 1
+
+
+@pytest.mark.anyio
+async def test_async_concurrent_calls_share_execution() -> None:
+    flight = AsyncSingleFlight("test")
+    load = Loader()
+
+    results = await asyncio.gather(
+        *(flight.do("key", load.load_async) for _ in range(5))
+    )
+
+    assert load.calls == 1
+    assert results == [1] * 5
+
+
+@pytest.mark.anyio
+async def test_async_caller_cancelled() -> None:
+    flight = AsyncSingleFlight("test")
+    load = Loader()
+
+    first = asyncio.ensure_future(flight.do("key", load.load_async))
+    second = asyncio.ensure_future(flight.do("key", load.load_async))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == 1
+    assert first.cancelled()
@@ -0,0 +1,18 @@
+from collections.abc import Iterator
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.infrastructure.database import get_session, get_sessionmaker
+from app.main import app
+
+
+@pytest.fixture
+def client(session: Session) -> Iterator[TestClient]:
+    app.dependency_overrides[get_session] = lambda: session
+    app.dependency_overrides[get_sessionmaker] = lambda: sessionmaker(
+        session.get_bind(), expire_on_commit=False
+    )
+    yield TestClient(app)
+    app.dependency_overrides.clear()
@@ -1,13 +1,14 @@
 import logging
 import os
 import time
-from collections.abc import Iterator
+from collections.abc import AsyncIterator, Iterator
 
 import docker
 import psycopg
 import pytest
 from docker.errors import NotFound
-from sqlalchemy import Engine, create_engine
+from sqlalchemy import Engine, NullPool, create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import Session
 
 from app.core.config import Settings
@@ -86,3 +87,22 @@ def session(setup_db: Iterator[None], engine: Engine) -> Iterator[Session]:
         for table in reversed(Base.metadata.sorted_tables):
             session.execute(table.delete())
         session.commit()
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.fixture
+async def async_session(
+    session: Session, settings: Settings
+) -> AsyncIterator[AsyncSession]:
+    # Each test runs in its own event loop: don't keep pooled connections
+    async_engine = create_async_engine(
+        str(settings.SQLALCHEMY_DATABASE_URI), poolclass=NullPool
+    )
+    async with AsyncSession(async_engine, expire_on_commit=False) as async_session:
+        yield async_session
+
+    await async_engine.dispose()
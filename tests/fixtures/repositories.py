@@ -1,7 +1,13 @@
 import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.infrastructure.repositories.address import AddressSQLAlchemyRepository
+from app.infrastructure.repositories.aio.address import (
+    AsyncAddressSQLAlchemyRepository,
+)
+from app.infrastructure.repositories.aio.post import AsyncPostSQLAlchemyRepository
+from app.infrastructure.repositories.aio.user import AsyncUserSQLAlchemyRepository
 from app.infrastructure.repositories.post import PostSQLAlchemyRepository
 from app.infrastructure.repositories.user import UserSQLAlchemyRepository
 
@@ -17,7 +23,26 @@ def user_repository(session: Session) -> UserSQLAlchemyRepository:
 
 
 @pytest.fixture
-def post_repository(
-    session: Session, user_repository: UserSQLAlchemyRepository
-) -> PostSQLAlchemyRepository:
-    return PostSQLAlchemyRepository(session=session, user_repository=user_repository)
+def post_repository(session: Session) -> PostSQLAlchemyRepository:
+    return PostSQLAlchemyRepository(session=session)
+
+
+@pytest.fixture
+def async_address_repository(
+    async_session: AsyncSession,
+) -> AsyncAddressSQLAlchemyRepository:
+    return AsyncAddressSQLAlchemyRepository(session=async_session)
+
+
+@pytest.fixture
+def async_user_repository(
+    async_session: AsyncSession,
+) -> AsyncUserSQLAlchemyRepository:
+    return AsyncUserSQLAlchemyRepository(session=async_session)
+
+
+@pytest.fixture
+def async_post_repository(
+    async_session: AsyncSession,
+) -> AsyncPostSQLAlchemyRepository:
+    return AsyncPostSQLAlchemyRepository(session=async_session)
@@ -1,9 +1,17 @@
 import pytest
 
 from app.application.services.address import AddressService
+from app.application.services.aio.address import AsyncAddressService
+from app.application.services.aio.post import AsyncPostService
+from app.application.services.aio.user import AsyncUserService
 from app.application.services.post import PostService
 from app.application.services.user import UserService
 from app.infrastructure.repositories.address import AddressSQLAlchemyRepository
+from app.infrastructure.repositories.aio.address import (
+    AsyncAddressSQLAlchemyRepository,
+)
+from app.infrastructure.repositories.aio.post import AsyncPostSQLAlchemyRepository
+from app.infrastructure.repositories.aio.user import AsyncUserSQLAlchemyRepository
 from app.infrastructure.repositories.post import PostSQLAlchemyRepository
 from app.infrastructure.repositories.user import UserSQLAlchemyRepository
 
@@ -21,3 +29,24 @@ def user_service(user_repository: UserSQLAlchemyRepository) -> UserService:
 @pytest.fixture
 def post_service(post_repository: PostSQLAlchemyRepository) -> PostService:
     return PostService(repository=post_repository)
+
+
+@pytest.fixture
+def async_address_service(
+    async_address_repository: AsyncAddressSQLAlchemyRepository,
+) -> AsyncAddressService:
+    return AsyncAddressService(repository=async_address_repository)
+
+
+@pytest.fixture
+def async_user_service(
+    async_user_repository: AsyncUserSQLAlchemyRepository,
+) -> AsyncUserService:
+    return AsyncUserService(repository=async_user_repository)
+
+
+@pytest.fixture
+def async_post_service(
+    async_post_repository: AsyncPostSQLAlchemyRepository,
+) -> AsyncPostService:
+    return AsyncPostService(repository=async_post_repository)
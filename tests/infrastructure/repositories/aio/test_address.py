@@ -0,0 +1,41 @@
+import pytest
+
+from app.core.exceptions import OperationNotAllowedError
+from app.infrastructure.repositories.aio.address import (
+    AsyncAddressSQLAlchemyRepository,
+)
+from tests.fixtures.factories.factories import UserFactory
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_get_addresses(
+    user_factory: UserFactory,
+    async_address_repository: AsyncAddressSQLAlchemyRepository,
+) -> None:
+    count = 3
+    user_factory.create_many(count)
+
+    results = await async_address_repository.get_all()
+
+    assert results.total == count
+    assert len(results.items) == count
+
+
+async def test_get_address_by_id(
+    user_factory: UserFactory,
+    async_address_repository: AsyncAddressSQLAlchemyRepository,
+) -> None:
+    user = user_factory.create_one()
+
+    result = await async_address_repository.get_by_id(user.address.id)
+
+    assert result.id == user.address.id
+    assert result.user_id == user.id
+
+
+async def test_create_address(
+    async_address_repository: AsyncAddressSQLAlchemyRepository,
+) -> None:
+    with pytest.raises(OperationNotAllowedError):
+        await async_address_repository.create(None)  # type: ignore
@@ -0,0 +1,106 @@
+import csv
+import io
+import uuid
+
+import pytest
+from faker import Faker
+
+from app.domain.models.base import TagName, UserId
+from app.domain.models.post import PostCreateDomain, PostUpdateDomain
+from app.infrastructure.exceptions import EntityNotFoundError
+from app.infrastructure.repositories.aio.post import AsyncPostSQLAlchemyRepository
+from tests.fixtures.factories.factories import PostFactory, UserFactory
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_get_posts(
+    post_factory: PostFactory, async_post_repository: AsyncPostSQLAlchemyRepository
+) -> None:
+    count = 3
+    post_factory.create_many(count)
+
+    results = await async_post_repository.get_all()
+
+    assert results.total == count
+    assert len(results.items) == count
+
+
+async def test_iter_posts(
+    post_factory: PostFactory, async_post_repository: AsyncPostSQLAlchemyRepository
+) -> None:
+    posts = post_factory.create_many(7)
+
+    batches = [batch async for batch in async_post_repository.iter_batches(5)]
+    results = [post async for post in async_post_repository.iter_all(5)]
+
+    assert [len(batch) for batch in batches] == [5, 2]
+    assert {post.id for post in results} == {post.id for post in posts}
+
+
+async def test_copy_posts(
+    post_factory: PostFactory, async_post_repository: AsyncPostSQLAlchemyRepository
+) -> None:
+    posts = post_factory.create_many(3)
+
+    chunks = [chunk async for chunk in async_post_repository.copy_to()]
+
+    rows = list(csv.DictReader(io.StringIO(b"".join(chunks).decode())))
+    assert {row["id"] for row in rows} == {str(post.id) for post in posts}
+
+
+async def test_get_post_by_id(
+    post_factory: PostFactory, async_post_repository: AsyncPostSQLAlchemyRepository
+) -> None:
+    post = post_factory.create_one()
+
+    result = await async_post_repository.get_by_id(post.id)
+
+    assert result.id == post.id
+    assert set(result.tags) == {tag.name for tag in post.tags}
+
+
+async def test_create_post(
+    faker: Faker,
+    user_factory: UserFactory,
+    async_post_repository: AsyncPostSQLAlchemyRepository,
+) -> None:
+    user = user_factory.create_one()
+    data = PostCreateDomain(
+        title=faker.sentence(),
+        content=faker.text(),
+        author_id=UserId(user.id),
+        tags=[TagName(faker.uuid4()) for _ in range(3)],
+    )
+
+    result = await async_post_repository.create(data)
+
+    assert result.author_id == user.id
+    assert set(result.tags) == set(data.tags)
+
+
+async def test_create_post_author_not_found(
+    faker: Faker, async_post_repository: AsyncPostSQLAlchemyRepository
+) -> None:
+    data = PostCreateDomain(
+        title=faker.sentence(),
+        content=faker.text(),
+        author_id=UserId(uuid.uuid4()),
+    )
+
+    with pytest.raises(EntityNotFoundError):
+        await async_post_repository.create(data)
+
+
+async def test_update_post(
+    faker: Faker,
+    post_factory: PostFactory,
+    async_post_repository: AsyncPostSQLAlchemyRepository,
+) -> None:
+    post = post_factory.create_one()
+    data = PostUpdateDomain(title=faker.sentence())
+
+    result = await async_post_repository.update(post.id, data)
+
+    assert result.title == data.title
+    assert result.content == post.content
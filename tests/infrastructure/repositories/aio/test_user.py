@@ -0,0 +1,96 @@
+import uuid
+
+import pytest
+from faker import Faker
+from sqlalchemy.orm import Session
+
+from app.domain.models.address import AddressCreateDomain
+from app.domain.models.base import PaginationParams
+from app.domain.models.user import UserCreateDomain, UserUpdateDomain
+from app.infrastructure.exceptions import EntityAlreadyExistsError, EntityNotFoundError
+from app.infrastructure.models import User
+from app.infrastructure.repositories.aio.user import AsyncUserSQLAlchemyRepository
+from tests.fixtures.factories.factories import PostFactory, UserFactory
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_get_users_first_page(
+    user_factory: UserFactory, async_user_repository: AsyncUserSQLAlchemyRepository
+) -> None:
+    count = 12
+    limit = 5
+    user_factory.create_many(count)
+
+    results = await async_user_repository.get_all(PaginationParams(limit=limit))
+
+    assert results.total == count
+    assert len(results.items) == limit
+    assert results.next_cursor is not None
+
+
+async def test_get_user_by_id_with_posts(
+    user_factory: UserFactory,
+    post_factory: PostFactory,
+    async_user_repository: AsyncUserSQLAlchemyRepository,
+) -> None:
+    user = user_factory.create_one()
+    posts = post_factory.create_many(3, author_id=user.id)
+
+    result = await async_user_repository.get_by_id(user.id, include_posts=True)
+
+    assert result.id == user.id
+    assert result.address.id == user.address.id
+    assert {post.id for post in result.posts} == {post.id for post in posts}
+
+
+async def test_get_user_by_id_not_found(
+    async_user_repository: AsyncUserSQLAlchemyRepository,
+) -> None:
+    with pytest.raises(EntityNotFoundError):
+        await async_user_repository.get_by_id(uuid.uuid4())
+
+
+async def test_create_user(
+    faker: Faker, async_user_repository: AsyncUserSQLAlchemyRepository
+) -> None:
+    data = UserCreateDomain(
+        username=faker.user_name(),
+        email=faker.email(),
+        address=AddressCreateDomain(
+            street=faker.street_address(),
+            city=faker.city(),
+            zip_code=faker.zipcode(),
+            country=faker.country(),
+        ),
+    )
+
+    result = await async_user_repository.create(data)
+
+    assert result.username == data.username
+    assert result.address.street == data.address.street
+    assert result.posts == []
+
+
+async def test_update_user_email_already_exists(
+    user_factory: UserFactory, async_user_repository: AsyncUserSQLAlchemyRepository
+) -> None:
+    existing_user = user_factory.create_one()
+    user_to_update = user_factory.create_one()
+    data = UserUpdateDomain(email=existing_user.email)
+
+    with pytest.raises(EntityAlreadyExistsError):
+        await async_user_repository.update(user_to_update.id, data)
+
+
+async def test_delete_user(
+    session: Session,
+    user_factory: UserFactory,
+    async_user_repository: AsyncUserSQLAlchemyRepository,
+) -> None:
+    user = user_factory.create_one()
+
+    await async_user_repository.delete(user.id)
+    session.expunge_all()
+
+    assert session.get(User, user.id) is None
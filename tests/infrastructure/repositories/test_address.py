@@ -33,6 +33,16 @@ def test_get_address_by_id(
     assert result.user_id == user.id
 
 
+def test_get_addresses_raw(
+    user_factory: UserFactory, address_repository: AddressSQLAlchemyRepository
+) -> None:
+    user_factory.create_many(3)
+
+    results = address_repository.get_all(raw=True)
+
+    assert results == address_repository.get_all()
+
+
 def test_create_address(address_repository: AddressSQLAlchemyRepository) -> None:
     with pytest.raises(OperationNotAllowedError):
         address_repository.create(None)  # type: ignore
@@ -46,3 +56,13 @@ def test_update_address(address_repository: AddressSQLAlchemyRepository) -> None
 def test_delete_address(address_repository: AddressSQLAlchemyRepository) -> None:
     with pytest.raises(OperationNotAllowedError):
         address_repository.delete(None)  # type: ignore
+
+
+def test_create_many_addresses(address_repository: AddressSQLAlchemyRepository) -> None:
+    with pytest.raises(OperationNotAllowedError):
+        address_repository.create_many([])
+
+
+def test_delete_many_addresses(address_repository: AddressSQLAlchemyRepository) -> None:
+    with pytest.raises(OperationNotAllowedError):
+        address_repository.delete_many([])
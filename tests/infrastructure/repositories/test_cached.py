@@ -0,0 +1,198 @@
+import time
+
+import pytest
+from faker import Faker
+
+from app.domain.models.post import PostCreateDomain, PostDomain, PostUpdateDomain
+from app.domain.models.user import UserCreateDomain, UserDomain, UserUpdateDomain
+from app.infrastructure.cache import EntityCache
+from app.infrastructure.exceptions import EntityNotFoundError
+from app.infrastructure.repositories.cached import (
+    CachedRepository,
+    PostCachePolicy,
+    UserCachePolicy,
+)
+from app.infrastructure.repositories.post import PostSQLAlchemyRepository
+from app.infrastructure.repositories.user import UserSQLAlchemyRepository
+from app.infrastructure.utils import SQLAlchemyInstrument
+from tests.fixtures.factories.factories import PostFactory, UserFactory
+
+CachedUserRepository = CachedRepository[UserDomain, UserCreateDomain, UserUpdateDomain]
+CachedPostRepository = CachedRepository[PostDomain, PostCreateDomain, PostUpdateDomain]
+
+
+@pytest.fixture
+def entity_cache() -> EntityCache:
+    return EntityCache(maxsize=100, ttl=60.0)
+
+
+@pytest.fixture
+def cached_user_repository(
+    entity_cache: EntityCache, user_repository: UserSQLAlchemyRepository
+) -> CachedUserRepository:
+    return CachedRepository(user_repository, entity_cache, UserCachePolicy())
+
+
+@pytest.fixture
+def cached_post_repository(
+    entity_cache: EntityCache, post_repository: PostSQLAlchemyRepository
+) -> CachedPostRepository:
+    return CachedRepository(post_repository, entity_cache, PostCachePolicy())
+
+
+def test_get_by_id_is_cached(
+    user_factory: UserFactory,
+    entity_cache: EntityCache,
+    cached_user_repository: CachedUserRepository,
+) -> None:
+    user = user_factory.create_one()
+
+    first = cached_user_repository.get_by_id(user.id)
+    with SQLAlchemyInstrument.record() as sqlalchemy_instrument:
+        second = cached_user_repository.get_by_id(user.id)
+
+    assert second == first
+    assert sqlalchemy_instrument.queries_count == 0
+    stats = entity_cache.stats
+    assert stats.hits == 1
+    assert stats.misses == 1
+    assert stats.size == 1
+
+
+def test_get_many_is_cached(
+    user_factory: UserFactory, cached_user_repository: CachedUserRepository
+) -> None:
+    users = user_factory.create_many(3)
+    cached_user_repository.get_by_id(users[0].id)
+
+    with SQLAlchemyInstrument.record() as sqlalchemy_instrument:
+        first = cached_user_repository.get_many([user.id for user in users])
+    with SQLAlchemyInstrument.record() as cached_instrument:
+        second = cached_user_repository.get_many([user.id for user in users])
+
+    assert first == second
+    assert set(first) == {user.id for user in users}
+    # Only the two users not cached yet are loaded, in one query
+    assert sqlalchemy_instrument.queries_count == 1
+    assert cached_instrument.queries_count == 0
+
+
+def test_get_by_id_not_found_is_not_cached(
+    entity_cache: EntityCache,
+    cached_user_repository: CachedUserRepository,
+    faker: Faker,
+) -> None:
+    with pytest.raises(EntityNotFoundError):
+        cached_user_repository.get_by_id(faker.uuid4(cast_to=None))
+
+    assert entity_cache.stats.size == 0
+
+
+def test_cache_expires(
+    user_factory: UserFactory, user_repository: UserSQLAlchemyRepository
+) -> None:
+    cache = EntityCache(ttl=0.01)
+    repository = CachedRepository(user_repository, cache, UserCachePolicy())
+    user = user_factory.create_one()
+
+    repository.get_by_id(user.id)
+    time.sleep(0.02)
+    repository.get_by_id(user.id)
+
+    assert cache.stats.hits == 0
+    assert cache.stats.misses == 2  # noqa
+
+
+def test_cache_evicts_least_recently_used(
+    user_factory: UserFactory, user_repository: UserSQLAlchemyRepository
+) -> None:
+    cache = EntityCache(maxsize=2)
+    repository = CachedRepository(user_repository, cache, UserCachePolicy())
+    first, second, third = user_factory.create_many(3)
+
+    repository.get_by_id(first.id)
+    repository.get_by_id(second.id)
+    repository.get_by_id(first.id)
+    repository.get_by_id(third.id)
+
+    assert cache.stats.evictions == 1
+    repository.get_by_id(first.id)
+    assert cache.stats.hits == 2  # noqa
+    repository.get_by_id(second.id)
+    assert cache.stats.hits == 2  # noqa
+
+
+def test_update_invalidates(
+    faker: Faker,
+    user_factory: UserFactory,
+    cached_user_repository: CachedUserRepository,
+) -> None:
+    user = user_factory.create_one()
+    cached_user_repository.get_by_id(user.id)
+
+    data = UserUpdateDomain(username=faker.user_name())
+    cached_user_repository.update(user.id, data)
+
+    result = cached_user_repository.get_by_id(user.id)
+    assert result.username == data.username
+
+
+def test_delete_invalidates(
+    user_factory: UserFactory,
+    cached_user_repository: CachedUserRepository,
+) -> None:
+    user = user_factory.create_one()
+    cached_user_repository.get_by_id(user.id)
+
+    cached_user_repository.delete(user.id)
+
+    with pytest.raises(EntityNotFoundError):
+        cached_user_repository.get_by_id(user.id)
+
+
+def test_post_update_invalidates_author(
+    faker: Faker,
+    post_factory: PostFactory,
+    cached_user_repository: CachedUserRepository,
+    cached_post_repository: CachedPostRepository,
+) -> None:
+    post = post_factory.create_one()
+    cached_user_repository.get_by_id(post.author_id, include_posts=True)
+    cached_post_repository.get_by_id(post.id)
+
+    data = PostUpdateDomain(title=faker.sentence())
+    cached_post_repository.update(post.id, data)
+
+    user = cached_user_repository.get_by_id(post.author_id, include_posts=True)
+    assert [p.title for p in user.posts] == [data.title]
+    assert cached_post_repository.get_by_id(post.id).title == data.title
+
+
+def test_post_delete_invalidates_author(
+    post_factory: PostFactory,
+    cached_user_repository: CachedUserRepository,
+    cached_post_repository: CachedPostRepository,
+) -> None:
+    post = post_factory.create_one()
+    cached_user_repository.get_by_id(post.author_id, include_posts=True)
+
+    cached_post_repository.delete(post.id)
+
+    user = cached_user_repository.get_by_id(post.author_id, include_posts=True)
+    assert user.posts == []
+
+
+def test_user_delete_invalidates_posts(
+    post_factory: PostFactory,
+    cached_user_repository: CachedUserRepository,
+    cached_post_repository: CachedPostRepository,
+) -> None:
+    post = post_factory.create_one()
+    post_id, author_id = post.id, post.author_id
+    cached_post_repository.get_by_id(post_id)
+
+    # The deleted instances are expired
+    cached_user_repository.delete(author_id)
+
+    with pytest.raises(EntityNotFoundError):
+        cached_post_repository.get_by_id(post_id)
@@ -1,14 +1,29 @@
+import csv
+import io
 import uuid
 
 import pytest
 from faker import Faker
+from sqlalchemy import select, text
 from sqlalchemy.orm import Session
 
-from app.domain.models.base import PaginationParams, TagName, UserId
+from app.domain.models.base import (
+    CountStrategy,
+    ExportFormat,
+    PaginationParams,
+    TagName,
+    UserId,
+)
 from app.domain.models.post import PostCreateDomain, PostUpdateDomain
-from app.infrastructure.exceptions import EntityNotFoundError
+from app.infrastructure.exceptions import (
+    EntityNotFoundError,
+    InvalidCursorError,
+    InvalidFieldsError,
+)
 from app.infrastructure.models import Post, Tag, User
 from app.infrastructure.repositories.post import PostSQLAlchemyRepository
+from app.infrastructure.repositories.user import UserSQLAlchemyRepository
+from app.infrastructure.utils import SQLAlchemyInstrument
 from tests.fixtures.factories.factories import PostFactory, UserFactory
 
 
@@ -71,6 +86,311 @@ def test_get_posts_empty_page(
     assert len(results.items) == 0
 
 
+def test_get_posts_cursor_pages(
+    post_factory: PostFactory, post_repository: PostSQLAlchemyRepository
+) -> None:
+    count = 12
+    limit = 5
+    posts = post_factory.create_many(count)
+
+    seen: list[uuid.UUID] = []
+    cursor: str | None = None
+    for expected in (5, 5, 2):
+        results = post_repository.get_all(PaginationParams(limit=limit, after=cursor))
+        assert results.total == count
+        assert len(results.items) == expected
+        seen.extend(item.id for item in results.items)
+        cursor = results.next_cursor
+
+    assert cursor is None
+    assert seen == sorted(post.id for post in posts)
+
+
+def test_get_posts_cursor_matches_offset(
+    post_factory: PostFactory, post_repository: PostSQLAlchemyRepository
+) -> None:
+    post_factory.create_many(12)
+
+    first_page = post_repository.get_all(PaginationParams(page=1, limit=5))
+    second_page = post_repository.get_all(
+        PaginationParams(limit=5, after=first_page.next_cursor)
+    )
+
+    offset_page = post_repository.get_all(PaginationParams(page=2, limit=5))
+    assert second_page.items == offset_page.items
+
+
+def test_get_posts_exact_count_single_round_trip(
+    post_factory: PostFactory, post_repository: PostSQLAlchemyRepository
+) -> None:
+    count = 12
+    post_factory.create_many(count)
+
+    with SQLAlchemyInstrument.record() as sqlalchemy_instrument:
+        results = post_repository.get_all(PaginationParams(limit=5))
+
+    assert results.total == count
+    assert results.total_exact
+    # Page with its total, then the tags
+    assert sqlalchemy_instrument.queries_count == 2  # noqa
+
+
+def test_get_posts_without_count(
+    post_factory: PostFactory, post_repository: PostSQLAlchemyRepository
+) -> None:
+    post_factory.create_many(12)
+
+    results = post_repository.get_all(
+        PaginationParams(limit=5, count=CountStrategy.NONE)
+    )
+
+    assert results.total is None
+    assert not results.total_exact
+    assert len(results.items) == 5  # noqa
+
+
+def test_get_posts_estimated_count(
+    session: Session,
+    post_factory: PostFactory,
+    post_repository: PostSQLAlchemyRepository,
+) -> None:
+    count = 12
+    post_factory.create_many(count)
+    session.execute(text("ANALYZE post"))
+
+    results = post_repository.get_all(
+        PaginationParams(limit=5, count=CountStrategy.ESTIMATED)
+    )
+
+    assert results.total == count
+    assert not results.total_exact
+
+
+def test_get_posts_cached_count(
+    post_factory: PostFactory, post_repository: PostSQLAlchemyRepository
+) -> None:
+    count = 12
+    post_repository.count_cache.clear()
+    post_factory.create_many(count)
+    pagination = PaginationParams(limit=5, count=CountStrategy.CACHED)
+
+    first = post_repository.get_all(pagination)
+    post_factory.create_many(3)
+    second = post_repository.get_all(pagination)
+
+    assert first.total == count
+    assert first.total_exact
+    assert second.total == count
+    assert not second.total_exact
+
+
+def test_get_posts_cached_count_invalidated(
+    faker: Faker,
+    user_factory: UserFactory,
+    post_repository: PostSQLAlchemyRepository,
+    user_repository: UserSQLAlchemyRepository,
+) -> None:
+    post_repository.count_cache.clear()
+    user = user_factory.create_one()
+    pagination = PaginationParams(limit=5, count=CountStrategy.CACHED)
+    post_repository.get_all(pagination)
+
+    post_repository.create_many(
+        [
+            PostCreateDomain(
+                title=faker.sentence(), content="", author_id=UserId(user.id)
+            )
+            for _ in range(2)
+        ]
+    )
+    created = post_repository.get_all(pagination)
+    # The posts are deleted by cascade
+    user_repository.delete(user.id)
+    deleted = post_repository.get_all(pagination)
+
+    assert (created.total, created.total_exact) == (2, True)
+    assert (deleted.total, deleted.total_exact) == (0, True)
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "WyJhIiwiYiJd", "e30"])
+def test_get_posts_invalid_cursor(
+    cursor: str, post_repository: PostSQLAlchemyRepository
+) -> None:
+    with pytest.raises(InvalidCursorError):
+        post_repository.get_all(PaginationParams(after=cursor))
+
+
+def test_get_posts_fields(
+    post_factory: PostFactory, post_repository: PostSQLAlchemyRepository
+) -> None:
+    posts = post_factory.create_many(3)
+
+    with SQLAlchemyInstrument.record() as sqlalchemy_instrument:
+        results = post_repository.get_all(
+            PaginationParams(limit=5), fields=["id", "title"]
+        )
+
+    assert {item.id for item in results.items} == {post.id for post in posts}
+    for item in results.items:
+        assert item.model_fields_set == {"id", "title"}
+        assert item.model_dump() == {"id": item.id, "title": item.title}
+    # Neither the contents nor the tags are loaded
+    assert sqlalchemy_instrument.queries_count == 1
+    assert "content" not in sqlalchemy_instrument.queries[0].statement
+
+
+def test_get_posts_invalid_fields(post_repository: PostSQLAlchemyRepository) -> None:
+    with pytest.raises(InvalidFieldsError):
+        post_repository.get_all(fields=["title", "password"])
+
+
+def test_get_posts_raw(
+    post_factory: PostFactory, post_repository: PostSQLAlchemyRepository
+) -> None:
+    post_factory.create_many(12)
+
+    with SQLAlchemyInstrument.record() as sqlalchemy_instrument:
+        results = post_repository.get_all(PaginationParams(limit=20), raw=True)
+
+    expected = post_repository.get_all(PaginationParams(limit=20))
+    assert results.total == expected.total
+    for result, item in zip(results.items, expected.items, strict=True):
+        assert result.model_dump(exclude={"tags"}) == item.model_dump(exclude={"tags"})
+        assert sorted(result.tags) == sorted(item.tags)
+    # Tags are aggregated in the page query
+    assert sqlalchemy_instrument.queries_count == 1
+
+
+def test_get_posts_raw_cursor(
+    post_factory: PostFactory, post_repository: PostSQLAlchemyRepository
+) -> None:
+    post_factory.create_many(7)
+
+    first_page = post_repository.get_all(PaginationParams(limit=5), raw=True)
+    second_page = post_repository.get_all(
+        PaginationParams(limit=5, after=first_page.next_cursor), raw=True
+    )
+
+    assert len(second_page.items) == 2  # noqa
+    assert second_page.next_cursor is None
+
+
+def test_iter_post_batches(
+    post_factory: PostFactory, post_repository: PostSQLAlchemyRepository
+) -> None:
+    posts = post_factory.create_many(12)
+
+    batches = list(post_repository.iter_batches(batch_size=5))
+
+    assert [len(batch) for batch in batches] == [5, 5, 2]
+    results = [post for batch in batches for post in batch]
+    assert {post.id for post in results} == {post.id for post in posts}
+    for result in results:
+        post = next(post for post in posts if post.id == result.id)
+        assert set(result.tags) == {tag.name for tag in post.tags}
+
+
+def test_iter_posts_filters(
+    user_factory: UserFactory,
+    post_factory: PostFactory,
+    post_repository: PostSQLAlchemyRepository,
+) -> None:
+    user = user_factory.create_one()
+    posts = post_factory.create_many(3, author_id=user.id)
+    post_factory.create_many(3)
+
+    results = list(
+        post_repository.iter_all(batch_size=2, filters={"author_id": user.id})
+    )
+
+    assert {post.id for post in results} == {post.id for post in posts}
+
+
+def test_iter_posts_raw(
+    post_factory: PostFactory, post_repository: PostSQLAlchemyRepository
+) -> None:
+    posts = post_factory.create_many(3)
+
+    results = list(post_repository.iter_all(batch_size=2, raw=True))
+
+    assert {post.id for post in results} == {post.id for post in posts}
+
+
+def test_iter_posts_invalid_filters(
+    post_repository: PostSQLAlchemyRepository,
+) -> None:
+    with pytest.raises(InvalidFieldsError):
+        list(post_repository.iter_all(filters={"password": "secret"}))
+
+
+def test_copy_posts_csv(
+    post_factory: PostFactory, post_repository: PostSQLAlchemyRepository
+) -> None:
+    posts = post_factory.create_many(3)
+
+    with SQLAlchemyInstrument.record() as sqlalchemy_instrument:
+        chunks = list(post_repository.copy_to(chunk_size=1))
+
+    # The COPY runs on the driver connection, outside of SQLAlchemy
+    assert sqlalchemy_instrument.queries_count == 0
+    assert len(chunks) == 1 + len(posts)
+    rows = list(csv.DictReader(io.StringIO(b"".join(chunks).decode())))
+    assert list(rows[0]) == ["id", "title", "content", "author_id", "tags"]
+    expected = {str(post.id): post for post in posts}
+    for row in rows:
+        post = expected[row["id"]]
+        assert row["title"] == post.title
+        assert set(row["tags"].strip("{}").split(",")) == {
+            tag.name for tag in post.tags
+        }
+
+
+def test_copy_posts_binary(
+    post_factory: PostFactory, post_repository: PostSQLAlchemyRepository
+) -> None:
+    post_factory.create_many(3)
+
+    data = b"".join(post_repository.copy_to(ExportFormat.BINARY))
+
+    assert data.startswith(b"PGCOPY\n\xff\r\n\x00")
+
+
+def test_copy_from_posts(
+    faker: Faker,
+    user_factory: UserFactory,
+    post_factory: PostFactory,
+    post_repository: PostSQLAlchemyRepository,
+) -> None:
+    user = user_factory.create_one()
+    existing_tag = post_factory.create_one().tags[0].name
+    new_tag = TagName(faker.uuid4())
+    data = {
+        row: PostCreateDomain(
+            title=faker.sentence(),
+            content=faker.text(),
+            author_id=UserId(user.id),
+            tags=[TagName(existing_tag), new_tag, new_tag],
+        )
+        for row in range(1, 4)
+    }
+    data[4] = PostCreateDomain(
+        title=faker.sentence(), content=faker.text(), author_id=UserId(uuid.uuid4())
+    )
+
+    with SQLAlchemyInstrument.record() as sqlalchemy_instrument:
+        rejected = post_repository.copy_from(data)
+
+    assert rejected == {4: "Author not found"}
+    posts = post_repository.get_all(filters={"author_id": user.id})
+    assert {post.title for post in posts.items} == {
+        data[row].title for row in range(1, 4)
+    }
+    for post in posts.items:
+        assert sorted(post.tags) == sorted([existing_tag, new_tag])
+    # Statement count doesn't depend on the number of posts
+    assert sqlalchemy_instrument.queries_count < 10  # noqa
+
+
 def test_get_post_by_id(
     post_factory: PostFactory, post_repository: PostSQLAlchemyRepository
 ) -> None:
@@ -85,6 +405,40 @@ def test_get_post_by_id(
     assert len(result.tags) == len(post.tags)
 
 
+def test_get_post_by_id_fields(
+    post_factory: PostFactory, post_repository: PostSQLAlchemyRepository
+) -> None:
+    post = post_factory.create_one()
+
+    result = post_repository.get_by_id(post.id, fields=["title", "tags"])
+
+    assert result.model_dump() == {
+        "title": post.title,
+        "tags": [tag.name for tag in post.tags],
+    }
+
+
+def test_get_post_by_id_raw(
+    post_factory: PostFactory, post_repository: PostSQLAlchemyRepository
+) -> None:
+    post = post_factory.create_one()
+
+    result = post_repository.get_by_id(post.id, raw=True)
+
+    assert result.id == post.id
+    assert result.title == post.title
+    assert result.content == post.content
+    assert result.author_id == post.author_id
+    assert sorted(result.tags) == sorted(tag.name for tag in post.tags)
+
+
+def test_get_post_by_id_raw_not_found(
+    post_repository: PostSQLAlchemyRepository,
+) -> None:
+    with pytest.raises(EntityNotFoundError):
+        post_repository.get_by_id(uuid.uuid4(), raw=True)
+
+
 def test_get_post_by_id_not_found(post_repository: PostSQLAlchemyRepository) -> None:
     with pytest.raises(EntityNotFoundError):
         post_repository.get_by_id(uuid.uuid4())
@@ -98,7 +452,7 @@ def test_create_post(
         title=faker.sentence(),
         content=faker.text(),
         author_id=UserId(user.id),
-        tags=[TagName(faker.word()) for _ in range(3)],
+        tags=[TagName(faker.unique.word()) for _ in range(3)],
     )
 
     result = post_repository.create(data)
@@ -116,7 +470,7 @@ def test_create_post_author_not_found(
         title=faker.sentence(),
         content=faker.text(),
         author_id=UserId(uuid.uuid4()),
-        tags=[TagName(faker.word()) for _ in range(3)],
+        tags=[TagName(faker.unique.word()) for _ in range(3)],
     )
 
     with pytest.raises(EntityNotFoundError):
@@ -137,11 +491,25 @@ def test_update_post(
     assert len(result.tags) == len(post.tags)
 
 
+def test_update_post_single_round_trip(
+    faker: Faker, post_factory: PostFactory, post_repository: PostSQLAlchemyRepository
+) -> None:
+    post = post_factory.create_one()
+    data = PostUpdateDomain(title=faker.sentence())
+
+    with SQLAlchemyInstrument.record() as sqlalchemy_instrument:
+        result = post_repository.update(post.id, data)
+
+    assert result.title == data.title
+    assert set(result.tags) == {tag.name for tag in post.tags}
+    assert sqlalchemy_instrument.queries_count == 1
+
+
 def test_update_post_tags(
     faker: Faker, post_factory: PostFactory, post_repository: PostSQLAlchemyRepository
 ) -> None:
     post = post_factory.create_one()
-    tags = [TagName(faker.word()) for _ in range(3)]
+    tags = [TagName(faker.unique.word()) for _ in range(3)]
     data = PostUpdateDomain(tags=tags)
 
     result = post_repository.update(post.id, data)
@@ -149,6 +517,17 @@ def test_update_post_tags(
     assert set(result.tags) == set(tags)
 
 
+def test_update_post_tags_version(
+    faker: Faker, post_factory: PostFactory, post_repository: PostSQLAlchemyRepository
+) -> None:
+    post = post_factory.create_one()
+    version = post_repository.get_version(post.id)
+
+    post_repository.update(post.id, PostUpdateDomain(tags=[TagName(faker.word())]))
+
+    assert post_repository.get_version(post.id) != version
+
+
 def test_update_post_not_found(
     faker: Faker, post_repository: PostSQLAlchemyRepository
 ) -> None:
@@ -183,3 +562,174 @@ def test_delete_post(
 def test_delete_post_not_found(post_repository: PostSQLAlchemyRepository) -> None:
     with pytest.raises(EntityNotFoundError):
         post_repository.delete(uuid.uuid4())
+
+
+def test_create_many_posts(
+    faker: Faker, user_factory: UserFactory, post_repository: PostSQLAlchemyRepository
+) -> None:
+    users = user_factory.create_many(2)
+    shared_tag = TagName(faker.uuid4())
+    data = [
+        PostCreateDomain(
+            title=faker.sentence(),
+            content=faker.text(),
+            author_id=UserId(users[i % 2].id),
+            tags=[shared_tag, TagName(faker.uuid4())],
+        )
+        for i in range(20)
+    ]
+
+    with SQLAlchemyInstrument.record() as sqlalchemy_instrument:
+        results = post_repository.create_many(data)
+
+    assert [result.title for result in results] == [item.title for item in data]
+    for result, item in zip(results, data, strict=True):
+        assert set(result.tags) == set(item.tags)
+    # Statement count doesn't depend on the number of posts
+    assert sqlalchemy_instrument.queries_count < 10  # noqa
+
+
+def test_create_many_posts_author_not_found(
+    faker: Faker,
+    session: Session,
+    user_factory: UserFactory,
+    post_repository: PostSQLAlchemyRepository,
+) -> None:
+    user = user_factory.create_one()
+    data = [
+        PostCreateDomain(
+            title=faker.sentence(), content=faker.text(), author_id=UserId(author_id)
+        )
+        for author_id in (user.id, uuid.uuid4())
+    ]
+
+    with pytest.raises(EntityNotFoundError):
+        post_repository.create_many(data)
+
+    assert session.scalars(select(Post)).all() == []
+
+
+def test_update_many_posts(
+    faker: Faker, post_factory: PostFactory, post_repository: PostSQLAlchemyRepository
+) -> None:
+    posts = post_factory.create_many(3)
+    tags = [TagName(faker.uuid4())]
+    data = {
+        posts[0].id: PostUpdateDomain(title=faker.sentence()),
+        posts[1].id: PostUpdateDomain(title=faker.sentence(), content=faker.text()),
+        posts[2].id: PostUpdateDomain(tags=tags),
+    }
+
+    results = post_repository.update_many(data)
+
+    assert [result.id for result in results] == list(data)
+    assert results[0].title == data[posts[0].id].title
+    assert results[0].content == posts[0].content
+    assert results[1].content == data[posts[1].id].content
+    assert results[2].title == posts[2].title
+    assert results[2].tags == tags
+
+
+def test_update_many_posts_not_found(
+    faker: Faker, post_factory: PostFactory, post_repository: PostSQLAlchemyRepository
+) -> None:
+    post = post_factory.create_one()
+    data = {
+        post.id: PostUpdateDomain(title=faker.sentence()),
+        uuid.uuid4(): PostUpdateDomain(title=faker.sentence()),
+    }
+
+    with pytest.raises(EntityNotFoundError):
+        post_repository.update_many(data)
+
+    assert post_repository.get_by_id(post.id).title == post.title
+
+
+def test_delete_many_posts(
+    session: Session,
+    post_factory: PostFactory,
+    post_repository: PostSQLAlchemyRepository,
+) -> None:
+    posts = post_factory.create_many(3)
+
+    post_repository.delete_many([post.id for post in posts[:2]])
+
+    assert session.scalars(select(Post.id)).all() == [posts[2].id]
+
+
+def test_delete_many_posts_not_found(
+    session: Session,
+    post_factory: PostFactory,
+    post_repository: PostSQLAlchemyRepository,
+) -> None:
+    post = post_factory.create_one()
+
+    with pytest.raises(EntityNotFoundError):
+        post_repository.delete_many([post.id, uuid.uuid4()])
+
+    assert session.get(Post, post.id) is not None
+
+
+def test_create_post_existing_tags(
+    faker: Faker,
+    session: Session,
+    post_factory: PostFactory,
+    post_repository: PostSQLAlchemyRepository,
+) -> None:
+    post = post_factory.create_one()
+    tags = [TagName(tag.name) for tag in post.tags]
+    data = PostCreateDomain(
+        title=faker.sentence(),
+        content=faker.text(),
+        author_id=UserId(post.author_id),
+        tags=[*tags, TagName(faker.uuid4())],
+    )
+
+    result = post_repository.create(data)
+
+    assert set(result.tags) == set(data.tags)
+    assert len(session.scalars(select(Tag)).all()) == len(tags) + 1
+
+
+def test_create_post_cached_tags(
+    faker: Faker, user_factory: UserFactory, post_repository: PostSQLAlchemyRepository
+) -> None:
+    user = user_factory.create_one()
+    tags = [TagName(faker.uuid4()) for _ in range(3)]
+    data = PostCreateDomain(
+        title=faker.sentence(),
+        content=faker.text(),
+        author_id=UserId(user.id),
+        tags=tags,
+    )
+    post_repository.create(data)
+
+    with SQLAlchemyInstrument.record() as sqlalchemy_instrument:
+        result = post_repository.create(data)
+
+    assert set(result.tags) == set(tags)
+    statements = [query.statement for query in sqlalchemy_instrument.queries]
+    assert not any(statement.startswith("INSERT INTO tag") for statement in statements)
+
+
+def test_create_post_stale_cached_tag(
+    faker: Faker,
+    session: Session,
+    user_factory: UserFactory,
+    post_repository: PostSQLAlchemyRepository,
+) -> None:
+    user = user_factory.create_one()
+    tag = TagName(faker.uuid4())
+    post_repository.tag_cache.set(tag, uuid.uuid4())
+    data = PostCreateDomain(
+        title=faker.sentence(),
+        content=faker.text(),
+        author_id=UserId(user.id),
+        tags=[tag],
+    )
+
+    result = post_repository.create(data)
+
+    assert result.tags == [tag]
+    tag_db = session.scalars(select(Tag).where(Tag.name == tag)).one()
+    assert post_repository.tag_cache.get(tag) == tag_db.id
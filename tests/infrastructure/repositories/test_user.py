@@ -1,15 +1,21 @@
+import csv
+import io
 import uuid
+from typing import Any
 
 import pytest
 from faker import Faker
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
+from app.core.exceptions import RepositoryError
 from app.domain.models.address import AddressCreateDomain
 from app.domain.models.base import PaginationParams
 from app.domain.models.user import UserCreateDomain, UserUpdateDomain
 from app.infrastructure.exceptions import EntityAlreadyExistsError, EntityNotFoundError
 from app.infrastructure.models import Address, Post, Tag, User
 from app.infrastructure.repositories.user import UserSQLAlchemyRepository
+from app.infrastructure.utils import SQLAlchemyInstrument
 from tests.fixtures.factories.factories import PostFactory, UserFactory
 
 
@@ -72,6 +78,47 @@ def test_get_users_empty_page(
     assert len(results.items) == 0
 
 
+def test_get_users_cursor_pages(
+    user_factory: UserFactory, user_repository: UserSQLAlchemyRepository
+) -> None:
+    count = 12
+    limit = 5
+    users = user_factory.create_many(count, username="same")
+    users += user_factory.create_many(count)
+
+    seen: list[uuid.UUID] = []
+    cursor: str | None = None
+    while True:
+        results = user_repository.get_all(PaginationParams(limit=limit, after=cursor))
+        seen.extend(item.id for item in results.items)
+        if (cursor := results.next_cursor) is None:
+            break
+
+    assert len(seen) == len(users)
+    assert set(seen) == {user.id for user in users}
+
+
+def test_get_many_users(
+    user_factory: UserFactory,
+    post_factory: PostFactory,
+    user_repository: UserSQLAlchemyRepository,
+) -> None:
+    users = user_factory.create_many(3)
+    post_factory.create_one(author_id=users[0].id)
+    missing_id = uuid.uuid4()
+
+    with SQLAlchemyInstrument.record() as sqlalchemy_instrument:
+        results = user_repository.get_many(
+            [user.id for user in users] + [missing_id], include_posts=True
+        )
+
+    assert sqlalchemy_instrument.queries_count == 1
+    assert set(results) == {user.id for user in users}
+    assert results[users[0].id].email == users[0].email
+    assert len(results[users[0].id].posts) == 1
+    assert user_repository.get_many([]) == {}
+
+
 def test_get_user_by_id(
     user_factory: UserFactory,
     post_factory: PostFactory,
@@ -108,11 +155,274 @@ def test_get_user_by_id_with_posts(
     assert {post.id for post in result.posts} == {post.id for post in posts}
 
 
+def test_get_user_by_id_raw(
+    user_factory: UserFactory,
+    post_factory: PostFactory,
+    user_repository: UserSQLAlchemyRepository,
+) -> None:
+    user = user_factory.create_one()
+    post_factory.create_many(3, author_id=user.id)
+
+    result = user_repository.get_by_id(user.id, raw=True)
+
+    assert result == user_repository.get_by_id(user.id)
+
+
+def test_get_user_by_id_raw_with_posts(
+    user_factory: UserFactory,
+    post_factory: PostFactory,
+    user_repository: UserSQLAlchemyRepository,
+) -> None:
+    user = user_factory.create_one()
+    posts = post_factory.create_many(3, author_id=user.id)
+
+    result = user_repository.get_by_id(user.id, raw=True, include_posts=True)
+
+    assert result.address.id == user.address.id
+    assert {post.id for post in result.posts} == {post.id for post in posts}
+    for item in result.posts:
+        post = next(post for post in posts if post.id == item.id)
+        assert sorted(item.tags) == sorted(tag.name for tag in post.tags)
+
+
+def test_get_user_by_id_fields(
+    user_factory: UserFactory, user_repository: UserSQLAlchemyRepository
+) -> None:
+    user = user_factory.create_one()
+
+    result = user_repository.get_by_id(user.id, fields=["email", "address"])
+
+    assert result.model_fields_set == {"email", "address"}
+    assert result.email == user.email
+    assert result.address.id == user.address.id
+
+
+def test_get_user_by_id_fields_posts(
+    user_factory: UserFactory,
+    post_factory: PostFactory,
+    user_repository: UserSQLAlchemyRepository,
+) -> None:
+    user = user_factory.create_one()
+    posts = post_factory.create_many(3, author_id=user.id)
+
+    with SQLAlchemyInstrument.record() as sqlalchemy_instrument:
+        result = user_repository.get_by_id(user.id, fields=["posts"])
+
+    assert result.model_fields_set == {"posts"}
+    assert {post.id for post in result.posts} == {post.id for post in posts}
+    for post in result.posts:
+        assert len(post.tags) > 0
+    # User, posts and tags: no lazy load per post
+    assert sqlalchemy_instrument.queries_count == 3  # noqa
+
+
 def test_get_user_by_id_not_found(user_repository: UserSQLAlchemyRepository) -> None:
     with pytest.raises(EntityNotFoundError):
         user_repository.get_by_id(uuid.uuid4())
 
 
+def test_get_user_version(
+    faker: Faker, user_factory: UserFactory, user_repository: UserSQLAlchemyRepository
+) -> None:
+    user = user_factory.create_one()
+    version = user_repository.get_version(user.id)
+
+    user_repository.update(user.id, UserUpdateDomain(username=faker.user_name()))
+
+    assert user_repository.get_version(user.id) != version
+
+
+def test_get_user_version_address_update(
+    faker: Faker, user_factory: UserFactory, user_repository: UserSQLAlchemyRepository
+) -> None:
+    user = user_factory.create_one()
+    version = user_repository.get_version(user.id)
+    data = UserUpdateDomain(
+        address=AddressCreateDomain(
+            street=faker.street_address(),
+            city=faker.city(),
+            zip_code=faker.zipcode(),
+            country=faker.country(),
+        )
+    )
+
+    user_repository.update_many({user.id: data})
+
+    assert user_repository.get_version(user.id) != version
+
+
+def test_get_user_version_with_posts(
+    post_factory: PostFactory, user_repository: UserSQLAlchemyRepository
+) -> None:
+    post = post_factory.create_one()
+    version = user_repository.get_version(post.author_id)
+    with_posts = user_repository.get_version(post.author_id, include_posts=True)
+
+    post_factory.create_one(author_id=post.author_id)
+
+    assert user_repository.get_version(post.author_id) == version
+    assert user_repository.get_version(post.author_id, include_posts=True) != with_posts
+
+
+def test_get_user_version_single_query(
+    post_factory: PostFactory, user_repository: UserSQLAlchemyRepository
+) -> None:
+    post = post_factory.create_one()
+
+    with SQLAlchemyInstrument.record() as sqlalchemy_instrument:
+        user_repository.get_version(post.author_id, include_posts=True)
+
+    assert sqlalchemy_instrument.queries_count == 1
+
+
+def test_get_user_version_not_found(user_repository: UserSQLAlchemyRepository) -> None:
+    with pytest.raises(EntityNotFoundError):
+        user_repository.get_version(uuid.uuid4())
+
+
+def test_get_users_page_version(
+    faker: Faker, user_factory: UserFactory, user_repository: UserSQLAlchemyRepository
+) -> None:
+    user_factory.create_many(3)
+    pagination = PaginationParams(limit=2)
+    version = user_repository.get_page_version(pagination)
+
+    assert user_repository.get_page_version(pagination) == version
+
+    user = user_repository.get_all(pagination).items[0]
+    user_repository.update(user.id, UserUpdateDomain(email=faker.unique.email()))
+    updated = user_repository.get_page_version(pagination)
+    assert updated != version
+
+    user_factory.create_one()
+    assert user_repository.get_page_version(pagination) != updated
+
+
+def test_copy_users(
+    user_factory: UserFactory, user_repository: UserSQLAlchemyRepository
+) -> None:
+    users = user_factory.create_many(3)
+
+    data = b"".join(user_repository.copy_to())
+
+    rows = list(csv.DictReader(io.StringIO(data.decode())))
+    assert list(rows[0]) == [
+        "id",
+        "username",
+        "email",
+        "address_id",
+        "street",
+        "city",
+        "zip_code",
+        "country",
+    ]
+    assert {row["email"] for row in rows} == {user.email for user in users}
+
+
+def make_user_data(faker: Faker, **kwargs: Any) -> UserCreateDomain:
+    address = AddressCreateDomain(
+        street=faker.unique.street_address(),
+        city=faker.city(),
+        zip_code=faker.zipcode(),
+        country=faker.country(),
+    )
+    return UserCreateDomain.model_validate(
+        {
+            "username": faker.user_name(),
+            "email": faker.unique.email(),
+            "address": address,
+            **kwargs,
+        }
+    )
+
+
+def test_copy_from_users(
+    faker: Faker, session: Session, user_repository: UserSQLAlchemyRepository
+) -> None:
+    data = {row: make_user_data(faker) for row in range(1, 6)}
+
+    rejected = user_repository.copy_from(data)
+
+    assert rejected == {}
+    users = session.scalars(select(User)).all()
+    assert {user.email for user in users} == {item.email for item in data.values()}
+    for user in users:
+        assert user.address.street in {item.address.street for item in data.values()}
+
+
+def test_copy_from_users_null_character(
+    faker: Faker, session: Session, user_repository: UserSQLAlchemyRepository
+) -> None:
+    data = {
+        1: make_user_data(faker),
+        2: make_user_data(faker, username="bad\x00name"),
+        3: make_user_data(faker),
+    }
+
+    rejected = user_repository.copy_from(data)
+
+    assert rejected == {2: "Null character not allowed"}
+    emails = set(session.scalars(select(User.email)))
+    assert emails == {data[1].email, data[3].email}
+
+
+def test_copy_from_users_error(
+    faker: Faker,
+    session: Session,
+    user_repository: UserSQLAlchemyRepository,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    def to_staging_row(item: UserCreateDomain) -> tuple[str, ...]:
+        # Too many values for the staging table, the COPY fails
+        return (item.username,) * 10
+
+    monkeypatch.setattr(user_repository, "_to_staging_row", to_staging_row)
+
+    with pytest.raises(RepositoryError):
+        user_repository.copy_from({1: make_user_data(faker)})
+
+    monkeypatch.undo()
+    assert user_repository.copy_from({1: make_user_data(faker)}) == {}
+    assert len(session.scalars(select(User)).all()) == 1
+
+
+def test_copy_from_users_rejected(
+    faker: Faker,
+    session: Session,
+    user_factory: UserFactory,
+    user_repository: UserSQLAlchemyRepository,
+) -> None:
+    user = user_factory.create_one()
+    duplicate = make_user_data(faker)
+    existing_address = {
+        "street": user.address.street,
+        "city": user.address.city,
+        "zip_code": user.address.zip_code,
+        "country": user.address.country,
+    }
+    data = {
+        1: make_user_data(faker, email=user.email),
+        2: duplicate,
+        3: make_user_data(faker, email=duplicate.email),
+        4: make_user_data(faker, address=existing_address),
+        5: make_user_data(faker, address=duplicate.address),
+        6: make_user_data(faker),
+    }
+
+    rejected = user_repository.copy_from(data)
+
+    assert rejected == {
+        1: "Email already exists",
+        3: "Duplicate email",
+        4: "Address already exists",
+        5: "Duplicate address",
+    }
+    emails = set(session.scalars(select(User.email)))
+    assert emails == {user.email, data[2].email, data[6].email}
+    # Every imported user has its address
+    assert session.scalar(select(func.count()).select_from(Address)) == len(emails)
+
+
 def test_create_user(faker: Faker, user_repository: UserSQLAlchemyRepository) -> None:
     data = UserCreateDomain(
         username=faker.user_name(),
@@ -138,6 +448,27 @@ def test_create_user(faker: Faker, user_repository: UserSQLAlchemyRepository) ->
     assert result.posts == []
 
 
+def test_create_user_single_round_trip(
+    faker: Faker, user_repository: UserSQLAlchemyRepository
+) -> None:
+    data = UserCreateDomain(
+        username=faker.user_name(),
+        email=faker.unique.email(),
+        address=AddressCreateDomain(
+            street=faker.street_address(),
+            city=faker.city(),
+            zip_code=faker.zipcode(),
+            country=faker.country(),
+        ),
+    )
+
+    with SQLAlchemyInstrument.record() as sqlalchemy_instrument:
+        result = user_repository.create(data)
+
+    assert result == user_repository.get_by_id(result.id)
+    assert sqlalchemy_instrument.queries_count == 1
+
+
 def test_create_user_email_already_exists(
     faker: Faker, user_factory: UserFactory, user_repository: UserSQLAlchemyRepository
 ) -> None:
@@ -209,6 +540,30 @@ def test_update_user_address(
     assert result.address.country == data.address.country
 
 
+def test_update_user_single_round_trip(
+    faker: Faker, user_factory: UserFactory, user_repository: UserSQLAlchemyRepository
+) -> None:
+    user = user_factory.create_one()
+    data = UserUpdateDomain(
+        email=faker.unique.email(),
+        address=AddressCreateDomain(
+            street=faker.street_address(),
+            city=faker.city(),
+            zip_code=faker.zipcode(),
+            country=faker.country(),
+        ),
+    )
+
+    with SQLAlchemyInstrument.record() as sqlalchemy_instrument:
+        result = user_repository.update(user.id, data)
+
+    assert data.address
+    assert result.username == user.username
+    assert result.email == data.email
+    assert result.address.model_dump(exclude={"id"}) == data.address.model_dump()
+    assert sqlalchemy_instrument.queries_count == 1
+
+
 def test_update_user_not_found(
     faker: Faker, user_repository: UserSQLAlchemyRepository
 ) -> None:
@@ -238,26 +593,140 @@ def test_delete_user(
     number_of_posts = 3
     user = user_factory.create_one()
     posts = post_factory.create_many(number_of_posts, author_id=user.id)
+    # The deleted instances are expired
+    user_id, address_id = user.id, user.address.id
+    post_ids = [post.id for post in posts]
+    tag_ids = [tag.id for post in posts for tag in post.tags]
 
-    user_repository.delete(user.id)
+    user_repository.delete(user_id)
     session.expunge_all()
 
-    deleted_user = session.get(User, user.id)
+    deleted_user = session.get(User, user_id)
     assert deleted_user is None
 
-    address = session.get(Address, user.address.id)
+    address = session.get(Address, address_id)
     assert address is None
 
-    for post in posts:
-        deleted_post = session.get(Post, post.id)
+    for post_id in post_ids:
+        deleted_post = session.get(Post, post_id)
         assert deleted_post is None
 
-    for tag in [tag for post in posts for tag in post.tags]:
-        session.get(Tag, tag.id)
+    for tag_id in tag_ids:
+        session.get(Tag, tag_id)
         # TODO: handle orphan tags
         # assert deleted_tag is None
 
 
+def test_delete_user_single_round_trip(
+    post_factory: PostFactory, user_repository: UserSQLAlchemyRepository
+) -> None:
+    post = post_factory.create_one()
+
+    with SQLAlchemyInstrument.record() as sqlalchemy_instrument:
+        user_repository.delete(post.author_id)
+
+    # Address and posts are deleted by the foreign keys
+    assert sqlalchemy_instrument.queries_count == 1
+
+
 def test_delete_user_not_found(user_repository: UserSQLAlchemyRepository) -> None:
     with pytest.raises(EntityNotFoundError):
         user_repository.delete(uuid.uuid4())
+
+
+def test_create_many_users(
+    faker: Faker, user_repository: UserSQLAlchemyRepository
+) -> None:
+    data = [
+        UserCreateDomain(
+            username=faker.user_name(),
+            email=faker.unique.email(),
+            address=AddressCreateDomain(
+                street=faker.street_address(),
+                city=faker.city(),
+                zip_code=faker.zipcode(),
+                country=faker.country(),
+            ),
+        )
+        for _ in range(10)
+    ]
+
+    results = user_repository.create_many(data)
+
+    assert [result.email for result in results] == [item.email for item in data]
+    assert [result.address.street for result in results] == [
+        item.address.street for item in data
+    ]
+
+
+def test_create_many_users_email_already_exists(
+    faker: Faker, user_factory: UserFactory, user_repository: UserSQLAlchemyRepository
+) -> None:
+    user = user_factory.create_one()
+    data = UserCreateDomain(
+        username=faker.user_name(),
+        email=user.email,
+        address=AddressCreateDomain(
+            street=faker.street_address(),
+            city=faker.city(),
+            zip_code=faker.zipcode(),
+            country=faker.country(),
+        ),
+    )
+
+    with pytest.raises(EntityAlreadyExistsError):
+        user_repository.create_many([data])
+
+
+def test_update_many_users(
+    faker: Faker, user_factory: UserFactory, user_repository: UserSQLAlchemyRepository
+) -> None:
+    users = user_factory.create_many(2)
+    address = AddressCreateDomain(
+        street=faker.street_address(),
+        city=faker.city(),
+        zip_code=faker.zipcode(),
+        country=faker.country(),
+    )
+    data = {
+        users[0].id: UserUpdateDomain(username=faker.user_name()),
+        users[1].id: UserUpdateDomain(address=address),
+    }
+
+    results = user_repository.update_many(data)
+
+    assert results[0].username == data[users[0].id].username
+    assert results[1].username == users[1].username
+    assert results[1].address.street == address.street
+    assert results[1].address.id == users[1].address.id
+
+
+def test_delete_many_users(
+    session: Session,
+    user_factory: UserFactory,
+    post_factory: PostFactory,
+    user_repository: UserSQLAlchemyRepository,
+) -> None:
+    users = user_factory.create_many(3)
+    post_factory.create_many(2, author_id=users[0].id)
+
+    user_repository.delete_many([user.id for user in users])
+    session.expunge_all()
+
+    assert session.scalars(select(User)).all() == []
+    assert session.scalars(select(Address)).all() == []
+    assert session.scalars(select(Post)).all() == []
+
+
+def test_delete_many_users_expires_cascaded(
+    session: Session,
+    post_factory: PostFactory,
+    user_repository: UserSQLAlchemyRepository,
+) -> None:
+    post = post_factory.create_one()
+    post_id = post.id
+
+    user_repository.delete_many([post.author_id])
+
+    # Deleted by the foreign key, not served from the identity map
+    assert session.get(Post, post_id) is None
@@ -0,0 +1,42 @@
+from collections.abc import Iterator
+
+import pytest
+from sqlalchemy import Engine, text
+
+from app.core.config import Settings
+from app.infrastructure.database import create_database_engine, warm_up
+from app.infrastructure.metrics import TimedQueuePool
+
+
+@pytest.fixture
+def database_engine(settings: Settings) -> Iterator[Engine]:
+    settings = settings.model_copy(
+        update={
+            "DATABASE_POOL_SIZE": 3,
+            "DATABASE_MAX_OVERFLOW": 1,
+            "DATABASE_APPLICATION_NAME": "test-app",
+            "DATABASE_STATEMENT_TIMEOUT": 1500,
+        }
+    )
+    engine = create_database_engine(settings)
+    yield engine
+    engine.dispose()
+
+
+def test_create_database_engine(database_engine: Engine) -> None:
+    assert isinstance(database_engine.pool, TimedQueuePool)
+    assert database_engine.pool.size() == 3  # noqa
+
+    with database_engine.connect() as connection:
+        assert connection.scalar(text("SHOW application_name")) == "test-app"
+        assert connection.scalar(text("SHOW statement_timeout")) == "1500ms"
+
+
+def test_warm_up(database_engine: Engine) -> None:
+    pool = database_engine.pool
+    assert isinstance(pool, TimedQueuePool)
+
+    warm_up(database_engine, 3)
+
+    assert pool.checkedin() == 3  # noqa
+    assert pool.checkedout() == 0
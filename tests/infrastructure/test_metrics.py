@@ -0,0 +1,158 @@
+from collections.abc import Iterator
+
+import pytest
+from faker import Faker
+from sqlalchemy import Engine, create_engine
+
+from app.core.config import Settings
+from app.core.metrics import Metric
+from app.domain.models.base import TagName
+from app.domain.models.post import PostUpdateDomain
+from app.infrastructure.exceptions import EntityNotFoundError
+from app.infrastructure.metrics import (
+    TimedQueuePool,
+    collect_pools,
+    collect_queries,
+    instrument_engine,
+    pool_wait,
+    repository_duration,
+    repository_errors,
+)
+from app.infrastructure.repositories.post import PostSQLAlchemyRepository
+from app.infrastructure.repositories.user import UserSQLAlchemyRepository
+from app.infrastructure.utils import SQLAlchemyInstrument
+from tests.fixtures.factories.factories import PostFactory, UserFactory
+
+
+def get_sample(metrics: Metric | list[Metric], name: str, **labels: str) -> float:
+    if isinstance(metrics, Metric):
+        metrics = [metrics]
+    for metric in metrics:
+        for sample_name, sample_labels, value in metric.samples():
+            if sample_name == name and sample_labels == labels:
+                return value
+    return 0
+
+
+@pytest.fixture
+def timed_engine(settings: Settings) -> Iterator[Engine]:
+    engine = create_engine(
+        str(settings.SQLALCHEMY_DATABASE_URI), poolclass=TimedQueuePool, pool_size=2
+    )
+    instrument_engine(engine, name="timed")
+    yield engine
+    engine.dispose()
+
+
+def test_repository_duration(
+    user_factory: UserFactory, user_repository: UserSQLAlchemyRepository
+) -> None:
+    user = user_factory.create_one()
+    labels = {"repository": "UserSQLAlchemyRepository", "method": "get_by_id"}
+    count = get_sample(
+        repository_duration, "repository_method_duration_seconds_count", **labels
+    )
+
+    user_repository.get_by_id(user.id)
+
+    assert (
+        get_sample(
+            repository_duration, "repository_method_duration_seconds_count", **labels
+        )
+        == count + 1
+    )
+
+
+def test_repository_errors(
+    faker: Faker, user_repository: UserSQLAlchemyRepository
+) -> None:
+    labels = {
+        "repository": "UserSQLAlchemyRepository",
+        "method": "get_by_id",
+        "error": "EntityNotFoundError",
+    }
+    count = get_sample(repository_errors, "repository_method_errors_total", **labels)
+
+    with pytest.raises(EntityNotFoundError):
+        user_repository.get_by_id(faker.uuid4(cast_to=None))
+
+    assert (
+        get_sample(repository_errors, "repository_method_errors_total", **labels)
+        == count + 1
+    )
+
+
+def test_repository_nested_calls(
+    faker: Faker, post_factory: PostFactory, post_repository: PostSQLAlchemyRepository
+) -> None:
+    post = post_factory.create_one()
+    name = "repository_method_duration_seconds_count"
+    repository = "PostSQLAlchemyRepository"
+    update = get_sample(
+        repository_duration, name, repository=repository, method="update"
+    )
+    update_many = get_sample(
+        repository_duration, name, repository=repository, method="update_many"
+    )
+
+    post_repository.update(
+        post.id, PostUpdateDomain(tags=[TagName(faker.unique.word())])
+    )
+
+    assert (
+        get_sample(repository_duration, name, repository=repository, method="update")
+        == update + 1
+    )
+    assert (
+        get_sample(
+            repository_duration, name, repository=repository, method="update_many"
+        )
+        == update_many
+    )
+
+
+def test_pool(timed_engine: Engine) -> None:
+    count = get_sample(pool_wait, "db_pool_wait_seconds_count", engine="timed")
+
+    with timed_engine.connect():
+        metrics = list(collect_pools())
+        assert get_sample(metrics, "db_pool_checked_out", engine="timed") == 1
+        assert get_sample(metrics, "db_pool_size", engine="timed") == 2  # noqa
+
+    metrics = list(collect_pools())
+    assert get_sample(metrics, "db_pool_checked_out", engine="timed") == 0
+    assert get_sample(metrics, "db_pool_checked_in", engine="timed") == 1
+    assert (
+        get_sample(pool_wait, "db_pool_wait_seconds_count", engine="timed") == count + 1
+    )
+
+
+def test_pool_recreate(timed_engine: Engine) -> None:
+    timed_engine.dispose()
+
+    assert isinstance(timed_engine.pool, TimedQueuePool)
+    assert timed_engine.pool.metrics_name == "timed"
+
+
+def test_queries(
+    user_factory: UserFactory, user_repository: UserSQLAlchemyRepository
+) -> None:
+    instrument = SQLAlchemyInstrument()
+    instrument.reset_stats()
+    instrument.enable_stats()
+    try:
+        users = user_factory.create_many(2)
+        instrument.reset_stats()
+        for user in users:
+            user_repository.get_by_id(user.id, raw=True)
+
+        metrics = list(collect_queries())
+    finally:
+        instrument.disable_stats()
+        instrument.reset_stats()
+
+    name = "db_query_duration_seconds"
+    assert get_sample(metrics, f"{name}_count", operation="SELECT") == len(users)
+    assert get_sample(metrics, f"{name}_bucket", operation="SELECT", le="+Inf") == len(
+        users
+    )
@@ -1,8 +1,11 @@
 import pytest
 from sqlalchemy import select
+from sqlalchemy.exc import InvalidRequestError
 from sqlalchemy.orm import Session, joinedload, selectinload
 
+from app.infrastructure.exceptions import NPlusOneError, NPlusOneWarning
 from app.infrastructure.models import User
+from app.infrastructure.repositories.user import UserSQLAlchemyRepository
 from app.infrastructure.utils import SQLAlchemyInstrument
 from tests.fixtures.factories.factories import PostFactory, UserFactory
 
@@ -65,3 +68,64 @@ def test_joinedload(session: Session, users: list[User]) -> None:
             assert len(user.posts) == number_of_posts
 
     assert sqlalchemy_instrument.queries_count == 1
+
+
+def test_select_repeat_warning(session: Session, users: list[User]) -> None:
+    with (
+        pytest.warns(NPlusOneWarning, match="FROM address"),
+        SQLAlchemyInstrument.record(repeat_threshold=5) as sqlalchemy_instrument,
+    ):
+        stmt = select(User).where(User.username == "test")
+        for user in session.scalars(stmt).all():
+            assert user.address.user_id == user.id
+
+    assert len(sqlalchemy_instrument.get_repeated(5)) == 1
+
+
+def test_select_repeat_raise(session: Session, users: list[User]) -> None:
+    stmt = select(User).where(User.username == "test")
+    users_db = session.scalars(stmt).all()
+
+    with (
+        pytest.raises(NPlusOneError),
+        SQLAlchemyInstrument.record(repeat_threshold=5, on_repeat="raise"),
+    ):
+        for user in users_db:
+            assert len(user.posts) == number_of_posts
+
+
+class StrictUserRepository(UserSQLAlchemyRepository):
+    strict_loading = True
+
+
+def test_strict_loading(session: Session, users: list[User]) -> None:
+    repository = StrictUserRepository(session=session)
+
+    with SQLAlchemyInstrument.record() as sqlalchemy_instrument:
+        user = repository.get_by_id(users[0].id, include_posts=True)
+
+    assert len(user.posts) == number_of_posts
+    assert sqlalchemy_instrument.queries_count == 4  # noqa
+
+
+def test_strict_loading_fields_posts(session: Session, users: list[User]) -> None:
+    repository = StrictUserRepository(session=session)
+    session.expunge_all()
+
+    user = repository.get_by_id(users[0].id, fields=["posts"])
+
+    assert len(user.posts) == number_of_posts
+    assert all(post.tags is not None for post in user.posts)
+
+
+def test_strict_loading_fields(session: Session, users: list[User]) -> None:
+    repository = StrictUserRepository(session=session)
+    session.expunge_all()
+
+    stmt = repository._apply_projection(  # pyright: ignore[reportPrivateUsage]
+        select(User).where(User.id == users[0].id), fields=["username"]
+    )
+    user = session.scalars(stmt).one()
+
+    with pytest.raises(InvalidRequestError):
+        _ = user.email
@@ -0,0 +1,350 @@
+import asyncio
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import pytest
+from sqlalchemy import Engine, event, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core.config import Settings
+from app.domain.models.base import PaginationParams
+from app.infrastructure.database import create_database_engine
+from app.infrastructure.exceptions import QueryBudgetExceededError
+from app.infrastructure.repositories.user import UserSQLAlchemyRepository
+from app.infrastructure.utils import (
+    QUERY_TIME_BUCKETS,
+    SQLAlchemyInstrument,
+    fingerprint,
+    max_queries,
+)
+from tests.fixtures.factories.factories import UserFactory
+
+
+@pytest.fixture
+def sqlalchemy_instrument() -> Iterator[SQLAlchemyInstrument]:
+    instrument = SQLAlchemyInstrument()
+    instrument.reset_stats()
+    instrument.enable_stats()
+    try:
+        yield instrument
+    finally:
+        instrument.disable_stats()
+        instrument.reset_stats()
+
+
+@pytest.fixture
+def explain_instrument() -> Iterator[SQLAlchemyInstrument]:
+    instrument = SQLAlchemyInstrument()
+    instrument.reset_plans()
+    instrument.enable_explain(threshold=0.0, sample_rate=1.0, interval=60.0)
+    try:
+        yield instrument
+    finally:
+        instrument.disable_explain()
+        instrument.reset_plans()
+
+
+@pytest.mark.parametrize(
+    ("statement", "expected"),
+    [
+        (
+            "SELECT user.id\nFROM user\nWHERE user.id = %(id_1)s::UUID",
+            "SELECT user.id FROM user WHERE user.id = ?",
+        ),
+        (
+            "SELECT post.id FROM post WHERE post.title = 'title' LIMIT 10",
+            "SELECT post.id FROM post WHERE post.title = ? LIMIT ?",
+        ),
+        (
+            "SELECT tag.id FROM tag WHERE tag.id IN (%(pk_1)s::UUID, %(pk_2)s::UUID)",
+            "SELECT tag.id FROM tag WHERE tag.id IN (?...)",
+        ),
+        (
+            "INSERT INTO tag (name) VALUES (%(name__0)s), (%(name__1)s)",
+            "INSERT INTO tag (name) VALUES (?...)",
+        ),
+    ],
+)
+def test_fingerprint(statement: str, expected: str) -> None:
+    assert fingerprint(statement) == expected
+
+
+def test_fingerprint_groups_parameter_lists() -> None:
+    one = "SELECT tag.id FROM tag WHERE tag.id IN (%(pk_1)s::UUID)"
+    two = "SELECT tag.id FROM tag WHERE tag.id IN (%(pk_1)s::UUID, %(pk_2)s::UUID)"
+
+    assert fingerprint(one) == fingerprint(two)
+
+
+def test_stats(
+    user_factory: UserFactory,
+    user_repository: UserSQLAlchemyRepository,
+    sqlalchemy_instrument: SQLAlchemyInstrument,
+) -> None:
+    users = user_factory.create_many(3)
+    sqlalchemy_instrument.reset_stats()
+
+    for user in users:
+        user_repository.get_by_id(user.id, raw=True)
+    user_repository.get_all(PaginationParams(limit=2), raw=True)
+
+    stats = sqlalchemy_instrument.get_stats()
+    assert sum(item.calls for item in stats) == 4  # noqa
+    assert [item.total_time for item in stats] == sorted(
+        (item.total_time for item in stats), reverse=True
+    )
+
+    by_id = next(item for item in stats if item.calls == len(users))
+    assert by_id.rows == len(users)
+    assert by_id.min_time <= by_id.mean_time <= by_id.max_time
+    assert len(by_id.histogram) == len(QUERY_TIME_BUCKETS) + 1
+    assert sum(by_id.histogram) == by_id.calls
+
+
+def test_stats_limit(
+    user_factory: UserFactory,
+    user_repository: UserSQLAlchemyRepository,
+    sqlalchemy_instrument: SQLAlchemyInstrument,
+) -> None:
+    user = user_factory.create_one()
+    user_repository.get_by_id(user.id)
+
+    assert len(sqlalchemy_instrument.get_stats(limit=1)) == 1
+
+
+def test_stats_reset(
+    user_factory: UserFactory, sqlalchemy_instrument: SQLAlchemyInstrument
+) -> None:
+    user_factory.create_one()
+
+    sqlalchemy_instrument.reset_stats()
+
+    assert sqlalchemy_instrument.get_stats() == []
+
+
+def test_stats_disabled(
+    user_factory: UserFactory, sqlalchemy_instrument: SQLAlchemyInstrument
+) -> None:
+    sqlalchemy_instrument.disable_stats()
+
+    user_factory.create_one()
+
+    assert sqlalchemy_instrument.get_stats() == []
+
+
+def test_record_nested(
+    user_factory: UserFactory, user_repository: UserSQLAlchemyRepository
+) -> None:
+    user = user_factory.create_one()
+
+    with SQLAlchemyInstrument.record() as outer:
+        user_repository.get_by_id(user.id, raw=True)
+        with SQLAlchemyInstrument.record() as inner:
+            user_repository.get_by_id(user.id, raw=True)
+
+    assert outer.queries_count == 2  # noqa
+    assert inner.queries_count == 1
+    assert outer.get_repeated() == {fingerprint(inner.queries[0].statement): 2}
+
+
+def test_max_queries(
+    user_factory: UserFactory, user_repository: UserSQLAlchemyRepository
+) -> None:
+    user = user_factory.create_one()
+
+    with max_queries(1) as scope:
+        user_repository.get_by_id(user.id, raw=True)
+
+    assert scope.queries_count == 1
+
+
+def test_max_queries_exceeded(
+    user_factory: UserFactory, user_repository: UserSQLAlchemyRepository
+) -> None:
+    users = user_factory.create_many(2)
+
+    with pytest.raises(QueryBudgetExceededError, match="2 x SELECT"), max_queries(1):
+        for user in users:
+            user_repository.get_by_id(user.id, raw=True)
+
+
+def test_max_queries_decorator(
+    user_factory: UserFactory, user_repository: UserSQLAlchemyRepository
+) -> None:
+    users = user_factory.create_many(2)
+
+    @max_queries(1)
+    def get_users() -> None:
+        for user in users:
+            user_repository.get_by_id(user.id, raw=True)
+
+    with pytest.raises(QueryBudgetExceededError):
+        get_users()
+
+
+def count_queries(engine: Engine, count: int) -> int:
+    with SQLAlchemyInstrument.record() as scope, engine.connect() as connection:
+        for _ in range(count):
+            connection.execute(select(1))
+    return scope.queries_count
+
+
+def test_record_threads(engine: Engine) -> None:
+    counts = [1, 2, 3, 4]
+
+    with SQLAlchemyInstrument.record() as scope, ThreadPoolExecutor() as executor:
+        results = list(executor.map(count_queries, [engine] * len(counts), counts))
+
+    assert results == counts
+    assert scope.queries_count == 0
+
+
+@pytest.mark.anyio
+async def test_record_tasks(async_session: AsyncSession) -> None:
+    async_engine = async_session.bind
+    assert isinstance(async_engine, AsyncEngine)
+
+    async def run(count: int) -> int:
+        with SQLAlchemyInstrument.record() as scope:
+            async with async_engine.connect() as connection:
+                for _ in range(count):
+                    await connection.execute(select(1))
+                    await asyncio.sleep(0)
+        return scope.queries_count
+
+    counts = [1, 2, 3, 4]
+    assert await asyncio.gather(*(run(count) for count in counts)) == counts
+
+
+def test_record_summary(
+    user_factory: UserFactory, user_repository: UserSQLAlchemyRepository
+) -> None:
+    user = user_factory.create_one()
+
+    with SQLAlchemyInstrument.record(log=False) as scope:
+        user_repository.get_by_id(user.id, raw=True)
+        user_repository.get_all(raw=True)
+
+    summary = scope.summary
+    assert summary.queries_count == 2  # noqa
+    assert summary.slowest is not None
+    assert summary.duration >= summary.slowest.duration
+    assert summary.headers["X-Query-Count"] == "2"
+    assert summary.headers["Server-Timing"].startswith("db;dur=")
+
+
+def test_count(
+    user_factory: UserFactory, user_repository: UserSQLAlchemyRepository
+) -> None:
+    user = user_factory.create_one()
+
+    with SQLAlchemyInstrument.count() as counters:
+        user_repository.get_by_id(user.id, raw=True)
+        with SQLAlchemyInstrument.count() as inner:
+            user_repository.get_all(raw=True)
+
+    assert counters.calls == 2  # noqa
+    assert inner.calls == 1
+    assert SQLAlchemyInstrument().scopes == ()
+    summary = counters.summary
+    assert summary.queries_count == 2  # noqa
+    assert summary.slowest is None
+    assert summary.duration == counters.total_time
+    assert summary.headers["X-Query-Count"] == "2"
+
+
+def test_explain(
+    user_factory: UserFactory,
+    user_repository: UserSQLAlchemyRepository,
+    explain_instrument: SQLAlchemyInstrument,
+) -> None:
+    users = user_factory.create_many(2)
+    explain_instrument.reset_plans()
+
+    with SQLAlchemyInstrument.record() as scope:
+        for user in users:
+            user_repository.get_by_id(user.id, raw=True)
+
+    key = fingerprint(scope.queries[0].statement)
+    plans = explain_instrument.get_plans(key)
+    assert len(plans) == 1
+    assert plans[0].parameters
+    assert "Actual Total Time" in plans[0].plan[0]["Plan"]
+    assert scope.queries_count == len(users)
+
+
+def test_explain_write_is_not_analyzed(
+    user_factory: UserFactory,
+    user_repository: UserSQLAlchemyRepository,
+    explain_instrument: SQLAlchemyInstrument,
+) -> None:
+    user_factory.create_one()
+
+    plans = [
+        plan
+        for plan in explain_instrument.get_plans()
+        if plan.statement.startswith("INSERT")
+    ]
+    assert plans
+    assert "Actual Total Time" not in plans[0].plan[0]["Plan"]
+    assert user_repository.get_all().total == 1
+
+
+def test_explain_exhausted_pool(
+    settings: Settings, explain_instrument: SQLAlchemyInstrument
+) -> None:
+    engine = create_database_engine(
+        settings.model_copy(
+            update={
+                "DATABASE_POOL_SIZE": 1,
+                "DATABASE_MAX_OVERFLOW": 0,
+                "DATABASE_POOL_TIMEOUT": 0.5,
+            }
+        )
+    )
+    statement = text("SELECT count(*) FROM (VALUES (1), (2)) AS v WHERE column1 > :n")
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("CREATE TEMPORARY TABLE explained (id int)"))
+            connection.execute(text("INSERT INTO explained VALUES (1)"))
+            count = connection.execute(statement, {"n": 0}).scalar_one()
+            # The savepoint rolled back, the transaction is still usable
+            rows = connection.execute(text("SELECT count(*) FROM explained"))
+            assert rows.scalar_one() == 1
+    finally:
+        engine.dispose()
+
+    assert count == 2  # noqa
+    statements = [plan.statement for plan in explain_instrument.get_plans()]
+    assert any(item.startswith("INSERT INTO explained") for item in statements)
+    assert any(item.startswith("SELECT count(*) FROM (VALUES") for item in statements)
+
+
+def test_instrument_enabled_during_execution(engine: Engine) -> None:
+    instrument = SQLAlchemyInstrument()
+    instrument.reset_stats()
+
+    def enable(*args: Any) -> None:
+        instrument.enable_stats()
+
+    # Runs after the instrument hook, the execution is still not instrumented
+    event.listen(engine, "before_cursor_execute", enable)
+    try:
+        with engine.connect() as connection:
+            connection.execute(select(1))
+    finally:
+        event.remove(engine, "before_cursor_execute", enable)
+        instrument.disable_stats()
+
+    assert instrument.get_stats() == []
+
+
+def test_explain_threshold(
+    user_factory: UserFactory, explain_instrument: SQLAlchemyInstrument
+) -> None:
+    explain_instrument.enable_explain(threshold=60_000.0, sample_rate=1.0)
+
+    user_factory.create_one()
+
+    assert explain_instrument.get_plans() == []